@@ -0,0 +1,497 @@
+"""Asyncio JSON API serving the conversation engine.
+
+Routes:
+    POST   /conversations                    start a conversation
+    GET    /conversations/{id}               current question
+    POST   /conversations/{id}/answers       submit {"answer": "..."}
+    GET    /conversations/{id}/history       answered steps (?limit=N)
+    DELETE /conversations/{id}               end a conversation
+    GET    /health                           liveness and counts
+    GET    /metrics                          Prometheus metrics of this process
+
+Every conversation shares one compiled graph; per-conversation state is just
+a cursor and a bounded history, so one process can hold many thousands.
+Run ``python script_api.py serve`` to start the server and
+``python script_api.py loadtest`` to drive it with simulated conversations.
+
+With ``serve --workers N`` the graph is compiled once into a memory-mapped
+file that N worker processes attach read-only. Worker ``i`` listens on
+``port + i`` and owns the conversations it starts (their ids are prefixed
+with ``i-``); a request that reaches the wrong worker is redirected to the
+owner with ``307 Temporary Redirect``.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from script_engine import COMPLETE, Conversation, ScriptAnalyzer, ScriptGraph
+from script_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from script_metrics import REGISTRY
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+
+_REASONS = {200: "OK", 201: "Created", 307: "Temporary Redirect", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY = 64 * 1024
+ENDED_SECONDS = 60.0  # how long an ended conversation is refused while its deletion is still queued
+
+
+class HttpError(Exception):
+    """Raised by handlers to return an error status."""
+
+    def __init__(self, status: int, message: str, location: str = ""):
+        super().__init__(message)
+        self.status = status
+        self.location = location
+
+
+GRAPH_KINDS = {"complete": "curated", "ai": "ai-heuristic"}
+
+
+def load_script_graph(kind: str = "complete", pdf_path: str = "script.pdf") -> ScriptGraph:
+    """Load the shared graph the same way the Streamlit apps do.
+
+    ``kind`` is ``"complete"``, ``"ai"`` or the name of any parse strategy.
+    """
+    analyzer = ScriptAnalyzer(pdf_path, GRAPH_KINDS.get(kind, kind))
+    if not analyzer.parse_script():
+        raise SystemExit(analyzer.parse_error or "Failed to parse script")
+    return analyzer.graph
+
+
+class ConversationService:
+    """Holds live conversations and answers API calls against them."""
+
+    def __init__(self, graph: ScriptGraph, store=None, idle_timeout: float = 1800.0,
+                 worker_index: Optional[int] = None, worker_urls: Sequence[str] = ()):
+        self.graph = graph
+        self.store = store
+        self.idle_timeout = idle_timeout
+        self.worker_index = worker_index
+        self.worker_urls = list(worker_urls)
+        self.conversations: Dict[str, Conversation] = {}
+        self._last_seen: Dict[str, float] = {}
+        # Ended conversations, until the store has certainly committed their deletion
+        self._ended: Dict[str, float] = {}
+
+    def _get(self, conversation_id: str) -> Conversation:
+        conversation = self.conversations.get(conversation_id)
+        if conversation is None and self.store is not None and conversation_id not in self._ended:
+            conversation = Conversation(self.graph)
+            if not conversation.attach_store(self.store, conversation_id, create=False):
+                conversation = None
+            else:
+                self.conversations[conversation_id] = conversation
+        if conversation is None:
+            raise HttpError(404, "conversation not found")
+        self._last_seen[conversation_id] = time.monotonic()
+        return conversation
+
+    def _state(self, conversation_id: str, conversation: Conversation, **extra: Any) -> str:
+        # Node payloads never change, so the graph serializes each one once
+        question = self.graph.node_json(conversation.current_question_id) or "null"
+        fields = "".join(f', "{key}": {json.dumps(value)}' for key, value in extra.items())
+        return (f'{{"conversation_id": {json.dumps(conversation_id)}, "steps": {len(conversation.conversation_history)}, '
+                f'"complete": {json.dumps(conversation.current_question_id == COMPLETE)}{fields}, '
+                f'"question": {question}}}')
+
+    def _check_owner(self, conversation_id: str, target: str) -> None:
+        """In worker mode, send requests for another worker's conversation there."""
+        if self.worker_index is None:
+            return
+        owner, _, _ = conversation_id.partition("-")
+        if owner.isdigit() and int(owner) != self.worker_index and int(owner) < len(self.worker_urls):
+            raise HttpError(307, "conversation lives on another worker",
+                            self.worker_urls[int(owner)] + target)
+
+    def start(self) -> Tuple[int, str]:
+        conversation_id = uuid.uuid4().hex
+        if self.worker_index is not None:
+            conversation_id = f"{self.worker_index}-{conversation_id}"
+        conversation = Conversation(self.graph)
+        if self.store is not None:
+            conversation.attach_store(self.store, conversation_id)
+        self.conversations[conversation_id] = conversation
+        self._last_seen[conversation_id] = time.monotonic()
+        return 201, self._state(conversation_id, conversation)
+
+    def current(self, conversation_id: str) -> Tuple[int, str]:
+        return 200, self._state(conversation_id, self._get(conversation_id))
+
+    def answer(self, conversation_id: str, body: Dict[str, Any]) -> Tuple[int, str]:
+        answer = body.get("answer")
+        if not isinstance(answer, str) or not answer:
+            raise HttpError(400, "body must contain a non-empty \"answer\" string")
+        conversation = self._get(conversation_id)
+        accepted = conversation.submit_answer(answer)
+        return 200, self._state(conversation_id, conversation, accepted=accepted)
+
+    def history(self, conversation_id: str, limit: int) -> Tuple[int, str]:
+        conversation = self._get(conversation_id)
+        entries = [entry._asdict() for entry in conversation.conversation_history.recent(limit)]
+        return 200, json.dumps({"conversation_id": conversation_id,
+                                "steps": len(conversation.conversation_history),
+                                "history": entries})
+
+    def end(self, conversation_id: str) -> Tuple[int, str]:
+        self._get(conversation_id).conversation_history.clear()
+        del self.conversations[conversation_id]
+        del self._last_seen[conversation_id]
+        if self.store is not None:
+            self.store.delete_session(conversation_id)
+            self._ended[conversation_id] = time.monotonic()
+        return 200, json.dumps({"conversation_id": conversation_id, "ended": True})
+
+    def health(self) -> Tuple[int, str]:
+        return 200, json.dumps({"status": "ok", "conversations": len(self.conversations),
+                                "questions": len(self.graph)})
+
+    def evict_idle(self) -> int:
+        """Drop conversations idle past the timeout; stored ones can be resumed."""
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [cid for cid, seen in self._last_seen.items() if seen < cutoff]
+        for conversation_id in idle:
+            self.conversations.pop(conversation_id).offload()
+            del self._last_seen[conversation_id]
+        ended_cutoff = time.monotonic() - ENDED_SECONDS
+        for conversation_id in [cid for cid, ended in self._ended.items() if ended < ended_cutoff]:
+            del self._ended[conversation_id]
+        return len(idle)
+
+    def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, str]:
+        """Route one request to its handler."""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["health"] and method == "GET":
+            return self.health()
+        if parts == ["metrics"] and method == "GET":
+            return 200, REGISTRY.render()
+        if not parts or parts[0] != "conversations" or len(parts) > 3:
+            raise HttpError(404, "no such route")
+        if len(parts) == 1:
+            if method != "POST":
+                raise HttpError(405, "use POST to start a conversation")
+            return self.start()
+        conversation_id = parts[1]
+        self._check_owner(conversation_id, target)
+        if len(parts) == 2:
+            if method == "GET":
+                return self.current(conversation_id)
+            if method == "DELETE":
+                return self.end(conversation_id)
+            raise HttpError(405, "use GET or DELETE")
+        if parts[2] == "answers" and method == "POST":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise HttpError(400, "body is not valid JSON")
+            if not isinstance(payload, dict):
+                raise HttpError(400, "body must be a JSON object")
+            return self.answer(conversation_id, payload)
+        if parts[2] == "history" and method == "GET":
+            try:
+                limit = int(parse_qs(url.query).get("limit", ["50"])[0])
+            except ValueError:
+                raise HttpError(400, "limit must be an integer")
+            return self.history(conversation_id, max(limit, 0))
+        raise HttpError(404, "no such route")
+
+
+def _response(status: int, payload: str, keep_alive: bool, location: str = "",
+              content_type: str = "application/json") -> bytes:
+    body = payload.encode("utf-8")
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+            + (f"Location: {location}\r\n" if location else "")
+            + f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("ascii") + body
+
+
+async def _handle_connection(service: ConversationService, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter) -> None:
+    """Serve HTTP/1.1 requests on one connection until it closes."""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                writer.write(_response(400, '{"error": "malformed request line"}', False))
+                return
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                if name:
+                    headers[name.strip().lower()] = value.strip()
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            declared = headers.get("content-length", "0") or "0"
+            if not (declared.isascii() and declared.isdigit()):
+                # The body cannot be framed, so the connection cannot be reused
+                writer.write(_response(400, '{"error": "invalid Content-Length"}', False))
+                return
+            length = int(declared)
+            if length > MAX_BODY:
+                writer.write(_response(413, '{"error": "body too large"}', False))
+                return
+            try:
+                body = await reader.readexactly(length) if length else b""
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+
+            location, content_type = "", "application/json"
+            try:
+                status, payload = service.dispatch(method.upper(), target, body)
+                if target.split("?", 1)[0] == "/metrics":
+                    content_type = METRICS_CONTENT_TYPE
+            except HttpError as e:
+                status, payload, location = e.status, json.dumps({"error": str(e)}), e.location
+            except Exception as e:  # Keep serving other requests
+                status, payload = 500, json.dumps({"error": str(e)})
+            writer.write(_response(status, payload, keep_alive, location, content_type))
+            await writer.drain()
+            if not keep_alive:
+                return
+    finally:
+        writer.close()
+
+
+async def serve(service: ConversationService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                sock=None, sweep_interval: float = 60.0) -> None:
+    """Run the API server until cancelled."""
+    async def handler(reader, writer):
+        await _handle_connection(service, reader, writer)
+
+    if sock is not None:
+        server = await asyncio.start_server(handler, sock=sock, backlog=1024)
+    else:
+        server = await asyncio.start_server(handler, host, port, backlog=1024)
+    async with server:
+        while True:
+            await asyncio.sleep(sweep_interval)
+            service.evict_idle()
+
+
+def _worker_main(index: int, graph_path: str, host: str, ports: List[int], db: Optional[str]) -> None:
+    """Entry point of one worker process: attach the shared graph and serve."""
+    from script_shared_graph import MappedGraph
+
+    store = None
+    if db:
+        from session_store import SessionStore
+        store = SessionStore(db)
+    urls = [f"http://{host}:{port}" for port in ports]
+    service = ConversationService(MappedGraph(graph_path), store, worker_index=index, worker_urls=urls)
+    try:
+        asyncio.run(serve(service, host, ports[index]))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve_workers(graph: ScriptGraph, workers: int, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                  graph_path: Optional[str] = None, db: Optional[str] = None) -> None:
+    """Compile the graph to a shared file once and run ``workers`` processes over it."""
+    from script_shared_graph import write_graph_file
+
+    graph_path = graph_path or os.path.join(tempfile.gettempdir(), f"script-graph-{os.getpid()}.bin")
+    write_graph_file(graph, graph_path)
+    ports = [port + i for i in range(workers)]
+    processes = [
+        multiprocessing.Process(target=_worker_main, args=(i, graph_path, host, ports, db), daemon=True)
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+class ApiClient:
+    """Minimal keep-alive JSON client for the API, used by the load tests."""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._redirects: Dict[Tuple[str, int], "ApiClient"] = {}
+
+    async def request(self, method: str, path: str, payload: Optional[dict] = None) -> Tuple[int, dict]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self._writer.write(
+            (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+             f"Content-Length: {len(body)}\r\n\r\n").encode("ascii") + body
+        )
+        await self._writer.drain()
+        head = await self._reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        length, location = 0, ""
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value.strip())
+            elif name == "location":
+                location = value.strip()
+        data = await self._reader.readexactly(length)
+        if status == 307 and location:
+            url = urlsplit(location)
+            key = (url.hostname, url.port)
+            if key not in self._redirects:
+                self._redirects[key] = ApiClient(url.hostname, url.port)
+            return await self._redirects[key].request(method, url.path + (f"?{url.query}" if url.query else ""), payload)
+        return status, json.loads(data)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for client in self._redirects.values():
+            await client.close()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+async def _walk(client: ApiClient, graph: ScriptGraph, max_steps: int, rng: random.Random,
+                latencies: List[float]) -> int:
+    """One simulated conversation: a random walk until completion or max_steps."""
+    started = time.perf_counter()
+    status, state = await client.request("POST", "/conversations")
+    latencies.append(time.perf_counter() - started)
+    conversation_id = state["conversation_id"]
+    steps = 0
+    while steps < max_steps and not state["complete"]:
+        node = graph.node(state["question"]["question_id"])
+        answer = rng.choice(list(node["next_questions"]) or ["Yes"])
+        started = time.perf_counter()
+        status, state = await client.request("POST", f"/conversations/{conversation_id}/answers",
+                                             {"answer": answer})
+        latencies.append(time.perf_counter() - started)
+        steps += 1
+    await client.request("DELETE", f"/conversations/{conversation_id}")
+    return steps
+
+
+async def load_test(graph: ScriptGraph, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    conversations: int = 1000, concurrency: int = 200, max_steps: int = 60,
+                    seed: int = 0, workers: int = 1) -> Dict[str, float]:
+    """Drive the API with concurrent random-walk conversations and report latency.
+
+    With ``workers`` > 1, clients are spread over ports ``port .. port + workers - 1``.
+    """
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(conversations):
+        queue.put_nowait(None)
+    total_steps = 0
+
+    async def worker(index: int):
+        nonlocal total_steps
+        client = ApiClient(host, port + index % max(workers, 1))
+        try:
+            while not queue.empty():
+                queue.get_nowait()
+                steps = await _walk(client, graph, max_steps, rng, latencies)
+                total_steps += steps
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(min(concurrency, conversations))))
+    elapsed = time.perf_counter() - started
+    return {
+        "conversations": conversations,
+        "requests": len(latencies),
+        "answers": total_steps,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Conversation engine JSON API.")
+    sub = parser.add_subparsers(dest="command")
+    for name in ("serve", "loadtest"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--host", default=DEFAULT_HOST)
+        cmd.add_argument("--port", type=int, default=DEFAULT_PORT)
+        cmd.add_argument("--graph", choices=("complete", "ai"), default="complete")
+        cmd.add_argument("--pdf", default="script.pdf")
+    serve_cmd = sub.choices["serve"]
+    serve_cmd.add_argument("--db", help="Persist conversations to this SQLite file")
+    serve_cmd.add_argument("--graph-file", help="Where to write the shared graph in worker mode")
+    for cmd in sub.choices.values():
+        cmd.add_argument("--workers", type=int, default=1, help="Worker processes (ports port..port+N-1)")
+    loadtest = sub.choices["loadtest"]
+    loadtest.add_argument("--conversations", type=int, default=1000)
+    loadtest.add_argument("--concurrency", type=int, default=200)
+    loadtest.add_argument("--max-steps", type=int, default=60)
+    loadtest.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        args = parser.parse_args(["serve"])
+    command = args.command
+    graph = load_script_graph(args.graph, args.pdf)
+
+    if command == "loadtest":
+        result = asyncio.run(load_test(graph, args.host, args.port, args.conversations,
+                                       args.concurrency, args.max_steps, args.seed, args.workers))
+        print(json.dumps(result, indent=2))
+        return 0
+
+    if args.workers > 1:
+        print(f"Serving {len(graph)} questions on ports {args.port}-{args.port + args.workers - 1}")
+        serve_workers(graph, args.workers, args.host, args.port, args.graph_file, args.db)
+        return 0
+
+    store = None
+    if args.db:
+        from session_store import SessionStore
+        store = SessionStore(args.db)
+    print(f"Serving {len(graph)} questions on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(ConversationService(graph, store), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+"""Answer completion: a prefix trie of likely answers for every question.
+
+``ScriptGraph`` builds an ``AnswerTrie`` per node when it compiles, from the
+node's suggestions and the answers operators have most often given there
+(``SessionStore.answer_counts()``). Keys are canonical answers (see
+``answer_key``), so completion ignores case, quotes and spacing. The trie is
+compressed: an edge holds the whole run of characters up to the next branch,
+so a node with a handful of answers has a handful of trie nodes. Each trie
+node keeps its best completions, ranked by how often they were given and
+then in suggestion order, so a lookup is one walk down the typed prefix.
+
+Streamlit only reruns a text box on Enter, so the answer box completes in
+the browser: ``completion_page()`` embeds the current node's trie and walks
+it on each keystroke (debounced), carrying on from where the previous
+keystroke stopped while the text only grows.
+"""
+
+import functools
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from script_normalize import FOLD_TABLE, answer_key
+
+COMPLETIONS = 5
+DEBOUNCE_MS = 120
+
+
+class _TrieNode:
+    __slots__ = ("edges", "top")
+
+    def __init__(self, top: Tuple[str, ...]):
+        self.edges: Dict[str, Tuple[str, "_TrieNode"]] = {}  # first character -> (label, child)
+        self.top = top
+
+
+def completion_answers(suggestions: Sequence[str], counts: Optional[Dict[str, int]] = None) -> List[str]:
+    """Suggestions and historically common answers, most often given first, one per canonical key."""
+    ranked: Dict[str, Tuple[int, int, str]] = {}
+    for index, suggestion in enumerate(suggestions):
+        ranked.setdefault(answer_key(suggestion), (0, index, suggestion))
+    for answer, count in (counts or {}).items():
+        key = answer_key(answer)
+        if not key:
+            continue
+        given, index, text = ranked.get(key, (0, len(suggestions), answer))
+        ranked[key] = (given + count, index, text)
+    return [text for _, _, text in sorted(ranked.values(), key=lambda item: (-item[0], item[1]))]
+
+
+class AnswerTrie:
+    """Compressed prefix trie over one question's likely answers."""
+
+    def __init__(self, answers: Sequence[str], limit: int = COMPLETIONS):
+        entries = [(answer_key(answer), answer) for answer in answers]
+        self._root = self._build([entry for entry in entries if entry[0]], 0, limit)
+
+    def _build(self, entries: List[Tuple[str, str]], depth: int, limit: int) -> _TrieNode:
+        """Trie node for ``entries``, in rank order and sharing their first ``depth`` characters."""
+        node = _TrieNode(tuple(answer for _, answer in entries[:limit]))
+        groups: Dict[str, List[Tuple[str, str]]] = {}
+        for key, answer in entries:
+            if len(key) > depth:
+                groups.setdefault(key[depth], []).append((key, answer))
+        for first, group in groups.items():
+            label = os.path.commonprefix([key[depth:] for key, _ in group])
+            node.edges[first] = (label, self._build(group, depth + len(label), limit))
+        return node
+
+    def complete(self, prefix: str) -> Tuple[str, ...]:
+        """Best answers starting with ``prefix``, up to the trie's limit."""
+        key = answer_key(prefix)
+        node, depth = self._root, 0
+        while depth < len(key):
+            edge = node.edges.get(key[depth])
+            if edge is None:
+                return ()
+            label, child = edge
+            if key.startswith(label, depth):
+                node, depth = child, depth + len(label)
+            elif label.startswith(key[depth:]):
+                return child.top
+            else:
+                return ()
+        return node.top
+
+    def to_json(self) -> Any:
+        """Nested ``[top, {first character: [label, child]}]`` lists, as the completion page reads them."""
+        def dump(node: _TrieNode) -> Any:
+            return [node.top, {first: [label, dump(child)] for first, (label, child) in node.edges.items()}]
+        return dump(self._root)
+
+
+COMPLETION_TEMPLATE = """<!DOCTYPE html>
+<html><head><style>
+body {{ font-family: "Source Sans Pro", sans-serif; margin: 0; font-size: 0.9rem; }}
+#completions {{ display: flex; flex-wrap: wrap; gap: 0.4rem; }}
+button {{ background: #e8f4fd; color: #1e3c72; border: 1px solid #2a5298; border-radius: 1rem;
+          padding: 0.2rem 0.75rem; cursor: pointer; }}
+button:hover {{ background: #2a5298; color: white; }}
+</style></head><body>
+<div id="completions"></div>
+<script>
+"use strict";
+const TRIE = {trie};
+const LABEL = {label};
+const FOLD = {fold};
+const parentWindow = window.parent;
+const box = parentWindow.document.querySelector(`input[aria-label="${{LABEL}}"], textarea[aria-label="${{LABEL}}"]`);
+
+// Same as answer_key() in script_normalize.py
+function answerKey(text) {{
+  return Array.from(text.normalize("NFKC"), c => FOLD[c] ?? c).join("")
+    .toLowerCase().split(/\\s+/).filter(Boolean).join(" ")
+    .replace(/^["' ]+/, "").replace(/["'.,!? ]+$/, "");
+}}
+
+// Trie node reached by the last walk and the key it stood for; the next
+// walk carries on from it while the typed text only grows
+let walked = {{ key: "", node: TRIE, depth: 0 }};
+function complete(key) {{
+  let node = TRIE, depth = 0;
+  if (key.startsWith(walked.key)) {{
+    if (walked.node === null) return [];  // no answer starts with it, however it goes on
+    ({{ node, depth }} = walked);
+  }}
+  while (depth < key.length) {{
+    const edge = node[1][key[depth]];
+    if (!edge) {{ walked = {{ key: key, node: null, depth: 0 }}; return []; }}
+    const [label, child] = edge;
+    if (key.startsWith(label, depth)) {{
+      node = child;
+      depth += label.length;
+    }} else {{
+      walked = {{ key: key.slice(0, depth), node: node, depth: depth }};
+      return label.startsWith(key.slice(depth)) ? child[0] : [];
+    }}
+  }}
+  walked = {{ key: key, node: node, depth: depth }};
+  return node[0];
+}}
+
+function show(answers) {{
+  document.getElementById("completions").replaceChildren(...answers.map(answer => {{
+    const button = document.createElement("button");
+    button.textContent = answer;
+    button.addEventListener("click", () => fill(answer));
+    return button;
+  }}));
+}}
+
+// Set the value the way typing does, so Streamlit sees it
+function fill(answer) {{
+  const prototype = box instanceof parentWindow.HTMLTextAreaElement
+    ? parentWindow.HTMLTextAreaElement.prototype : parentWindow.HTMLInputElement.prototype;
+  Object.getOwnPropertyDescriptor(prototype, "value").set.call(box, answer);
+  box.dispatchEvent(new parentWindow.Event("input", {{ bubbles: true }}));
+  box.focus();
+  show([]);
+}}
+
+if (box) {{
+  const listening = new AbortController();
+  let timer = null;
+  box.addEventListener("input", () => {{
+    clearTimeout(timer);
+    timer = setTimeout(() => {{
+      const key = answerKey(box.value);
+      show(key ? complete(key).filter(answer => answerKey(answer) !== key) : []);
+    }}, {debounce});
+  }}, {{ signal: listening.signal }});
+  window.addEventListener("pagehide", () => listening.abort());
+}}
+</script>
+</body></html>"""
+
+
+@functools.lru_cache(maxsize=256)
+def completion_page(trie: AnswerTrie, input_label: str) -> str:
+    """Page that completes the answer box labelled ``input_label`` from ``trie`` as the operator types."""
+    return COMPLETION_TEMPLATE.format(
+        trie=json.dumps(trie.to_json(), ensure_ascii=False).replace("</", "<\\/"),
+        label=json.dumps(input_label),
+        fold=json.dumps({chr(code): value or "" for code, value in FOLD_TABLE.items()}),
+        debounce=DEBOUNCE_MS,
+    )
@@ -0,0 +1,435 @@
+"""Benchmark runner with a stored baseline and a regression gate.
+
+Each benchmark times a batch of operations per sample, after a few warmup
+samples that are thrown away, and is summarised by its median and
+interquartile range (IQR) per operation. Results are saved to a baseline
+JSON file. Later runs are compared against it, and the run fails when a
+median is slower than its baseline by more than the threshold and by more
+than the baseline's own noise (its IQR):
+
+    python3 script_bench.py --save-baseline bench_baseline.json   # on the reference machine
+    python3 script_bench.py --baseline bench_baseline.json --threshold 0.15
+
+Baselines are machine-specific; record one on the machine that runs the gate.
+
+``--strategies`` instead times every registered parse strategy on the
+script text, checks each graph with ``script_paths.validate_graph`` and
+names the fastest one that reads the text and whose graph has no problems.
+The curated graph, which ignores the text, is listed for reference.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from script_engine import Conversation, ScriptGraph, compile_script
+
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_WARMUP = 3
+DEFAULT_REPEAT = 15
+MIN_SAMPLE_SECONDS = 0.005   # short benchmarks loop until a sample lasts this long
+
+
+class Benchmark(NamedTuple):
+    """``setup()`` returns a function to time and the number of operations it runs."""
+    name: str
+    description: str
+    setup: Callable[[], Tuple[Callable[[], None], int]]
+
+
+class Result(NamedTuple):
+    """Seconds per operation over the repeated samples."""
+    median: float
+    q1: float
+    q3: float
+    samples: int
+
+    @property
+    def iqr(self) -> float:
+        return self.q3 - self.q1
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"median": self.median, "q1": self.q1, "q3": self.q3, "iqr": self.iqr, "samples": self.samples}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, float]) -> "Result":
+        return cls(data["median"], data["q1"], data["q3"], int(data["samples"]))
+
+
+def summarize(samples: List[float]) -> Result:
+    """Median and quartiles of ``samples``."""
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return Result(value, value, value, len(samples))
+    q1, median, q3 = statistics.quantiles(samples, n=4, method="inclusive")
+    return Result(median, q1, q3, len(samples))
+
+
+def measure(benchmark: Benchmark, warmup: int = DEFAULT_WARMUP, repeat: int = DEFAULT_REPEAT) -> Result:
+    run, operations = benchmark.setup()
+    started = time.perf_counter()
+    for _ in range(max(warmup, 1)):
+        run()
+    once = (time.perf_counter() - started) / max(warmup, 1)
+    loops = max(1, int(MIN_SAMPLE_SECONDS / once)) if once > 0 else 1
+    samples = []
+    # As timeit does, keep the collector from landing in some samples only
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(loops):
+                run()
+            samples.append((time.perf_counter() - started) / (loops * operations))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return summarize(samples)
+
+
+# -- benchmarks ------------------------------------------------------------
+
+def _complete_graph() -> ScriptGraph:
+    from script_api import load_script_graph
+    return load_script_graph()
+
+
+def _typed_answers(graph: ScriptGraph) -> List[Tuple[str, str]]:
+    """Exact edge answers plus the lower-cased and padded variants people type."""
+    answers = []
+    for question_id, node in graph.questions.items():
+        for answer in node["next_questions"]:
+            answers += [(question_id, answer), (question_id, answer.lower()), (question_id, f"{answer} I think")]
+    return answers
+
+
+def _setup_graph_load():
+    from script_questions import COMPLETE_SCRIPT
+    return (lambda: ScriptGraph(COMPLETE_SCRIPT)), 1
+
+
+def _setup_pdf_parse():
+    with open("script_text.txt", encoding="utf-8") as f:
+        text = f.read()
+    return (lambda: compile_script("ai-heuristic", text)), 1
+
+
+def _setup_pdf_extract():
+    from script_parsers import extract_pdf_text
+    return (lambda: extract_pdf_text("script.pdf")), 1
+
+
+def _setup_answer_match():
+    graph = _complete_graph()
+    answers = _typed_answers(graph)
+    match = graph.match
+
+    def run():
+        for question_id, answer in answers:
+            match(question_id, answer)
+    return run, len(answers)
+
+
+def _setup_submit_walk():
+    from script_paths import PathIndex
+
+    graph = _complete_graph()
+    index = PathIndex(graph)
+    hops = [answer for _, answer, _ in index.path(index.total // 2)]
+    conversation = Conversation(graph, history_capacity=len(hops) + 1)
+
+    def run():
+        conversation.reset_to_beginning()
+        for answer in hops:
+            conversation.submit_answer(answer)
+    return run, len(hops)
+
+
+def _setup_rerun():
+    """The engine and render work of one complete-app rerun, without Streamlit."""
+    from script_render import get_render_cache
+
+    graph = _complete_graph()
+    cache = get_render_cache(graph)
+    walk = [(question_id, node["suggestions"][0]) for question_id, node in graph.questions.items()
+            if node["suggestions"]]
+    conversation = Conversation(graph, history_capacity=len(walk) + 1)
+
+    def run():
+        conversation.reset_to_beginning()
+        for question_id, answer in walk:
+            conversation.current_question_id = question_id
+            rendered = cache.node(conversation.current_question_id)
+            cache.prefetch_page(rendered.question_id)
+            conversation.get_current_question()
+            for entry in conversation.conversation_history.recent(5):
+                graph.node(entry.question_id)
+            conversation.submit_answer(answer)
+    return run, len(walk)
+
+
+def _setup_synthetic_parse():
+    from script_parsers import parse_conversational_flow, split_lines
+    from script_synth import generate_script
+
+    text = generate_script(1000, seed=1).text
+    return (lambda: ScriptGraph(parse_conversational_flow(split_lines(text)), match_on="next_questions",
+                                sequential_fallback=True)), 1000
+
+
+def _setup_synthetic_match():
+    from script_parsers import parse_conversational_flow, split_lines
+    from script_synth import generate_script
+
+    script = generate_script(10000, seed=1)
+    graph = ScriptGraph(parse_conversational_flow(split_lines(script.text)), match_on="next_questions",
+                        sequential_fallback=True)
+    answers = [(question_id, typed) for question_id, transitions in script.expected.items()
+               for answer in transitions for typed in (answer, answer.upper())][:20000]
+    match = graph.match
+
+    def run():
+        for question_id, answer in answers:
+            match(question_id, answer)
+    return run, len(answers)
+
+
+def _setup_synthetic_search():
+    from script_synth import generate_script
+
+    graph = compile_script("ai-heuristic", generate_script(20000, seed=1, first_id=100).text)
+    index = graph.search_index
+    rng = random.Random(0)
+    # Prefixes of common and rare words, numeric ids and two-word queries, as typed
+    queries = ["ha", "th", "q1", "q17", "would say", "think wo"]
+    for _ in range(200):
+        first, second = rng.sample(index.indexed_words(), 2)
+        queries += [first[:rng.randint(2, 5)], f"{first} {second[:3]}"]
+    search = index.search
+
+    def run():
+        for query in queries:
+            search(query)
+    return run, len(queries)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {b.name: b for b in (
+    Benchmark("graph_load", "Compile the curated script graph", _setup_graph_load),
+    Benchmark("pdf_parse", "Normalize and parse the extracted PDF text into a graph", _setup_pdf_parse),
+    Benchmark("pdf_extract", "Extract text from script.pdf (needs PyPDF2)", _setup_pdf_extract),
+    Benchmark("answer_match", "ScriptGraph.match on exact and typed answers", _setup_answer_match),
+    Benchmark("submit_walk", "submit_answer along one start -> complete path", _setup_submit_walk),
+    Benchmark("rerun", "Render-cache lookup, prefetch page, cursor and submit per node", _setup_rerun),
+    Benchmark("synthetic_parse", "Parse a 1,000-question synthetic script, per question", _setup_synthetic_parse),
+    Benchmark("synthetic_match", "ScriptGraph.match in a 10,000-question synthetic graph", _setup_synthetic_match),
+    Benchmark("synthetic_search", "SearchIndex.search in a 20,000-question synthetic graph", _setup_synthetic_search),
+)}
+
+
+def run_benchmarks(names: Optional[List[str]] = None, warmup: int = DEFAULT_WARMUP,
+                   repeat: int = DEFAULT_REPEAT) -> Tuple[Dict[str, Result], Dict[str, str]]:
+    """Measure the named benchmarks (all by default). Returns (results, skipped with reasons)."""
+    results, skipped = {}, {}
+    for name in names or list(BENCHMARKS):
+        try:
+            results[name] = measure(BENCHMARKS[name], warmup, repeat)
+        except (ImportError, OSError) as e:
+            skipped[name] = str(e)
+    return results, skipped
+
+
+class StrategyResult(NamedTuple):
+    """Compile time of one parse strategy and what is wrong with its graph."""
+    name: str
+    result: Result
+    questions: int
+    problems: List[str]
+    reads_text: bool
+
+
+def benchmark_strategies(text: str, names: Optional[List[str]] = None, warmup: int = DEFAULT_WARMUP,
+                         repeat: int = DEFAULT_REPEAT) -> List[StrategyResult]:
+    """Time compiling ``text`` with each parse strategy (all by default) and validate the graphs."""
+    from script_parsers import STRATEGIES
+    from script_paths import validate_graph
+
+    results = []
+    for name in names or list(STRATEGIES):
+        graph = compile_script(name, text)
+        benchmark = Benchmark(name, STRATEGIES[name].description,
+                              lambda name=name: ((lambda: compile_script(name, text)), 1))
+        results.append(StrategyResult(name, measure(benchmark, warmup, repeat), len(graph),
+                                      validate_graph(graph), STRATEGIES[name].uses_pdf))
+    return results
+
+
+def pick_strategy(results: List[StrategyResult]) -> Optional[str]:
+    """The fastest strategy that parses the text into a graph with no problems, if any."""
+    valid = [r for r in results if r.reads_text and not r.problems]
+    return min(valid, key=lambda r: r.result.median).name if valid else None
+
+
+def format_strategies(results: List[StrategyResult]) -> str:
+    lines = [f"{'strategy':<22} {'compile':>12} {'IQR':>11} {'questions':>9}  problems"]
+    for r in sorted(results, key=lambda r: r.result.median):
+        lines.append(f"{r.name:<22} {_format_time(r.result.median):>12} {_format_time(r.result.iqr):>11} "
+                     f"{r.questions:>9}  {len(r.problems) or 'none'}{'' if r.reads_text else ' (ignores the text)'}")
+        lines += [f"    {problem}" for problem in r.problems[:5]]
+    chosen = pick_strategy(results)
+    lines.append(f"Fastest correct strategy: {chosen or 'none'}")
+    return "\n".join(lines)
+
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: Result
+    current: Result
+    threshold: float
+
+    @property
+    def change(self) -> float:
+        return self.current.median / self.baseline.median - 1 if self.baseline.median else 0.0
+
+    @property
+    def regressed(self) -> bool:
+        # Only the baseline's spread counts as noise, so a noisy run cannot hide a slowdown
+        return (self.change > self.threshold
+                and self.current.median - self.baseline.median > self.baseline.iqr)
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Result], threshold: float = DEFAULT_THRESHOLD,
+            thresholds: Optional[Dict[str, float]] = None) -> List[Comparison]:
+    """Compare each result that has a baseline entry; per-benchmark thresholds override ``threshold``."""
+    thresholds = thresholds or {}
+    return [Comparison(name, baseline[name], result, thresholds.get(name, threshold))
+            for name, result in results.items() if name in baseline]
+
+
+def missing_from(results: Dict[str, Result], baseline: Dict[str, Result],
+                 names: Optional[List[str]] = None) -> List[str]:
+    """Baseline entries this run should have measured but did not: skipped, or no longer defined."""
+    return [name for name in baseline if name not in results and (names is None or name in names)]
+
+
+def save_baseline(path: str, results: Dict[str, Result]) -> None:
+    payload = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        "benchmarks": {name: result.to_dict() for name, result in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def load_baseline(path: str) -> Dict[str, Result]:
+    with open(path, encoding="utf-8") as f:
+        return {name: Result.from_dict(data) for name, data in json.load(f)["benchmarks"].items()}
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def format_results(results: Dict[str, Result], skipped: Dict[str, str],
+                   comparisons: List[Comparison] = ()) -> str:
+    by_name = {c.name: c for c in comparisons}
+    lines = [f"{'benchmark':<14} {'median/op':>12} {'IQR':>11}  vs baseline"]
+    for name, result in results.items():
+        line = f"{name:<14} {_format_time(result.median):>12} {_format_time(result.iqr):>11}"
+        comparison = by_name.get(name)
+        if comparison is not None:
+            verdict = "REGRESSED" if comparison.regressed else "ok"
+            line += f"  {comparison.change:+.1%} ({verdict}, limit +{comparison.threshold:.0%})"
+        lines.append(line)
+    lines += [f"{name:<14} skipped: {reason}" for name, reason in skipped.items()]
+    return "\n".join(lines)
+
+
+def _parse_thresholds(values: List[str]) -> Dict[str, float]:
+    thresholds = {}
+    for value in values:
+        name, _, limit = value.partition("=")
+        thresholds[name] = float(limit)
+    return thresholds
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmarks and gate on regressions against a baseline.")
+    parser.add_argument("--only", help="Comma-separated benchmarks to run: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--baseline", help="Compare against this baseline JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown of a median, as a fraction (default 0.10)")
+    parser.add_argument("--threshold-for", action="append", default=[], metavar="NAME=FRACTION",
+                        help="Per-benchmark threshold, e.g. rerun=0.25")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="Pass even if baseline benchmarks were skipped or no longer exist")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write this run's results as a baseline")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--strategies", action="store_true",
+                        help="Time and validate every parse strategy instead, and pick the fastest correct one")
+    parser.add_argument("--script-text", default="script_text.txt", help="Script text for --strategies")
+    args = parser.parse_args(argv)
+
+    if args.strategies:
+        with open(args.script_text, encoding="utf-8") as f:
+            strategies = benchmark_strategies(f.read(), warmup=args.warmup, repeat=args.repeat)
+        if args.json:
+            print(json.dumps({
+                "strategies": {r.name: {**r.result.to_dict(), "questions": r.questions, "problems": r.problems}
+                               for r in strategies},
+                "chosen": pick_strategy(strategies),
+            }, indent=2))
+        else:
+            print(format_strategies(strategies))
+        return 0 if pick_strategy(strategies) else 1
+
+    names = args.only.split(",") if args.only else None
+    unknown = [name for name in names or () if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    results, skipped = run_benchmarks(names, args.warmup, args.repeat)
+    comparisons, missing = [], []
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        comparisons = compare(results, baseline, args.threshold, _parse_thresholds(args.threshold_for))
+        missing = missing_from(results, baseline, names)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+
+    if args.json:
+        print(json.dumps({
+            "results": {name: result.to_dict() for name, result in results.items()},
+            "skipped": skipped,
+            "comparisons": {c.name: {"change": c.change, "threshold": c.threshold, "regressed": c.regressed}
+                            for c in comparisons},
+            "missing": missing,
+        }, indent=2))
+    else:
+        print(format_results(results, skipped, comparisons))
+    status = 0
+    if missing:
+        print(f"Not measured but in the baseline: {', '.join(missing)}", file=sys.stderr)
+        status = 0 if args.allow_missing else 1
+    regressed = [c.name for c in comparisons if c.regressed]
+    if regressed:
+        print(f"Regressed: {', '.join(regressed)}", file=sys.stderr)
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
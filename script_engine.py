@@ -0,0 +1,395 @@
+"""Headless conversation engine: question graph, cursor and answer matcher.
+
+Nothing here imports Streamlit or PyPDF2 at module level, so tests, the CLI
+tools and API servers can load it in a few milliseconds. The Streamlit apps
+are thin shells over the classes below.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from script_autocomplete import AnswerTrie, completion_answers
+from script_history import ANSWER_IDS, DEFAULT_CAPACITY, ConversationHistory, HistoryEntry
+from script_metrics import ANSWERS, CURRENT_SECONDS, PARSE_SECONDS, SUBMIT_SECONDS
+from script_normalize import answer_key, normalize_text
+from script_profiling import profiled
+from script_search import SearchIndex
+
+START = "start"
+COMPLETE = "complete"
+NODE_FIELDS = ("question_id", "question", "suggestions", "context")
+
+
+# Metric children bound once; recording is then a couple of attribute lookups
+_ANSWER_RESULTS = {kind: ANSWERS.labels(kind) for kind in ("exact", "fuzzy", "sequential", "miss")}
+_MISSES = _ANSWER_RESULTS["miss"]
+
+
+class Match(NamedTuple):
+    """Result of matching an answer against the current question."""
+    answer: str         # canonical answer recorded in the history
+    next_question: str
+    kind: str           # "exact", "fuzzy" or "sequential"
+
+
+class ScriptGraph:
+    """Immutable, compiled question graph shared by every conversation.
+
+    Compiling adds ``question_id`` and a default ``context`` to each node and
+    precomputes the canonical answer keys (``answer_key``) the matcher
+    compares against.
+    ``match_on`` picks which list drives fuzzy matching and in what order:
+    the node's ``"suggestions"`` or its ``"next_questions"`` keys. With
+    ``sequential_fallback`` an unmatched answer on a numbered question moves
+    on to the next number, as the PDF-parsed variants do. ``start`` is where
+    conversations begin and reset to. ``search_index`` finds questions by
+    the words of their question and context, and ``completions`` holds each
+    node's answer trie, built from its suggestions and ``common_answers``
+    (question id -> answer -> times given).
+    """
+
+    def __init__(self, questions: Dict[str, Dict[str, Any]], match_on: str = "suggestions",
+                 sequential_fallback: bool = False, source_text: str = "", start: str = START,
+                 common_answers: Optional[Dict[str, Dict[str, int]]] = None):
+        if match_on not in ("suggestions", "next_questions"):
+            raise ValueError(f"Unknown match_on: {match_on}")
+        self.source_text = source_text
+        self.start = start
+        self.questions: Dict[str, Dict[str, Any]] = {}
+        self._fuzzy: Dict[str, Tuple[Tuple[str, str, str], ...]] = {}
+        self._canonical: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self._fallback: Dict[str, Optional[str]] = {}
+        self._json: Dict[str, str] = {}
+        self.completions: Dict[str, AnswerTrie] = {}
+        common_answers = common_answers or {}
+
+        for question_id, node in questions.items():
+            next_questions = dict(node.get("next_questions", {}))
+            self.questions[question_id] = {
+                "question_id": question_id,
+                "question": node["question"],
+                "suggestions": list(node.get("suggestions", [])),
+                "next_questions": next_questions,
+                "context": node.get("context", ""),
+            }
+            keys = node.get("suggestions", []) if match_on == "suggestions" else next_questions
+            fuzzy = self._fuzzy[question_id] = tuple(
+                (answer_key(key), key, next_questions[key]) for key in keys if key in next_questions
+            )
+            canonical: Dict[str, Tuple[str, str]] = {}
+            for key_canonical, key, next_question in fuzzy:
+                canonical.setdefault(key_canonical, (key, next_question))
+            for key in next_questions:
+                ANSWER_IDS.intern(key)  # matched answers are recorded as these keys
+            self._canonical[question_id] = canonical
+            self.completions[question_id] = AnswerTrie(
+                completion_answers(self.questions[question_id]["suggestions"], common_answers.get(question_id))
+            )
+
+        for question_id in self.questions:
+            following = str(int(question_id) + 1) if question_id.isdigit() else None
+            self._fallback[question_id] = (
+                following if sequential_fallback and following in self.questions else None
+            )
+        self.search_index = SearchIndex(self.questions)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def __contains__(self, question_id: str) -> bool:
+        return question_id in self.questions
+
+    def node(self, question_id: str) -> Optional[Dict[str, Any]]:
+        """Return a compiled node, or None for an unknown id."""
+        return self.questions.get(question_id)
+
+    def node_json(self, question_id: str) -> Optional[str]:
+        """JSON for a node's public fields, serialized once per node."""
+        payload = self._json.get(question_id)
+        if payload is None and question_id in self.questions:
+            node = self.questions[question_id]
+            payload = json.dumps({key: node[key] for key in NODE_FIELDS})
+            self._json[question_id] = payload
+        return payload
+
+    def matcher_entry(self, question_id: str) -> Tuple[Tuple[Tuple[str, str, str], ...], Optional[str]]:
+        """Precomputed fuzzy keys and sequential fallback of a node, for serializers."""
+        return self._fuzzy[question_id], self._fallback[question_id]
+
+    def complete(self, question_id: str, prefix: str) -> Tuple[str, ...]:
+        """Likely answers at ``question_id`` that start with ``prefix``, best first."""
+        trie = self.completions.get(question_id)
+        return trie.complete(prefix) if trie is not None else ()
+
+    def match(self, question_id: str, answer: str) -> Optional[Match]:
+        """Work out where ``answer`` leads from ``question_id``, if anywhere."""
+        node = self.questions.get(question_id)
+        if node is None:
+            return None
+
+        # Exact match first
+        next_question = node["next_questions"].get(answer)
+        if next_question is not None:
+            return Match(answer, next_question, "exact")
+
+        # Then the same answer up to case, quotes and spacing, so "no" is not taken for "Not sure"
+        canonical = answer_key(answer)
+        # Punctuation alone ("?", "...") has an empty key, which every key contains
+        if canonical:
+            entry = self._canonical[question_id].get(canonical)
+            if entry is not None:
+                return Match(entry[0], entry[1], "fuzzy")
+
+            # Then a canonical substring match either way round
+            for key_canonical, key, next_question in self._fuzzy[question_id]:
+                if canonical in key_canonical or key_canonical in canonical:
+                    return Match(key, next_question, "fuzzy")
+
+        following = self._fallback[question_id]
+        if following is not None:
+            return Match(answer, following, "sequential")
+        return None
+
+
+_graphs: Dict[Hashable, ScriptGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def load_graph(key: Hashable, build: Callable[[], ScriptGraph], rebuild: bool = False) -> ScriptGraph:
+    """Return the process-wide graph for ``key``, building it on first use.
+
+    ``rebuild`` builds it again and replaces the cached graph; sessions
+    already holding the old one keep it.
+    """
+    graph = None if rebuild else _graphs.get(key)
+    if graph is None:
+        with _graphs_lock:
+            graph = None if rebuild else _graphs.get(key)
+            if graph is None:
+                graph = build()
+                _graphs[key] = graph
+    return graph
+
+
+class Conversation:
+    """One conversation's cursor and history over a shared ScriptGraph."""
+
+    def __init__(self, graph: Optional[ScriptGraph] = None, history_capacity: int = DEFAULT_CAPACITY):
+        self.graph = graph
+        self.current_question_id = graph.start if graph is not None else START
+        self.conversation_history = ConversationHistory(history_capacity)
+        self.store = None
+        self.session_id = None
+        self.offloaded = False
+
+    @property
+    def questions(self) -> Dict[str, Dict[str, Any]]:
+        """All questions of the loaded graph, keyed by id."""
+        return self.graph.questions if self.graph is not None else {}
+
+    @property
+    def start_id(self) -> str:
+        """The question conversations begin and reset to."""
+        return self.graph.start if self.graph is not None else START
+
+    def get_current_question(self) -> Optional[Dict[str, Any]]:
+        """Get the current question."""
+        if self.graph is None:
+            return None
+        started = time.perf_counter()
+        node = self.graph.node(self.current_question_id)
+        CURRENT_SECONDS.observe(time.perf_counter() - started)
+        return node
+
+    def submit_answer(self, answer: str) -> bool:
+        """Submit an answer and move to the next question."""
+        if self.graph is None:
+            return False
+        with profiled("submit_answer"):
+            started = time.perf_counter()
+            match = self.graph.match(self.current_question_id, answer)
+            if match is None:
+                _MISSES.inc()
+                SUBMIT_SECONDS.observe(time.perf_counter() - started)
+                return False
+            self._advance(match.answer, match.next_question)
+            _ANSWER_RESULTS[match.kind].inc()
+            SUBMIT_SECONDS.observe(time.perf_counter() - started)
+            return True
+
+    def _advance(self, answer: str, next_question: str) -> None:
+        """Record the answer and move to the next question."""
+        entry = self.conversation_history.append(self.current_question_id, answer, next_question)
+        self.current_question_id = next_question
+        if self.store is not None:
+            self.store.record_step(self.session_id, entry)
+
+    def attach_store(self, store, session_id: str, create: bool = True) -> bool:
+        """Persist this conversation to the store, resuming it if it was saved before.
+
+        With ``create=False`` a session that was never saved (or was deleted)
+        is left alone: nothing is attached or written.
+        """
+        saved = store.resume(session_id, self.conversation_history.capacity)
+        if saved is None or saved.question_id not in self.questions:
+            if create:
+                self.store = store
+                self.session_id = session_id
+                store.save_cursor(session_id, self.current_question_id)
+            return False
+        self.store = store
+        self.session_id = session_id
+        self.current_question_id = saved.question_id
+        self.conversation_history.load(saved.history)
+        return True
+
+    def go_back(self) -> bool:
+        """Undo the last answer, returning to the question it was given for."""
+        return self.jump_to_step(len(self.conversation_history) - 1)
+
+    def jump_to_step(self, step: int) -> bool:
+        """Return to the question asked at ``step``, discarding that answer and later ones."""
+        entry = self.conversation_history.get(step)
+        if entry is None:
+            return False
+        self.conversation_history.truncate(step)
+        self.current_question_id = entry.question_id
+        if self.store is not None:
+            self.store.truncate_session(self.session_id, step, entry.question_id)
+        return True
+
+    def go_to_start(self) -> None:
+        """Jump back to the opening question, keeping the history."""
+        self.go_to_question(self.start_id)
+
+    def go_to_question(self, question_id: str) -> bool:
+        """Jump straight to ``question_id``, keeping the history."""
+        if question_id not in self.questions:
+            return False
+        self.current_question_id = question_id
+        if self.store is not None:
+            self.store.save_cursor(self.session_id, self.current_question_id)
+        return True
+
+    def reset_to_beginning(self) -> None:
+        """Reset the conversation to the beginning."""
+        self.current_question_id = self.start_id
+        self.conversation_history.clear()
+        if self.store is not None:
+            self.store.clear_session(self.session_id, self.current_question_id)
+
+    def offload(self) -> None:
+        """Release the buffered history of an idle session.
+
+        The graph is shared and stays cached; the history can be rebuilt from
+        the session store. Callers check ``offloaded`` and build a new analyzer.
+        """
+        self.conversation_history.clear()
+        self.offloaded = True
+
+    def get_conversation_history(self) -> List[HistoryEntry]:
+        """Get the conversation history still held in memory."""
+        return list(self.conversation_history)
+
+    def get_script_summary(self) -> str:
+        """Get a summary of the loaded script."""
+        return f"Script loaded with {len(self.questions)} questions. Current: {self.current_question_id}"
+
+
+def compile_script(strategy_name: str, text: str = "",
+                   common_answers: Optional[Dict[str, Dict[str, int]]] = None) -> ScriptGraph:
+    """Compile ``text`` into a graph with the named parse strategy, normalizing it first if the strategy reads it."""
+    from script_parsers import get_strategy, split_lines
+
+    strategy = get_strategy(strategy_name)
+    if strategy.uses_pdf:
+        text = normalize_text(text)
+    return ScriptGraph(
+        strategy.parse(split_lines(text)),
+        match_on=strategy.match_on,
+        sequential_fallback=strategy.sequential_fallback,
+        source_text=text,
+        start=strategy.start,
+        common_answers=common_answers,
+    )
+
+
+class ScriptAnalyzer(Conversation):
+    """Conversation over a graph compiled from the PDF by a registered parse strategy.
+
+    Graphs go into the process-wide cache under the strategy name and, for
+    strategies that read the PDF, its path and modification time.
+    ``common_answers`` only counts when this analyzer is the one that builds
+    the cached graph.
+    """
+
+    strategy = "ai-heuristic"
+
+    def __init__(self, pdf_path: str, strategy: Optional[str] = None,
+                 common_answers: Optional[Dict[str, Dict[str, int]]] = None):
+        super().__init__()
+        self.pdf_path = pdf_path
+        if strategy is not None:
+            self.strategy = strategy
+        self.common_answers = common_answers
+        self.parse_error = ""
+
+    def attach_store(self, store, session_id: str, create: bool = True) -> bool:
+        """As ``Conversation.attach_store``, tagging the session with this analyzer's strategy."""
+        resumed = super().attach_store(store, session_id, create)
+        if self.store is store:
+            store.tag_session(session_id, self.strategy)
+        return resumed
+
+    def fresh_copy(self) -> "ScriptAnalyzer":
+        """A new analyzer, without a graph yet, that builds the same graph as this one."""
+        return type(self)(self.pdf_path, strategy=self.strategy, common_answers=self.common_answers)
+
+    @property
+    def raw_text(self) -> str:
+        """Text extracted from the PDF."""
+        return self.graph.source_text if self.graph is not None else ""
+
+    def parse_script(self) -> bool:
+        """Parse the PDF script with this analyzer's strategy."""
+        from script_parsers import get_strategy
+
+        uses_pdf = get_strategy(self.strategy).uses_pdf
+        key: Hashable = self.strategy
+        try:
+            if uses_pdf:
+                key = (self.strategy, os.path.abspath(self.pdf_path), os.path.getmtime(self.pdf_path))
+            # A profiled parse builds the graph for real instead of reusing the cached one
+            with profiled("parse_script") as profiling, PARSE_SECONDS.labels(self.strategy).time():
+                self.graph = load_graph(key, self._build_graph, rebuild=profiling)
+        except Exception as e:
+            self.parse_error = f"Error reading PDF: {str(e)}"
+            return False
+        if self.current_question_id not in self.graph:
+            self.current_question_id = self.graph.start
+        return True
+
+    def _build_graph(self) -> ScriptGraph:
+        from script_parsers import extract_pdf_text, get_strategy
+
+        if not get_strategy(self.strategy).uses_pdf:
+            return compile_script(self.strategy, common_answers=self.common_answers)
+        text = extract_pdf_text(self.pdf_path)
+        if not text.strip():
+            raise ValueError("no text found")
+        return compile_script(self.strategy, text, self.common_answers)
+
+
+class CompleteScriptAnalyzer(ScriptAnalyzer):
+    """Conversation over the curated script v4.1 graph."""
+
+    strategy = "curated"
+
+
+class AIScriptAnalyzer(ScriptAnalyzer):
+    """Conversation over a graph parsed from the PDF by the AI-heuristic parser."""
+
+    strategy = "ai-heuristic"
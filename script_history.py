@@ -0,0 +1,226 @@
+"""Bounded, compact conversation history for the script analyzers."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+DEFAULT_CAPACITY = 64
+MAX_ANSWER_IDS = 1 << 16
+SPILL_DIR = os.path.join(tempfile.gettempdir(), "scriptanalyzer-history")
+
+
+class HistoryEntry(NamedTuple):
+    """One answered step, resolved back to strings."""
+    step: int
+    question_id: str
+    answer: str
+    next_question: str
+    timestamp: float
+
+
+class _Interner:
+    """Process-wide string <-> small integer table, holding at most ``limit`` strings."""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, value: str) -> int:
+        """Id of ``value``, added if new; -1 if it is new and the table is full."""
+        key = self._ids.get(value)
+        if key is not None:
+            return key
+        with self._lock:
+            key = self._ids.get(value)
+            if key is None:
+                if self.limit is not None and len(self._values) >= self.limit:
+                    return -1
+                key = len(self._values)
+                self._values.append(value)
+                self._ids[value] = key
+        return key
+
+    def find(self, value: str) -> int:
+        """Id of ``value`` if it is already interned, else -1."""
+        return self._ids.get(value, -1)
+
+    def lookup(self, key: int) -> str:
+        return self._values[key]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# Shared by every session in the process, so a record only carries integers.
+# Entries are never released, so only strings from compiled graphs go in:
+# node ids, and the answers ``ScriptGraph`` registers. Other answers are free
+# text, kept in the history's own slot until it is reused.
+NODE_IDS = _Interner()
+ANSWER_IDS = _Interner(MAX_ANSWER_IDS)
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ConversationHistory:
+    """Ring buffer of (question, answer, next question, timestamp) records.
+
+    Records are stored as integer ids in preallocated arrays, so memory per
+    session is fixed by ``capacity``. Answers the graph never registered are
+    held as strings in a slot list of the same size. When the buffer fills, the oldest
+    quarter is appended to a JSON-lines spill file and dropped from memory.
+    A spill file the history created itself (under ``SPILL_DIR``) is deleted
+    on ``clear()`` or ``load()`` and when the history is garbage collected;
+    one passed in as ``spill_path`` belongs to the caller and is kept.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, spill_path: Optional[str] = None):
+        if capacity < 4:
+            raise ValueError("capacity must be at least 4")
+        self.capacity = capacity
+        self._spill_path = spill_path
+        self._spill_start = 0
+        self._remove_spill: Optional[weakref.finalize] = None  # set while we own the spill file
+        self._questions = array("l", [0]) * capacity
+        self._answers = array("l", [0]) * capacity   # -1: the answer is in _free_text
+        self._free_text: List[Optional[str]] = [None] * capacity
+        self._next = array("l", [0]) * capacity
+        self._times = array("d", [0]) * capacity
+        self._head = 0      # slot of the oldest buffered record
+        self._size = 0      # records currently buffered
+        self._spilled = 0   # records written to the spill file
+
+    @property
+    def spill_path(self) -> Optional[str]:
+        """Path of the spill file, or None if nothing has spilled yet."""
+        return self._spill_path
+
+    @property
+    def spilled(self) -> int:
+        """Number of records no longer held in memory."""
+        return self._spilled
+
+    def __len__(self) -> int:
+        return self._spilled + self._size
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def append(self, question_id: str, answer: str, next_question: str,
+               timestamp: Optional[float] = None) -> HistoryEntry:
+        """Record one answered step and return it."""
+        if self._size == self.capacity:
+            self._spill(self.capacity // 4)
+        slot = (self._head + self._size) % self.capacity
+        self._questions[slot] = NODE_IDS.intern(question_id)
+        key = self._answers[slot] = ANSWER_IDS.find(answer)
+        self._free_text[slot] = answer if key < 0 else None
+        self._next[slot] = NODE_IDS.intern(next_question)
+        self._times[slot] = time.time() if timestamp is None else timestamp
+        self._size += 1
+        return self._entry(self._size - 1)
+
+    def _entry(self, offset: int) -> HistoryEntry:
+        slot = (self._head + offset) % self.capacity
+        return HistoryEntry(
+            self._spilled + offset,
+            NODE_IDS.lookup(self._questions[slot]),
+            self._free_text[slot] if self._answers[slot] < 0 else ANSWER_IDS.lookup(self._answers[slot]),
+            NODE_IDS.lookup(self._next[slot]),
+            self._times[slot],
+        )
+
+    def _spill(self, count: int) -> None:
+        """Move the oldest ``count`` buffered records to the spill file."""
+        if self._spill_path is None:
+            os.makedirs(SPILL_DIR, exist_ok=True)
+            self._spill_path = os.path.join(SPILL_DIR, f"{uuid.uuid4().hex}.jsonl")
+            self._remove_spill = weakref.finalize(self, _remove_file, self._spill_path)
+        lines = [json.dumps(list(self._entry(i))) + "\n" for i in range(count)]
+        with open(self._spill_path, "a", encoding="utf-8") as spill:
+            spill.writelines(lines)
+        self._head = (self._head + count) % self.capacity
+        self._size -= count
+        self._spilled += count
+
+    @property
+    def first_buffered_step(self) -> int:
+        """Oldest step still in memory; earlier steps can't be revisited."""
+        return self._spilled
+
+    def get(self, step: int) -> Optional[HistoryEntry]:
+        """Return a buffered step by its number, or None if it isn't buffered."""
+        offset = step - self._spilled
+        if 0 <= offset < self._size:
+            return self._entry(offset)
+        return None
+
+    def truncate(self, step: int) -> bool:
+        """Drop ``step`` and every later record; only buffered steps can be dropped."""
+        offset = step - self._spilled
+        if not 0 <= offset < self._size:
+            return False
+        for dropped in range(offset, self._size):
+            self._free_text[(self._head + dropped) % self.capacity] = None
+        self._size = offset
+        return True
+
+    def __iter__(self) -> Iterator[HistoryEntry]:
+        """Iterate over the buffered (most recent) records, oldest first."""
+        for offset in range(self._size):
+            yield self._entry(offset)
+
+    def recent(self, count: int) -> List[HistoryEntry]:
+        """Return up to ``count`` of the latest records, oldest first."""
+        count = min(count, self._size)
+        return [self._entry(offset) for offset in range(self._size - count, self._size)]
+
+    def iter_all(self) -> Iterator[HistoryEntry]:
+        """Iterate over every record since the last clear, spilled ones included."""
+        if self._spilled and self._spill_path:
+            with open(self._spill_path, "r", encoding="utf-8") as spill:
+                spill.seek(self._spill_start)
+                for line in spill:
+                    yield HistoryEntry(*json.loads(line))
+        yield from self
+
+    def load(self, entries: Iterable[HistoryEntry]) -> None:
+        """Replace the buffer with the latest of ``entries`` (e.g. from a store).
+
+        Steps before the first loaded entry count as spilled, but they live in
+        whatever the entries came from rather than in this history's file.
+        """
+        self.clear()
+        self._spill_path = None
+        self._spill_start = 0
+        entries = list(entries)[-self.capacity:]
+        if entries:
+            self._spilled = entries[0].step
+        for entry in entries:
+            self.append(entry.question_id, entry.answer, entry.next_question, entry.timestamp)
+
+    def clear(self) -> None:
+        """Forget all records, deleting our own spill file. A caller's file is only skipped past."""
+        if self._remove_spill is not None:
+            self._remove_spill()
+            self._remove_spill = None
+            self._spill_path = None
+            self._spill_start = 0
+        elif self._spill_path and os.path.exists(self._spill_path):
+            self._spill_start = os.path.getsize(self._spill_path)
+        self._head = 0
+        self._size = 0
+        self._spilled = 0
+        self._free_text = [None] * self.capacity
@@ -0,0 +1,266 @@
+"""Concurrent conversation load-test harness.
+
+Runs N simulated conversations as random walks over each node's
+``next_questions``, mixing button answers (an exact suggestion) with typed
+answers (a lower-cased, shortened or padded suggestion, or occasionally
+something unrecognised). Three targets are supported:
+
+    engine     in-process Conversation objects
+    api        a running ``script_api.py`` server
+    streamlit  the Streamlit app through ``streamlit.testing.v1.AppTest``
+
+and the report gives throughput plus p50/p95/p99 latency per operation.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from script_api import DEFAULT_HOST, DEFAULT_PORT, ApiClient, load_script_graph, percentile
+from script_engine import COMPLETE, Conversation, ScriptGraph
+
+TARGETS = ("engine", "api", "streamlit")
+_TYPED_FILLERS = ("I think", "probably", "yeah")
+
+
+def choose_answer(node: Dict, rng: random.Random, typed_ratio: float) -> Tuple[str, bool]:
+    """Pick the next answer for ``node``. Returns (answer, typed)."""
+    options = list(node["next_questions"]) or list(node["suggestions"]) or ["Yes"]
+    answer = rng.choice(options)
+    if rng.random() >= typed_ratio:
+        return answer, False
+    style = rng.randrange(4)
+    if style == 0:
+        return answer.lower(), True
+    if style == 1:
+        return answer.split()[0] if " " in answer else answer.upper(), True
+    if style == 2:
+        return f"{answer} {rng.choice(_TYPED_FILLERS)}", True
+    return "hmm let me think", True
+
+
+class LatencyRecorder:
+    """Thread-safe latency samples grouped by operation name."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.answers = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def add(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(operation, []).append(seconds)
+
+    def answered(self, accepted: bool) -> None:
+        with self._lock:
+            self.answers += 1
+            if not accepted:
+                self.rejected += 1
+
+    def report(self, target: str, conversations: int, elapsed: float) -> Dict:
+        operations = {}
+        for operation, samples in sorted(self.samples.items()):
+            operations[operation] = {
+                "count": len(samples),
+                "per_second": len(samples) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+                "mean_ms": statistics.fmean(samples) * 1000,
+            }
+        return {
+            "target": target,
+            "conversations": conversations,
+            "seconds": elapsed,
+            "answers": self.answers,
+            "rejected": self.rejected,
+            "answers_per_second": self.answers / elapsed if elapsed else 0.0,
+            "operations": operations,
+        }
+
+
+# -- engine ----------------------------------------------------------------
+
+async def _engine_walk(graph: ScriptGraph, recorder: LatencyRecorder, rng: random.Random,
+                       max_steps: int, typed_ratio: float) -> None:
+    conversation = Conversation(graph)
+    for _ in range(max_steps):
+        started = time.perf_counter()
+        node = conversation.get_current_question()
+        recorder.add("get_current_question", time.perf_counter() - started)
+        if node is None or conversation.current_question_id == COMPLETE:
+            return
+        answer, _ = choose_answer(node, rng, typed_ratio)
+        started = time.perf_counter()
+        accepted = conversation.submit_answer(answer)
+        recorder.add("submit_answer", time.perf_counter() - started)
+        recorder.answered(accepted)
+        await asyncio.sleep(0)  # Interleave with the other conversations
+
+
+async def _run_engine(graph, recorder, conversations, concurrency, max_steps, typed_ratio, seed):
+    semaphore = asyncio.Semaphore(concurrency)
+    rng = random.Random(seed)
+
+    async def one():
+        async with semaphore:
+            await _engine_walk(graph, recorder, rng, max_steps, typed_ratio)
+
+    await asyncio.gather(*(one() for _ in range(conversations)))
+
+
+# -- api -------------------------------------------------------------------
+
+async def _api_walk(client: ApiClient, graph: ScriptGraph, recorder: LatencyRecorder,
+                    rng: random.Random, max_steps: int, typed_ratio: float) -> None:
+    started = time.perf_counter()
+    _, state = await client.request("POST", "/conversations")
+    recorder.add("start", time.perf_counter() - started)
+    conversation_id = state["conversation_id"]
+    for _ in range(max_steps):
+        started = time.perf_counter()
+        _, state = await client.request("GET", f"/conversations/{conversation_id}")
+        recorder.add("get_current_question", time.perf_counter() - started)
+        if state["complete"] or state["question"] is None:
+            break
+        answer, _ = choose_answer(graph.node(state["question"]["question_id"]), rng, typed_ratio)
+        started = time.perf_counter()
+        _, state = await client.request("POST", f"/conversations/{conversation_id}/answers", {"answer": answer})
+        recorder.add("submit_answer", time.perf_counter() - started)
+        recorder.answered(state["accepted"])
+    await client.request("DELETE", f"/conversations/{conversation_id}")
+
+
+async def _run_api(graph, recorder, conversations, concurrency, max_steps, typed_ratio, seed,
+                   host, port, workers):
+    rng = random.Random(seed)
+    remaining = [conversations]
+
+    async def client_loop(index: int):
+        client = ApiClient(host, port + index % max(workers, 1))
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                await _api_walk(client, graph, recorder, rng, max_steps, typed_ratio)
+        finally:
+            await client.close()
+
+    await asyncio.gather(*(client_loop(i) for i in range(min(concurrency, conversations))))
+
+
+# -- streamlit -------------------------------------------------------------
+
+def _find_button(app, label: str):
+    for button in app.button:
+        if button.label == label:
+            return button
+    return None
+
+
+def _streamlit_walk(app_path: str, graph: ScriptGraph, recorder: LatencyRecorder, seed: int,
+                    max_steps: int, typed_ratio: float) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    app = AppTest.from_file(app_path, default_timeout=60)
+    started = time.perf_counter()
+    app.run()
+    recorder.add("first_run", time.perf_counter() - started)
+    for _ in range(max_steps):
+        analyzer = app.session_state["analyzer"]
+        question_id = analyzer.current_question_id
+        if question_id == COMPLETE:
+            return
+        answer, typed = choose_answer(graph.node(question_id), rng, typed_ratio)
+        started = time.perf_counter()
+        suggestion = None if typed else _find_button(app, answer)
+        if suggestion is not None:
+            suggestion.click().run()
+        else:
+            app.text_input(key=f"answer_{question_id}").input(answer)
+            _find_button(app, "Submit Answer").click().run()
+        recorder.add("rerun", time.perf_counter() - started)
+        recorder.answered(app.session_state["analyzer"].current_question_id != question_id)
+
+
+def _run_streamlit(graph, recorder, conversations, concurrency, max_steps, typed_ratio, seed, app_path):
+    # Keep simulated sessions out of the real session database
+    os.environ.setdefault("SCRIPT_ANALYZER_DB", os.path.join(tempfile.mkdtemp(), "loadtest.db"))
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(_streamlit_walk, app_path, graph, recorder, seed + i, max_steps, typed_ratio)
+            for i in range(conversations)
+        ]
+        for future in futures:
+            future.result()
+
+
+def run_load_test(target: str = "engine", conversations: int = 100, concurrency: int = 20,
+                  max_steps: int = 60, typed_ratio: float = 0.3, seed: int = 0,
+                  graph: Optional[ScriptGraph] = None, host: str = DEFAULT_HOST,
+                  port: int = DEFAULT_PORT, workers: int = 1,
+                  app_path: str = "script_analyzer_complete.py") -> Dict:
+    """Run one load test and return its report."""
+    if target not in TARGETS:
+        raise ValueError(f"Unknown target: {target}")
+    graph = graph or load_script_graph()
+    recorder = LatencyRecorder()
+    started = time.perf_counter()
+    if target == "engine":
+        asyncio.run(_run_engine(graph, recorder, conversations, concurrency, max_steps, typed_ratio, seed))
+    elif target == "api":
+        asyncio.run(_run_api(graph, recorder, conversations, concurrency, max_steps, typed_ratio, seed,
+                             host, port, workers))
+    else:
+        _run_streamlit(graph, recorder, conversations, concurrency, max_steps, typed_ratio, seed, app_path)
+    return recorder.report(target, conversations, time.perf_counter() - started)
+
+
+def format_report(report: Dict) -> str:
+    """Human-readable summary table."""
+    lines = [
+        f"Target: {report['target']}  conversations: {report['conversations']}  "
+        f"time: {report['seconds']:.2f}s",
+        f"Answers: {report['answers']} ({report['rejected']} rejected), "
+        f"{report['answers_per_second']:.0f}/s",
+        f"{'operation':<22}{'count':>9}{'per sec':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for name, op in report["operations"].items():
+        lines.append(f"{name:<22}{op['count']:>9}{op['per_second']:>11.0f}"
+                     f"{op['p50_ms']:>10.3f}{op['p95_ms']:>10.3f}{op['p99_ms']:>10.3f}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the conversation engine, API or Streamlit app.")
+    parser.add_argument("--target", choices=TARGETS, default="engine")
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--max-steps", type=int, default=60)
+    parser.add_argument("--typed-ratio", type=float, default=0.3, help="Share of answers typed instead of clicked")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="API worker count (ports port..port+N-1)")
+    parser.add_argument("--app", default="script_analyzer_complete.py", help="Streamlit app to drive")
+    parser.add_argument("--json", action="store_true", help="Print the raw JSON report")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.target, args.conversations, args.concurrency, args.max_steps,
+                           args.typed_ratio, args.seed, host=args.host, port=args.port,
+                           workers=args.workers, app_path=args.app)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
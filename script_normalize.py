@@ -0,0 +1,45 @@
+"""One-time normalization of script text at ingest.
+
+Text extracted from the PDF has curly quotes, ellipsis and dash characters,
+doubled periods ("Sure..", "Yes.."), spaces before punctuation ("heaven and
+hell ,") and trailing spaces. ``normalize_text()`` folds all of it once,
+when a script is compiled, so the parsers and the graph only ever see
+canonical text. ``answer_key()`` is the canonical form answers are matched
+on; graph keys are computed with it at compile time and typed answers go
+through a cache, so matching does not normalize the same string twice.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Applied after NFKC, which already turns "…" into "..." and no-break spaces into spaces
+FOLD_TABLE = str.maketrans({
+    "‘": "'", "’": "'", "‚": "'", "‛": "'", "′": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "−": "-",
+    "\t": " ", "\r": None,
+    "\u00ad": None, "\u200b": None, "\u200c": None, "\u200d": None, "\ufeff": None,  # soft hyphen, zero widths, BOM
+})
+_TRAILING_SPACE = re.compile(r" +$", re.MULTILINE)
+_SPACE_BEFORE_PUNCTUATION = re.compile(r"(?<=\S) +(?=[,.;:?!](?:\s|$))", re.MULTILINE)
+_DOUBLED_PERIOD = re.compile(r"(?<=\w)\.\.(?![.\w])")
+_SPACES = re.compile(r"(?<=\S) {2,}")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of extracted script text; lines are kept."""
+    text = unicodedata.normalize("NFKC", text).translate(FOLD_TABLE)
+    text = _DOUBLED_PERIOD.sub(".", text)
+    text = _SPACE_BEFORE_PUNCTUATION.sub("", text)
+    text = _SPACES.sub(" ", text)
+    return _TRAILING_SPACE.sub("", text)
+
+
+@lru_cache(maxsize=4096)
+def answer_key(answer: str) -> str:
+    """Matching key of an answer: folded, lower-cased and single-spaced, without surrounding quotes or closing punctuation."""
+    if not answer.isascii():
+        answer = unicodedata.normalize("NFKC", answer).translate(FOLD_TABLE)
+    key = " ".join(answer.lower().split())
+    return key.lstrip("\"' ").rstrip("\"'.,!? ")
@@ -0,0 +1,719 @@
+"""Parsers that turn a PDF script into a question graph.
+
+Each parser is registered as a named ``ParseStrategy``; ``ScriptAnalyzer``
+in script_engine compiles whichever one an app asks for:
+
+- ``sequential``: every numbered question leads to the next, with the
+  opening branches of the script hard-coded.
+- ``conversational-regex``: answers and "If they say X proceed to QY"
+  directives read line by line under each question; starts at question 1.
+- ``ai-heuristic``: directives read from each question's joined text, then
+  the script's known flow laid over them, with the building analogy added.
+- ``accurate-heuristic``: the same extraction with a simpler per-question
+  answer table and no loops back.
+- ``curated``: the hand-written script v4.1 graph; the PDF is not read.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+QUESTION_LINE = re.compile(r'^(\d+)[\.\)]\s*(.+)$')
+SIMPLE_ANSWER = re.compile(r'^([A-Za-z\s]+)\.$')
+FLOW_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    # "If they say X, proceed to QY" patterns
+    r'If they (?:say|answer) ["\']?([^"\',]+)["\']?[,\s]*(?:proceed to|go to|ask them question|SKIP question)\s*Q?(\d+)',
+    # "If they say X, go to question Y"
+    r'If they say ([^,]+),\s*(?:go to question|ask them question)\s*(\d+)',
+    # "If X, proceed to QY"
+    r'If ([^,]+),\s*proceed to Q?(\d+)',
+    # Specific answer patterns like "Heaven" -> Q4, "Hell" -> Q17
+    r'["\']([^"\']+)["\'] proceed to Q?(\d+)',
+    r'If they (?:answer|say) ["\']([^"\']+)["\'] proceed to Q?(\d+)',
+)]
+BASIC_ANSWERS = ("Yes", "No", "Not sure")
+# Every flow pattern needs one of these, so other sentences skip the patterns
+DIRECTIVE_HINT = re.compile(r'proceed to|go to|ask them question|SKIP question', re.IGNORECASE)
+# A sentence ends at . ? or ! (plus closing quotes or brackets) before a capital or an opening quote
+SENTENCE_BREAK = re.compile(r'[.?!]+["\')\]]*\s+(?=["\'(\[A-Z])')
+SENTENCE_END = re.compile(r'[.?!]+["\')\]]*$')
+MAX_SENTENCE_LINES = 6
+
+
+def extract_pdf_text(pdf_path: str) -> str:
+    """Extract text content from a PDF file, one page per block."""
+    import PyPDF2  # Imported lazily so the engine loads without it
+
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
+    return text
+
+
+def split_lines(text: str) -> List[str]:
+    """Split text into stripped, non-empty lines."""
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+
+def iter_sentences(lines: Iterable[str], max_lines: int = MAX_SENTENCE_LINES) -> Iterator[str]:
+    """Join soft-wrapped ``lines`` into sentences, yielding each as soon as it is complete.
+
+    Only the unfinished sentence is held. One that is still open after
+    ``max_lines`` lines is yielded as it stands, so a missing full stop
+    cannot swallow the rest of the text.
+    """
+    pending = ""
+    held = 0
+    for line in lines:
+        pending = f"{pending} {line}" if pending else line
+        held += 1
+        start = 0
+        for match in SENTENCE_BREAK.finditer(pending):
+            yield pending[start:match.end()].rstrip()
+            start = match.end()
+        if start:
+            pending = pending[start:]
+            held = 1
+        if held >= max_lines or SENTENCE_END.search(pending):
+            yield pending
+            pending = ""
+            held = 0
+    if pending:
+        yield pending
+
+
+def extract_flow(text: str, next_questions: Dict[str, str], suggestions: List[str],
+                 max_length: Optional[int] = None) -> None:
+    """Add the answer -> question directives found in ``text``, best given one sentence."""
+    if not DIRECTIVE_HINT.search(text):
+        return
+    for pattern in FLOW_PATTERNS:
+        for match in pattern.finditer(text):
+            answer = match.group(1).strip().strip('"\'')
+            next_q = match.group(2).strip()
+            if answer and next_q and (max_length is None or len(answer) < max_length):
+                next_questions[answer] = next_q
+                if answer not in suggestions:
+                    suggestions.append(answer)
+
+
+def question_blocks(lines: List[str]) -> Dict[str, List[str]]:
+    """The lines under each numbered question, starting with its own text."""
+    blocks: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in lines:
+        question_match = QUESTION_LINE.match(line)
+        if question_match:
+            current = blocks[question_match.group(1)] = [question_match.group(2)]
+        elif current is not None and line:
+            current.append(line)
+    return blocks
+
+
+def _opening() -> Dict[str, Any]:
+    return {
+        "question": "Hey I have a question for you",
+        "suggestions": ["Sure"],
+        "next_questions": {"Sure": "1"},
+    }
+
+
+def _completion() -> Dict[str, Any]:
+    return {
+        "question": "Thank you for going through the script with me. That's all the questions I have.",
+        "suggestions": ["Start over"],
+        "next_questions": {"Start over": "start"},
+    }
+
+
+# -- sequential ------------------------------------------------------------
+
+# Answers of the script's opening questions; later ones fall back to BASIC_ANSWERS
+_OPENING_FLOW: Dict[str, Dict[str, str]] = {
+    "1": {"Not sure": "2", "Heaven and hell": "4", "Reincarnation": "2", "Nothing": "2"},
+    "2": {"Yes": "3", "No": "5"},
+    "3": {"Yes": "4", "No": "7"},
+    "4": {"Yes": "5", "No": "5"},
+    "5": {"Yes": "6", "No": "6"},
+}
+
+
+def parse_sequential(lines: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Every numbered question leads to the next one."""
+    questions: Dict[str, Dict[str, Any]] = {"start": _opening()}
+    numbered = [match.groups() for match in map(QUESTION_LINE.match, lines) if match]
+    for q_num, q_text in numbered:
+        next_questions = dict(_OPENING_FLOW.get(q_num) or dict.fromkeys(BASIC_ANSWERS, str(int(q_num) + 1)))
+        questions[q_num] = {
+            "question": q_text,
+            "suggestions": list(next_questions),
+            "next_questions": next_questions,
+        }
+
+    # The question numbered like the question count ends the script
+    last_q = str(len(numbered))
+    if last_q in questions:
+        questions[last_q]["next_questions"] = dict.fromkeys(BASIC_ANSWERS, "complete")
+    questions["complete"] = _completion()
+    return questions
+
+
+# -- conversational regex --------------------------------------------------
+
+def parse_conversational_regex(lines: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Answers and directives read sentence by sentence under each numbered question."""
+    questions: Dict[str, Dict[str, Any]] = {}
+    for q_id, content in question_blocks(lines).items():
+        suggestions: List[str] = []
+        next_questions: Dict[str, str] = {}
+        own_lines = set(content)
+        for sentence in iter_sentences(content[1:]):
+            # Simple answers, like "Yes.", "No.", "Not sure.", stand on a line of their own
+            simple_answer = SIMPLE_ANSWER.match(sentence) if sentence in own_lines else None
+            if simple_answer:
+                answer = simple_answer.group(1).strip()
+                if answer not in suggestions:
+                    suggestions.append(answer)
+            extract_flow(sentence, next_questions, suggestions)
+        questions[q_id] = {
+            "question": content[0],
+            "suggestions": suggestions,
+            "next_questions": next_questions,
+        }
+    return questions
+
+
+# -- AI heuristic ----------------------------------------------------------
+
+def parse_conversational_flow(lines: List[str]) -> Dict[str, Dict[str, Any]]:
+    """AI-powered parsing of conversational script flow."""
+    questions: Dict[str, Dict[str, Any]] = {}
+    
+    # Start with the opening line
+    questions["start"] = {
+        "question": "Hey I have a question for you",
+        "suggestions": ["Sure"],
+        "next_questions": {"Sure": "1"},
+        "context": "Opening question to start the conversation"
+    }
+    
+    # AI-powered flow analysis for each question
+    for q_id, content in question_blocks(lines).items():
+        question_text = content[0]
+        
+        # Analyze the question content to extract flow logic
+        suggestions, next_questions, context = _analyze_question_flow(q_id, question_text, content)
+        
+        questions[q_id] = {
+            "question": question_text,
+            "suggestions": suggestions,
+            "next_questions": next_questions,
+            "context": context
+        }
+    
+    # Add the building analogy question for non-believers (not in original PDF but needed for flow)
+    questions["2b"] = {
+        "question": "Would you agree that the building I'm sitting in had a builder, or did it just appear by itself? This building is evidence that it needed a builder. In the same way, when we look at the universe we know it had a beginning therefore it had to have a creator for it. The universe is proof of a universe maker. Buildings need builders, creation needs a creator agree?",
+        "suggestions": ["Yes", "No", "I agree", "I don't agree"],
+        "next_questions": {
+            "Yes": "3",
+            "I agree": "3",
+            "No": "5",  # If they still don't believe, go to question 5
+            "I don't agree": "5"
+        },
+        "context": "Uses building analogy to establish belief in a creator"
+    }
+    
+    # Add completion state
+    questions["complete"] = {
+        "question": "Thank you for going through the script with me. That's all the questions I have.",
+        "suggestions": ["Start over"],
+        "next_questions": {"Start over": "start"},
+        "context": "Conversation completed"
+    }
+    
+    return questions
+
+
+def _analyze_question_flow(q_id: str, question_text: str, content: List[str]) -> Tuple[List[str], Dict[str, str], str]:
+    """Analyze a single question to extract suggestions and flow logic."""
+    content_text = " ".join(content)
+    
+    suggestions = []
+    next_questions = {}
+    context = ""
+    
+    # Extract simple answers from the content
+    simple_answers = re.findall(r'^([A-Za-z\s]+)\.$', content_text, re.MULTILINE)
+    for answer in simple_answers:
+        clean_answer = answer.strip()
+        if clean_answer and len(clean_answer) < 50:
+            suggestions.append(clean_answer)
+    
+    for sentence in iter_sentences(content):
+        extract_flow(sentence, next_questions, suggestions, max_length=100)
+    
+    # AI-powered analysis based on question content and context
+    if q_id == "1":  # "What do you think happens to us after we die?"
+        suggestions = ["Not sure", "Heaven and hell", "Reincarnation", "Nothing"]
+        next_questions = {
+            "Not sure": "2",
+            "Heaven and hell": "4",  # Skip to question 4
+            "Reincarnation": "2",
+            "Nothing": "2"
+        }
+        context = "Opening question about afterlife beliefs"
+        
+    elif q_id == "2":  # "Do you believe there's a God?"
+        suggestions = ["Yes", "No"]
+        next_questions = {
+            "Yes": "3",
+            "No": "2b"  # If they don't believe, go to building analogy
+        }
+        context = "Establishes belief in God - if no, use building analogy"
+        
+    elif q_id == "2b":  # Building analogy for non-believers
+        suggestions = ["Yes", "No", "I agree", "I don't agree"]
+        next_questions = {
+            "Yes": "3",
+            "I agree": "3",
+            "No": "5",  # If they still don't believe, go to question 5
+            "I don't agree": "5"
+        }
+        context = "Uses building analogy to establish belief in a creator"
+        
+    elif q_id == "3":  # "Since we know there is a God..."
+        suggestions = ["Yes", "No"]
+        next_questions = {
+            "Yes": "4",
+            "No": "7"  # If they say no, go to question 7
+        }
+        context = "Tests if they think they're a good person"
+        
+    elif q_id == "4":  # "Have you ever told a lie?"
+        suggestions = ["Yes", "No"]
+        next_questions = {
+            "Yes": "5",
+            "No": "5"  # Continue to next question
+        }
+        context = "First sin question - everyone has lied"
+        
+    elif q_id == "5":  # "Have you ever used bad language?"
+        suggestions = ["Yes", "No"]
+        next_questions = {
+            "Yes": "6",
+            "No": "6"
+        }
+        context = "Second sin question - bad language"
+        
+    elif q_id == "6":  # "Have you ever been angry or disrespected someone?"
+        suggestions = ["Yes", "No"]
+        next_questions = {
+            "Yes": "7",
+            "No": "7"
+        }
+        context = "Third sin question - anger/disrespect"
+        
+    elif q_id == "7":  # "We've all done these things..."
+        suggestions = ["Guilty", "Innocent"]
+        next_questions = {
+            "Guilty": "8",
+            "Innocent": "8"
+        }
+        context = "Establishes guilt before God"
+        
+    elif q_id == "8":  # "So would we deserve a reward or punishment?"
+        suggestions = ["Punishment", "Reward"]
+        next_questions = {
+            "Punishment": "9",
+            "Reward": "9"
+        }
+        context = "Establishes we deserve punishment"
+        
+    elif q_id == "9":  # "Does that sound like a place in Heaven or Hell?"
+        suggestions = ["Hell", "Heaven"]
+        next_questions = {
+            "Hell": "10",
+            "Heaven": "10"
+        }
+        context = "Establishes we deserve Hell"
+        
+    elif q_id == "10":  # "So how do you think you could avoid your Hell punishment?"
+        suggestions = ["Not sure", "Good works", "Prayer", "Ask for forgiveness"]
+        next_questions = {
+            "Not sure": "11",
+            "Good works": "11",
+            "Prayer": "11",
+            "Ask for forgiveness": "11"
+        }
+        context = "Shows human solutions don't work"
+        
+    elif q_id == "11":  # "What we need is someone else who would take the punishment for us..."
+        suggestions = ["Nothing", "Zero", "0%"]
+        next_questions = {
+            "Nothing": "12",
+            "Zero": "12",
+            "0%": "12"
+        }
+        context = "Introduces the concept of substitutionary atonement"
+        
+    elif q_id == "12":  # "So if you have no more Hell punishment, where will you go when you die?"
+        suggestions = ["Heaven", "Hell"]
+        next_questions = {
+            "Heaven": "13",
+            "Hell": "12"  # Loop back if they don't understand
+        }
+        context = "Establishes Heaven as destination"
+        
+    elif q_id == "13":  # "That was Jesus, that's why he died on the cross..."
+        suggestions = ["Yes", "No", "I understand"]
+        next_questions = {
+            "Yes": "14",
+            "No": "14",
+            "I understand": "14"
+        }
+        context = "Introduces Jesus as the solution"
+        
+    elif q_id == "14":  # "So if Jesus does that for you, where do you go when you die?"
+        suggestions = ["Heaven", "Hell"]
+        next_questions = {
+            "Heaven": "15",
+            "Hell": "14"  # Loop back if they don't understand
+        }
+        context = "Confirms Heaven through Jesus"
+        
+    elif q_id == "15":  # "So why would God let you into heaven?"
+        suggestions = ["Because Jesus paid for my sins", "Because of Jesus", "I don't know"]
+        next_questions = {
+            "Because Jesus paid for my sins": "16",
+            "Because of Jesus": "16",
+            "I don't know": "16"
+        }
+        context = "Establishes Jesus as the only reason for Heaven"
+        
+    elif q_id == "16":  # "Now he offers this to us as a free gift..."
+        suggestions = ["Yes", "I understand", "No"]
+        next_questions = {
+            "Yes": "17",
+            "I understand": "17",
+            "No": "17"
+        }
+        context = "Explains salvation as a free gift"
+        
+    elif q_id == "17":  # "So if you trust that Jesus has paid for all of your sins now and tomorrow you sin 5 more times..."
+        suggestions = ["Heaven", "Hell"]
+        next_questions = {
+            "Heaven": "18",
+            "Hell": "17"  # Loop back to explain
+        }
+        context = "Explains that future sins are also covered"
+        
+    elif q_id == "18":  # "and why heaven?"
+        suggestions = ["Because Jesus paid for my sins", "Because of Jesus"]
+        next_questions = {
+            "Because Jesus paid for my sins": "19",
+            "Because of Jesus": "19"
+        }
+        context = "Reinforces Jesus as the only reason"
+        
+    elif q_id == "19":  # "But if you don't trust Jesus paid for your sins, where would you end up?"
+        suggestions = ["Hell", "Heaven"]
+        next_questions = {
+            "Hell": "20",
+            "Heaven": "19"  # Loop back to explain
+        }
+        context = "Shows consequence of not trusting Jesus"
+        
+    elif q_id == "20":  # "..and since you don't want to go to Hell, WHEN should you start trusting that Jesus has paid for your sins?"
+        suggestions = ["Now", "Today", "Right now"]
+        next_questions = {
+            "Now": "21",
+            "Today": "21",
+            "Right now": "21"
+        }
+        context = "Urges immediate decision"
+        
+    elif q_id == "21":  # "So if you stood before God right now and he asked you 'Why should I let you into Heaven?' what would you say?"
+        suggestions = ["Because Jesus paid for my sins", "Because of Jesus", "I don't know"]
+        next_questions = {
+            "Because Jesus paid for my sins": "22",
+            "Because of Jesus": "22",
+            "I don't know": "21"  # Loop back to explain
+        }
+        context = "Tests understanding with God's question"
+        
+    elif q_id == "22":  # "Now, imagine a friend of yours says they are going to heaven because they are a good person..."
+        suggestions = ["Hell", "Heaven"]
+        next_questions = {
+            "Hell": "23",
+            "Heaven": "22"  # Loop back to explain
+        }
+        context = "Tests understanding with friend scenario"
+        
+    elif q_id == "23":  # "But another friend comes to you and says 'I'm going to heaven because of two reasons...'"
+        suggestions = ["Hell", "Heaven"]
+        next_questions = {
+            "Hell": "24",
+            "Heaven": "23"  # Loop back to explain
+        }
+        context = "Tests understanding of mixed trust"
+        
+    elif q_id == "24":  # "So, on a scale of 0 -100%, how sure are you that you will go to Heaven when you die?"
+        suggestions = ["100%", "76-100%", "51-75%", "26-50%", "0-25%"]
+        next_questions = {
+            "100%": "25",
+            "76-100%": "25",
+            "51-75%": "25",
+            "26-50%": "25",
+            "0-25%": "25"
+        }
+        context = "Tests confidence level"
+        
+    elif q_id == "25":  # "So, does doing good things play any part in getting you to heaven?"
+        suggestions = ["No", "Yes"]
+        next_questions = {
+            "No": "26",
+            "Yes": "25"  # Loop back to explain
+        }
+        context = "Clarifies good works don't save"
+        
+    elif q_id == "26":  # "Do you need to ask for forgiveness to go to Heaven?"
+        suggestions = ["No", "Yes"]
+        next_questions = {
+            "No": "27",
+            "Yes": "26"  # Loop back to explain
+        }
+        context = "Clarifies forgiveness doesn't save"
+        
+    elif q_id == "27":  # "Do you need to be baptized to go to Heaven?"
+        suggestions = ["No", "Yes"]
+        next_questions = {
+            "No": "28",
+            "Yes": "27"  # Loop back to explain
+        }
+        context = "Clarifies baptism doesn't save"
+        
+    elif q_id == "28":  # "So if these things don't get us to Heaven, why do we do good things?"
+        suggestions = ["Because we are thankful", "I don't know"]
+        next_questions = {
+            "Because we are thankful": "29",
+            "I don't know": "28"  # Loop back to explain
+        }
+        context = "Explains motivation for good works"
+        
+    elif q_id == "29":  # "Do you know how you can find out more about Jesus?"
+        suggestions = ["The Bible", "Yes", "No"]
+        next_questions = {
+            "The Bible": "30",
+            "Yes": "30",
+            "No": "30"
+        }
+        context = "Points to Bible for growth"
+        
+    elif q_id == "30":  # "Yep! Do you have a bible and do you read it much?"
+        suggestions = ["Yes", "No", "Sometimes"]
+        next_questions = {
+            "Yes": "31",
+            "No": "31",
+            "Sometimes": "31"
+        }
+        context = "Assesses Bible reading habits"
+        
+    elif q_id == "31":  # "Think of it like this, If you ate food only once a week, would you be very strong?"
+        suggestions = ["No", "Yes"]
+        next_questions = {
+            "No": "32",
+            "Yes": "32"
+        }
+        context = "Uses food analogy for Bible reading"
+        
+    elif q_id == "32":  # "So if the bible is our spiritual food, how often do you think you should read the bible then to be strong spiritually?"
+        suggestions = ["Everyday", "Daily", "Every day", "Yes"]
+        next_questions = {
+            "Everyday": "34",
+            "Daily": "34",
+            "Every day": "34",
+            "Yes": "34"
+        }
+        context = "Encourages daily Bible reading"
+        
+        
+    elif q_id == "34":  # "Do they teach the same message we've spoken about here to be saved from our sins?"
+        suggestions = ["Yes", "No", "Not sure"]
+        next_questions = {
+            "Yes": "35",
+            "No": "35",
+            "Not sure": "35"
+        }
+        context = "Assesses church teaching"
+        
+    elif q_id == "35":  # "Also, think of your family and friends, if you asked them, 'What's the reason you'll go to heaven?' what would their answer be?"
+        suggestions = ["I'm not sure", "Because of Jesus", "Good works", "I don't know"]
+        next_questions = {
+            "I'm not sure": "36",
+            "Because of Jesus": "36",
+            "Good works": "36",
+            "I don't know": "36"
+        }
+        context = "Considers family and friends"
+        
+    elif q_id == "36":  # "And since you don't want them to go to hell, how could you help them not to end up there?"
+        suggestions = ["Tell them about the Gospel", "Share this message", "I don't know"]
+        next_questions = {
+            "Tell them about the Gospel": "37",
+            "Share this message": "37",
+            "I don't know": "37"
+        }
+        context = "Encourages sharing the Gospel"
+        
+    elif q_id == "37":  # "So let me ask you, What if God asked you this 'Why should I not send you to hell for all the sins you've done', how would you answer?"
+        suggestions = ["Because Jesus paid for my sins", "Because of Jesus", "I don't know"]
+        next_questions = {
+            "Because Jesus paid for my sins": "38",
+            "Because of Jesus": "38",
+            "I don't know": "37"  # Loop back to explain
+        }
+        context = "Final test of understanding"
+        
+    elif q_id == "38":  # "Now, remember at the beginning of this chat, what DID you think was getting you to heaven?"
+        suggestions = ["Doing good", "Good works", "Asking for forgiveness", "I don't know"]
+        next_questions = {
+            "Doing good": "39",
+            "Good works": "39",
+            "Asking for forgiveness": "39",
+            "I don't know": "39"
+        }
+        context = "Reflects on initial beliefs"
+        
+    elif q_id == "39":  # "But if you died right now, where will you end up?"
+        suggestions = ["Heaven", "Hell"]
+        next_questions = {
+            "Heaven": "complete",
+            "Hell": "39"  # Loop back to explain
+        }
+        context = "Final confirmation of salvation"
+    
+    # If no specific flow found, create basic flow
+    if not next_questions:
+        next_q_id = str(int(q_id) + 1)
+        basic_answers = ["Yes", "No", "Not sure"]
+        for answer in basic_answers:
+            next_questions[answer] = next_q_id
+            if answer not in suggestions:
+                suggestions.append(answer)
+    
+    return suggestions, next_questions, context
+
+
+# -- accurate heuristic ----------------------------------------------------
+
+# Answers offered per question; each leads to the next question unless redirected below
+_ACCURATE_ANSWERS: Dict[str, List[str]] = {
+    "1": ["Not sure", "Heaven and hell", "Reincarnation", "Nothing"],
+    "2": ["Yes", "No"],
+    "3": ["Yes", "No"],
+    "4": ["Yes", "No"],
+    "5": ["Yes", "No"],
+    "6": ["Yes", "No"],
+    "7": ["Yes", "No"],
+    "8": ["Yes", "No"],
+    "9": ["Heaven", "Hell", "Not sure"],
+    "10": ["I don't know", "Good works", "Prayer", "Not sure"],
+    "12": ["Heaven", "I don't know", "Not sure"],
+    "14": ["Heaven", "I don't know", "Not sure"],
+    "15": ["Because of Jesus", "I don't know", "Not sure"],
+    "18": ["Because of Jesus", "I don't know", "Not sure"],
+    "20": ["Now", "Later", "I don't know"],
+    "24": ["0-25%", "26-50%", "51-75%", "76-100%", "I don't know"],
+    "28": ["I don't know", "Tradition", "Not sure"],
+    "32": ["Daily", "Weekly", "Monthly", "Not sure"],
+    "36": ["Share this message", "I don't know", "Not sure"],
+    "37": ["Because of Jesus", "I don't know", "Not sure"],
+    "38": ["Heaven", "Hell", "I don't know"],
+}
+_ACCURATE_JUMPS: Dict[str, Dict[str, str]] = {
+    "1": {"Heaven and hell": "4"},
+    "2": {"No": "5"},
+    "3": {"No": "7"},
+}
+_ACCURATE_LAST = "38"
+_ACCURATE_IDS = frozenset(str(number) for number in range(1, int(_ACCURATE_LAST) + 1))
+
+
+def parse_accurate(lines: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Directives read from each question's joined text, then the answer table laid over them."""
+    questions: Dict[str, Dict[str, Any]] = {"start": _opening()}
+    for q_id, content in question_blocks(lines).items():
+        content_text = " ".join(content)
+        suggestions = [answer.strip() for answer in SIMPLE_ANSWER.findall(content_text)
+                       if answer.strip() and len(answer.strip()) < 50]
+        next_questions: Dict[str, str] = {}
+        for sentence in iter_sentences(content):
+            extract_flow(sentence, next_questions, suggestions, max_length=100)
+
+        if q_id in _ACCURATE_IDS:
+            following = "complete" if q_id == _ACCURATE_LAST else str(int(q_id) + 1)
+            suggestions = list(_ACCURATE_ANSWERS.get(q_id, BASIC_ANSWERS))
+            jumps = _ACCURATE_JUMPS.get(q_id, {})
+            next_questions = {answer: jumps.get(answer, following) for answer in suggestions}
+        elif not next_questions:
+            next_questions = dict.fromkeys(BASIC_ANSWERS, str(int(q_id) + 1))
+            suggestions += [answer for answer in BASIC_ANSWERS if answer not in suggestions]
+
+        questions[q_id] = {
+            "question": content[0],
+            "suggestions": suggestions,
+            "next_questions": next_questions,
+        }
+    questions["complete"] = _completion()
+    return questions
+
+
+# -- curated ---------------------------------------------------------------
+
+def parse_curated(lines: List[str]) -> Dict[str, Dict[str, Any]]:
+    """The hand-written script v4.1 graph; ``lines`` is ignored."""
+    from script_questions import COMPLETE_SCRIPT
+    return COMPLETE_SCRIPT
+
+
+# -- registry --------------------------------------------------------------
+
+class ParseStrategy(NamedTuple):
+    """How to turn a script's lines into a graph, and how that graph is matched."""
+    name: str
+    description: str
+    parse: Callable[[List[str]], Dict[str, Dict[str, Any]]]
+    start: str = "start"
+    match_on: str = "next_questions"
+    sequential_fallback: bool = True
+    uses_pdf: bool = True
+
+
+STRATEGIES: Dict[str, ParseStrategy] = {}
+
+
+def register_strategy(strategy: ParseStrategy) -> ParseStrategy:
+    """Make ``strategy`` available to ScriptAnalyzer by name, replacing any of the same name."""
+    STRATEGIES[strategy.name] = strategy
+    return strategy
+
+
+def get_strategy(name: str) -> ParseStrategy:
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown parse strategy: {name}") from None
+
+
+for _strategy in (
+    ParseStrategy("sequential", "Numbered questions in order, opening branches hard-coded", parse_sequential),
+    ParseStrategy("conversational-regex", "Answers and directives read line by line", parse_conversational_regex,
+                  start="1"),
+    ParseStrategy("ai-heuristic", "Directives plus the script's known flow and loops", parse_conversational_flow),
+    ParseStrategy("accurate-heuristic", "Directives plus a per-question answer table", parse_accurate),
+    ParseStrategy("curated", "Hand-written script v4.1 graph", parse_curated,
+                  match_on="suggestions", sequential_fallback=False, uses_pdf=False),
+):
+    register_strategy(_strategy)
@@ -0,0 +1,351 @@
+"""Exhaustive path analysis of a question graph.
+
+Routes from the graph's start to ``complete`` are counted, and the
+transitions behind them are checked through ``Conversation.submit_answer``:
+
+- Edges that close a loop, like "Start over" -> ``start`` or the "Why?"
+  returns to question 10, are found by a depth-first search and set aside.
+  The paths are the routes that use none of these back edges. What remains
+  is acyclic, so the number of paths from each node to ``complete`` is
+  memoized once per node. This also lets path ``i`` be rebuilt directly from
+  its index without walking the ones before it. (The script has tens of
+  billions of them.)
+- This is a lower bound on the simple (loop-free) routes, not an exact
+  count: a back edge in this DFS order can still lie on a simple route,
+  say one that enters the loop from another question, and such routes are
+  not counted or replayed. Counting simple paths exactly is intractable at
+  this size. Every edge is still checked by the next step.
+- Every answer edge is submitted once from its source question. A
+  conversation's next step depends only on its current question, so this
+  validates each hop of every path.
+- Whole paths are then replayed through a fresh conversation, sharded by
+  path index across worker processes. When there are more paths than
+  ``limit``, an evenly spaced sample of the index space is replayed instead.
+
+The report gives the path count, failures, loop edges, unreachable or
+dead-end questions and edge coverage.
+
+    python3 script_paths.py --processes 4 --limit 200000
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from script_engine import COMPLETE, Conversation, ScriptGraph
+
+
+class Edge(NamedTuple):
+    """One answer and the question it leads to."""
+    source: str
+    answer: str
+    target: str
+
+
+class PathReport(NamedTuple):
+    paths: int                              # start -> complete paths using no DFS back edge
+    replayed: int                           # of those, replayed end to end
+    edges: int
+    on_paths: int                           # edges that lie on at least one path
+    replay_covered: int                     # edges hopped by the replayed paths
+    cycle_edges: List[Edge]
+    off_path_edges: List[Edge]              # on no path: unreachable, or only left through a loop
+    unreachable: List[str]
+    loop_only: List[str]                    # reachable, but only left through a loop edge
+    dead_ends: List[str]                    # reachable, but complete is not
+    failures: List[Tuple[str, str]]         # (where, why)
+
+    @property
+    def edge_coverage(self) -> float:
+        return self.on_paths / self.edges if self.edges else 1.0
+
+    def to_dict(self) -> Dict:
+        result = self._asdict()
+        result["edge_coverage"] = round(self.edge_coverage, 4)
+        return result
+
+
+def graph_edges(graph: ScriptGraph) -> List[Edge]:
+    """Every answer edge of the graph, in node and answer order."""
+    return [Edge(question_id, answer, target)
+            for question_id, node in graph.questions.items()
+            for answer, target in node["next_questions"].items()]
+
+
+class PathIndex:
+    """Loop-free successors and memoized suffix path counts of a graph."""
+
+    def __init__(self, graph: ScriptGraph):
+        self.graph = graph
+        self.successors: Dict[str, List[Tuple[str, str]]] = {}   # (target, first answer), distinct targets
+        for question_id, node in graph.questions.items():
+            targets: Dict[str, str] = {}
+            for answer, target in node["next_questions"].items():
+                targets.setdefault(target, answer)
+            self.successors[question_id] = [(target, answer) for target, answer in targets.items()]
+
+        self.cycle_pairs, order = self._depth_first()
+        self.reachable: Set[str] = set(order)
+        # Reverse postorder is a topological order once loop edges are dropped
+        self.counts: Dict[str, int] = {}
+        for question_id in order:
+            if question_id == COMPLETE:
+                self.counts[question_id] = 1
+                continue
+            self.counts[question_id] = sum(
+                self.counts.get(target, 0) for target, _ in self.successors[question_id]
+                if (question_id, target) not in self.cycle_pairs
+            )
+        # Only keep branches that can still reach complete
+        self.forward: Dict[str, List[Tuple[str, str, int]]] = {
+            question_id: [(target, answer, self.counts[target]) for target, answer in self.successors[question_id]
+                          if (question_id, target) not in self.cycle_pairs and self.counts.get(target, 0)]
+            for question_id in order
+        }
+
+    def _depth_first(self) -> Tuple[Set[Tuple[str, str]], List[str]]:
+        """Loop-closing (source, target) pairs, and reachable nodes in postorder."""
+        cycle_pairs: Set[Tuple[str, str]] = set()
+        postorder: List[str] = []
+        start = self.graph.start
+        if start not in self.graph:
+            return cycle_pairs, postorder
+        on_stack = {start}
+        visited = {start}
+        stack = [(start, iter(self.successors[start]))]
+        while stack:
+            question_id, children = stack[-1]
+            for target, _ in children:
+                if target not in self.graph:
+                    continue
+                if target in on_stack:
+                    cycle_pairs.add((question_id, target))
+                elif target not in visited:
+                    visited.add(target)
+                    on_stack.add(target)
+                    stack.append((target, iter(self.successors[target])))
+                    break
+            else:
+                stack.pop()
+                on_stack.discard(question_id)
+                postorder.append(question_id)
+        return cycle_pairs, postorder
+
+    @property
+    def total(self) -> int:
+        return self.counts.get(self.graph.start, 0)
+
+    def path(self, index: int) -> List[Tuple[str, str, str]]:
+        """Hops (question, answer, next question) of path number ``index``."""
+        if not 0 <= index < self.total:
+            raise IndexError(index)
+        hops = []
+        question_id = self.graph.start
+        while question_id != COMPLETE:
+            for target, answer, count in self.forward[question_id]:
+                if index < count:
+                    hops.append((question_id, answer, target))
+                    question_id = target
+                    break
+                index -= count
+        return hops
+
+
+def check_edges(graph: ScriptGraph, edges: List[Edge]) -> List[Tuple[str, str]]:
+    """Submit every edge's answer from its source question; return the mismatches."""
+    conversation = Conversation(graph, history_capacity=max(len(edges) + 1, 4))
+    failures = []
+    for edge in edges:
+        conversation.current_question_id = edge.source
+        if edge.target not in graph:
+            failures.append((f"{edge.source} --{edge.answer}-->", f"unknown question {edge.target}"))
+        elif not conversation.submit_answer(edge.answer):
+            failures.append((f"{edge.source} --{edge.answer}-->", "answer not recognized"))
+        elif conversation.current_question_id != edge.target:
+            failures.append((f"{edge.source} --{edge.answer}-->",
+                             f"went to {conversation.current_question_id}, expected {edge.target}"))
+    return failures
+
+
+def validate_graph(graph: ScriptGraph) -> List[str]:
+    """Structural problems that make a parsed graph unusable; empty when it is sound.
+
+    Flags a missing start question, answers leading to unknown questions or
+    not matching their own edge, questions the start cannot reach (answers
+    and sequential fallbacks both count) and a start that reaches no ending
+    (``complete``, or a question with nowhere to go).
+    """
+    if graph.start not in graph:
+        return [f"start question {graph.start} is missing"]
+    problems = [f"{where}: {why}" for where, why in check_edges(graph, graph_edges(graph))]
+    seen = {graph.start}
+    pending = [graph.start]
+    ending = False
+    while pending:
+        question_id = pending.pop()
+        targets = list(graph.questions[question_id]["next_questions"].values())
+        fallback = graph.matcher_entry(question_id)[1]
+        if fallback is not None:
+            targets.append(fallback)
+        ending = ending or question_id == COMPLETE or not targets
+        for target in targets:
+            if target in graph and target not in seen:
+                seen.add(target)
+                pending.append(target)
+    unreachable = [q for q in graph.questions if q not in seen]
+    if unreachable:
+        problems.append(f"unreachable questions: {', '.join(unreachable)}")
+    if not ending:
+        problems.append("no ending is reachable from the start")
+    return problems
+
+
+def sample_indices(total: int, limit: Optional[int]) -> Tuple[int, Optional[int]]:
+    """Number of paths to replay and, when sampling, the population they are spread over."""
+    if limit is None or limit >= total:
+        return total, None
+    return limit, total
+
+
+def _path_number(k: int, population: Optional[int], count: int) -> int:
+    return k if population is None else k * population // count
+
+
+_worker_index: Optional[PathIndex] = None
+
+
+def _init_worker(graph: ScriptGraph) -> None:
+    global _worker_index
+    _worker_index = PathIndex(graph)
+
+
+def replay_shard(first: int, stop: int, count: int, population: Optional[int],
+                 index: Optional[PathIndex] = None) -> Tuple[int, Set[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Replay sample slots ``first``..``stop``. Returns (replayed, hopped edges, failures)."""
+    index = index or _worker_index
+    conversation = Conversation(index.graph, history_capacity=len(index.graph) + 1)
+    hopped: Set[Tuple[str, str]] = set()
+    failures = []
+    replayed = 0
+    previous: List[Tuple[str, str, str]] = []
+    for k in range(first, stop):
+        number = _path_number(k, population, count)
+        hops = index.path(number)
+        # Neighbouring paths share a prefix; step back to where they part
+        shared = 0
+        limit = min(len(hops), len(previous), len(conversation.conversation_history))
+        while shared < limit and hops[shared] == previous[shared]:
+            shared += 1
+        if shared:
+            conversation.jump_to_step(shared)
+        else:
+            conversation.reset_to_beginning()
+        for question_id, answer, target in hops[shared:]:
+            hopped.add((question_id, answer))
+            if not conversation.submit_answer(answer) or conversation.current_question_id != target:
+                failures.append((f"path {number}", f"{question_id} --{answer}--> {conversation.current_question_id},"
+                                                   f" expected {target}"))
+                break
+        previous = hops
+        replayed += 1
+    return replayed, hopped, failures
+
+
+def analyze(graph: ScriptGraph, processes: int = 1, limit: Optional[int] = None) -> PathReport:
+    """Count, validate and replay the paths of ``graph``."""
+    index = PathIndex(graph)
+    edges = graph_edges(graph)
+    failures = check_edges(graph, edges)
+
+    count, population = sample_indices(index.total, limit)
+    processes = max(min(processes, count), 1)
+    bounds = [(count * i // processes, count * (i + 1) // processes) for i in range(processes)]
+    if processes == 1:
+        results = [replay_shard(0, count, count, population, index)]
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(graph,)) as pool:
+            results = list(pool.map(replay_shard, *zip(*[(a, b, count, population) for a, b in bounds])))
+    replayed = sum(r[0] for r in results)
+    hopped = set().union(*(r[1] for r in results))
+    for _, _, shard_failures in results:
+        failures.extend(shard_failures)
+
+    cycle_edges, off_path_edges, on_paths = [], [], 0
+    for edge in edges:
+        if (edge.source, edge.target) in index.cycle_pairs:
+            cycle_edges.append(edge)
+        elif edge.source in index.reachable and index.counts.get(edge.target, 0):
+            on_paths += 1
+        else:
+            off_path_edges.append(edge)
+
+    # Questions that can still finish once loops are allowed
+    finishing = {COMPLETE}
+    pending = [COMPLETE]
+    predecessors: Dict[str, Set[str]] = {}
+    for edge in edges:
+        predecessors.setdefault(edge.target, set()).add(edge.source)
+    while pending:
+        for source in predecessors.get(pending.pop(), ()):
+            if source not in finishing:
+                finishing.add(source)
+                pending.append(source)
+    stuck = [q for q in index.reachable if q != COMPLETE and not index.counts.get(q)]
+    return PathReport(
+        paths=index.total,
+        replayed=replayed,
+        edges=len(edges),
+        on_paths=on_paths,
+        replay_covered=sum((edge.source, edge.answer) in hopped for edge in edges),
+        cycle_edges=cycle_edges,
+        off_path_edges=off_path_edges,
+        unreachable=[q for q in graph.questions if q not in index.reachable],
+        loop_only=[q for q in stuck if q in finishing],
+        dead_ends=[q for q in stuck if q not in finishing],
+        failures=failures,
+    )
+
+
+def format_report(report: PathReport) -> str:
+    lines = [
+        f"Paths start -> complete without back edges: {report.paths:,} ({report.replayed:,} replayed)",
+        f"Edges: {report.edges}, on a path: {report.on_paths} ({report.edge_coverage:.1%}), "
+        f"hopped by replayed paths: {report.replay_covered}",
+        f"Loop edges: {len(report.cycle_edges)}",
+    ]
+    lines += [f"  {e.source} --{e.answer}--> {e.target}" for e in report.cycle_edges]
+    if report.off_path_edges:
+        lines.append(f"Edges on no path: {len(report.off_path_edges)}")
+        lines += [f"  {e.source} --{e.answer}--> {e.target}" for e in report.off_path_edges]
+    if report.unreachable:
+        lines.append(f"Unreachable questions: {', '.join(report.unreachable)}")
+    if report.loop_only:
+        lines.append(f"Questions only left through a loop: {', '.join(report.loop_only)}")
+    if report.dead_ends:
+        lines.append(f"Questions that cannot reach complete: {', '.join(report.dead_ends)}")
+    lines.append(f"Failures: {len(report.failures)}")
+    lines += [f"  {where}: {why}" for where, why in report.failures[:50]]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    from script_api import load_script_graph
+
+    parser = argparse.ArgumentParser(description="Count, validate and replay every path through the script.")
+    parser.add_argument("--graph", choices=("complete", "ai"), default="complete")
+    parser.add_argument("--pdf", default="script.pdf", help="Script PDF for --graph ai")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limit", type=int, default=200000,
+                        help="Most paths to replay; larger path sets are sampled evenly (0 replays all)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = analyze(load_script_graph(args.graph, args.pdf), args.processes, args.limit or None)
+    print(json.dumps(report.to_dict(), indent=2) if args.json else format_report(report))
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
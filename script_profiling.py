@@ -0,0 +1,183 @@
+"""On-demand cProfile and tracemalloc capture around engine hot paths.
+
+A label (``"parse_script"`` or ``"submit_answer"``) is armed for a number of
+calls, from the debug sidebar or at startup with, for example,
+
+    SCRIPT_ANALYZER_PROFILE=parse_script,submit_answer:20
+
+The engine wraps those calls in ``with profiled(label):``, which is a shared
+no-op while nothing is armed. The armed calls run under one cProfile profiler,
+with tracemalloc tracing from the first call to the last. When the last call
+finishes, the profile is written as ``.pstats`` and the final heap as a
+tracemalloc snapshot in ``PROFILE_DIR``, and a top-N summary is kept for the
+debug panel.
+
+cProfile and tracemalloc are process-wide, so one label is measured at a
+time; calls that arrive while another capture is running are not counted.
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+PROFILE_DIR = os.environ.get("SCRIPT_ANALYZER_PROFILE_DIR",
+                             os.path.join(tempfile.gettempdir(), "script_analyzer_profiles"))
+TOP_N = 15
+REPORT_HISTORY = 10
+
+logger = logging.getLogger("script_analyzer.profiling")
+
+
+class ProfileReport(NamedTuple):
+    """Summary of one finished capture."""
+    label: str
+    calls: int
+    seconds: float                                    # wall time inside the profiled calls
+    stats_path: str
+    snapshot_path: str
+    top_functions: List[Tuple[str, int, float, float]]  # (function, calls, own s, cumulative s)
+    top_allocations: List[Tuple[str, int, int]]         # (file:line, bytes grown, blocks grown)
+
+
+class _Capture:
+    """cProfile and tracemalloc state for one armed label."""
+
+    def __init__(self, label: str, calls: int):
+        self.label = label
+        self.remaining = calls
+        self.calls = 0
+        self.seconds = 0.0
+        self.profile = cProfile.Profile()
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.owns_tracemalloc = False
+
+    def __enter__(self):
+        if self.calls == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.owns_tracemalloc = True
+        if self.baseline is None:
+            self.baseline = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+        self.profile.enable()
+        return True
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+        self.seconds += time.perf_counter() - self.started
+        self.calls += 1
+        self.remaining -= 1
+        if self.remaining <= 0:
+            _finish(self)
+        _busy.release()
+        return False
+
+
+class _NoProfile:
+    __slots__ = ()
+
+    def __enter__(self):
+        return False
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PROFILE = _NoProfile()
+_armed: Dict[str, _Capture] = {}
+_busy = threading.Lock()
+_reports: "deque[ProfileReport]" = deque(maxlen=REPORT_HISTORY)
+
+
+def profiled(label: str):
+    """Profile this call if ``label`` is armed; a no-op context manager otherwise.
+
+    ``with profiled(label) as measuring:`` tells the caller whether the call
+    is being captured, so a cached path can do the real work instead.
+    """
+    if not _armed:
+        return _NO_PROFILE
+    capture = _armed.get(label)
+    if capture is None or not _busy.acquire(blocking=False):
+        return _NO_PROFILE
+    if _armed.get(label) is not capture:   # finished while we waited
+        _busy.release()
+        return _NO_PROFILE
+    return capture
+
+
+def arm(label: str, calls: int = 1) -> None:
+    """Capture the next ``calls`` calls of ``label``, replacing any capture in progress."""
+    with _busy:
+        replaced = _armed.get(label)
+        _armed[label] = _Capture(label, max(int(calls), 1))
+    if replaced is not None and replaced.owns_tracemalloc:
+        tracemalloc.stop()
+
+
+def disarm(label: str) -> None:
+    """Drop an unfinished capture without writing it."""
+    with _busy:
+        capture = _armed.pop(label, None)
+    if capture is not None and capture.owns_tracemalloc:
+        tracemalloc.stop()
+
+
+def armed() -> Dict[str, int]:
+    """Calls still to be captured, by label."""
+    return {label: capture.remaining for label, capture in _armed.items()}
+
+
+def reports() -> List[ProfileReport]:
+    """Finished captures, most recent last."""
+    return list(_reports)
+
+
+def _finish(capture: _Capture) -> None:
+    """Write a finished capture's files and summary. Runs with ``_busy`` held."""
+    _armed.pop(capture.label, None)
+    snapshot = tracemalloc.take_snapshot()
+    if capture.owns_tracemalloc:
+        tracemalloc.stop()
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = os.path.join(PROFILE_DIR, f"{capture.label}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+    capture.profile.dump_stats(stem + ".pstats")
+    snapshot.dump(stem + ".snapshot")
+
+    stats = pstats.Stats(capture.profile).sort_stats("cumulative")
+    top_functions = []
+    for func in stats.fcn_list[:TOP_N]:
+        _, ncalls, own, cumulative, _ = stats.stats[func]
+        top_functions.append((pstats.func_std_string(func), ncalls, own, cumulative))
+
+    growth = snapshot.compare_to(capture.baseline, "lineno") if capture.baseline is not None else []
+    top_allocations = [
+        (f"{diff.traceback[0].filename}:{diff.traceback[0].lineno}", diff.size_diff, diff.count_diff)
+        for diff in growth[:TOP_N]
+        if diff.size_diff > 0
+    ]
+    _reports.append(ProfileReport(capture.label, capture.calls, capture.seconds,
+                                  stem + ".pstats", stem + ".snapshot", top_functions, top_allocations))
+
+
+def arm_from_env(value: Optional[str] = None) -> None:
+    """Arm the labels listed in SCRIPT_ANALYZER_PROFILE (``label[:calls],...``)."""
+    value = os.environ.get("SCRIPT_ANALYZER_PROFILE", "") if value is None else value
+    for item in value.split(","):
+        label, _, calls = item.strip().partition(":")
+        if not label:
+            continue
+        try:
+            arm(label, int(calls or 1))
+        except ValueError:
+            logger.warning("Ignoring SCRIPT_ANALYZER_PROFILE item %r: calls must be a number", item.strip())
+
+
+arm_from_env()
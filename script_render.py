@@ -0,0 +1,205 @@
+"""Pre-rendered question cards, cached once per graph version.
+
+A node's card HTML, context banner, header and suggestion button layout only
+depend on the graph, so they are built for every node the first time a graph
+is rendered and shared by every session in the process. Rendering a question
+is then a dictionary lookup.
+"""
+
+import hashlib
+import html
+import json
+import threading
+import weakref
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from script_engine import COMPLETE, START
+
+CARD_TEMPLATE = (
+    '<div class="question-card">\n'
+    '<h3>Question {question_id}</h3>\n'
+    '<p style="font-size: 1.1rem; line-height: 1.6; margin: 1rem 0;">{question}</p>\n'
+    '</div>'
+)
+
+PREFETCH_TEMPLATE = """<!DOCTYPE html>
+<html><head><style>
+body {{ font-family: "Source Sans Pro", sans-serif; margin: 0; }}
+.question-card {{ background: #f8f9fa; padding: 1.5rem; border-radius: 10px;
+                  border-left: 4px solid #2a5298; margin: 0 0 1rem 0; }}
+.banner {{ background: #e8f4fd; color: #1e3c72; padding: 0.75rem 1rem; border-radius: 8px; margin-bottom: 1rem; }}
+.banner:empty {{ display: none; }}
+.buttons {{ display: flex; gap: 0.5rem; }}
+.column {{ flex: 1; display: flex; flex-direction: column; }}
+.suggestion-button {{ background: #2a5298; color: white; border: none; padding: 0.5rem 1rem;
+                      border-radius: 5px; margin: 0.25rem; font-weight: 500; cursor: pointer; }}
+.suggestion-button:hover {{ background: #1e3c72; }}
+.pending .suggestion-button {{ opacity: 0.4; pointer-events: none; }}
+</style></head><body>
+<div id="card">{card}</div>
+<div id="banner" class="banner">{banner}</div>
+<div id="buttons" class="buttons">{buttons}</div>
+<script>
+const pages = {pages};
+const parentDoc = window.parent.document;
+function proxies() {{
+  return Array.from(parentDoc.querySelectorAll("button")).filter(b => b.innerText.trim().startsWith("prefetch:"));
+}}
+function hideProxies() {{
+  for (const b of proxies()) {{
+    const box = b.closest('[data-testid="stElementContainer"], .element-container') || b;
+    box.style.display = "none";
+  }}
+}}
+hideProxies();
+const observer = new MutationObserver(hideProxies);
+observer.observe(parentDoc.body, {{ childList: true, subtree: true }});
+setTimeout(() => observer.disconnect(), 5000);
+for (const button of document.querySelectorAll("[data-proxy]")) {{
+  button.addEventListener("click", () => {{
+    const label = button.dataset.proxy;
+    const next = pages[label];
+    if (next) {{
+      document.getElementById("card").innerHTML = next.card;
+      document.getElementById("banner").textContent = next.banner;
+    }}
+    document.getElementById("buttons").classList.add("pending");
+    const proxy = proxies().find(b => b.innerText.trim() === label);
+    if (proxy) proxy.click();
+  }});
+}}
+</script>
+</body></html>"""
+
+
+class RenderedNode(NamedTuple):
+    """Everything the apps draw for one node, precomputed."""
+    question_id: str
+    header: str             # "🎬 Script Start", "✅ Script Complete" or "❓ Question N"
+    card_html: str
+    context_banner: str     # "" when the node has no context
+    columns: Tuple[Tuple[Tuple[str, str, str], ...], ...]  # per column: (label, answer, widget key)
+    targets: Tuple[Optional[str], ...]  # where each suggestion leads, by suggestion index
+
+
+def graph_version(graph) -> str:
+    """Content hash of a graph's nodes; equal graphs share one version."""
+    digest = hashlib.sha1()
+    for question_id in graph.questions:
+        digest.update(graph.node_json(question_id).encode("utf-8"))
+        digest.update(repr(sorted(graph.node(question_id)["next_questions"].items())).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def proxy_label(key: str) -> str:
+    """Label of the hidden button a prefetch page clicks for widget ``key``."""
+    return f"prefetch:{key}"
+
+
+def _target(graph, question_id: str, suggestion: str) -> Optional[str]:
+    match = graph.match(question_id, suggestion)
+    return match.next_question if match is not None else None
+
+
+def _header(question_id: str) -> str:
+    if question_id == START:
+        return "🎬 Script Start"
+    if question_id == COMPLETE:
+        return "✅ Script Complete"
+    return f"❓ Question {question_id}"
+
+
+class RenderCache:
+    """Rendered nodes of one graph version for one button layout.
+
+    ``columns`` is the number of button columns; with ``shrink_columns`` a
+    node with fewer suggestions uses only as many columns as it needs.
+    """
+
+    def __init__(self, graph, version: str, columns: int = 2, shrink_columns: bool = False,
+                 label_prefix: str = ""):
+        self.version = version
+        self._nodes: Dict[str, RenderedNode] = {}
+        self._prefetch: Dict[str, Tuple[str, int]] = {}
+        for question_id in graph.questions:
+            node = graph.node(question_id)
+            suggestions = node["suggestions"]
+            count = max(min(len(suggestions), columns), 1) if shrink_columns else columns
+            layout = [[] for _ in range(count)]
+            for i, suggestion in enumerate(suggestions):
+                layout[i % count].append((f"{label_prefix}{suggestion}", suggestion, f"suggestion_{question_id}_{i}"))
+            self._nodes[question_id] = RenderedNode(
+                question_id=question_id,
+                header=_header(question_id),
+                card_html=CARD_TEMPLATE.format(question_id=html.escape(question_id),
+                                               question=html.escape(node["question"])),
+                context_banner=f"💡 Context: {node['context']}" if node["context"] else "",
+                columns=tuple(tuple(column) for column in layout),
+                targets=tuple(_target(graph, question_id, s) for s in suggestions),
+            )
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def node(self, question_id: str) -> Optional[RenderedNode]:
+        return self._nodes.get(question_id)
+
+    def prefetch_page(self, question_id: str) -> Tuple[str, int]:
+        """Self-contained HTML page and its height for prefetch mode.
+
+        The page shows the current card and its suggestions, and carries the
+        card each suggestion leads to. A click swaps that card in straight
+        away, then clicks the hidden Streamlit button labelled
+        ``proxy_label(key)`` so the server commits the same transition.
+        """
+        page = self._prefetch.get(question_id)
+        if page is None:
+            page = self._prefetch[question_id] = self._build_prefetch_page(self._nodes[question_id])
+        return page
+
+    def _build_prefetch_page(self, node: RenderedNode) -> Tuple[str, int]:
+        next_pages = {}
+        for column in node.columns:
+            for _, _, key in column:
+                index = int(key.rsplit("_", 1)[1])
+                target = self._nodes.get(node.targets[index]) if node.targets[index] else None
+                if target is not None:
+                    next_pages[proxy_label(key)] = {"card": target.card_html, "banner": target.context_banner}
+        buttons = "".join(
+            '<div class="column">' + "".join(
+                f'<button class="suggestion-button" data-proxy="{html.escape(proxy_label(key))}">'
+                f'{html.escape(label)}</button>'
+                for label, _, key in column
+            ) + '</div>'
+            for column in node.columns
+        )
+        body = PREFETCH_TEMPLATE.format(
+            card=node.card_html,
+            banner=html.escape(node.context_banner),
+            buttons=buttons,
+            pages=json.dumps(next_pages).replace("</", "<\\/"),
+        )
+        rows = max((len(column) for column in node.columns), default=0)
+        return body, 260 + 52 * rows
+
+
+_by_version: Dict[Tuple, RenderCache] = {}
+_by_graph: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_render_cache(graph, columns: int = 2, shrink_columns: bool = False, label_prefix: str = "") -> RenderCache:
+    """Return the process-wide RenderCache for ``graph`` and this layout."""
+    layout = (columns, shrink_columns, label_prefix)
+    per_graph = _by_graph.get(graph)
+    if per_graph is not None and layout in per_graph:
+        return per_graph[layout]
+    with _lock:
+        per_graph = _by_graph.setdefault(graph, {})
+        if layout not in per_graph:
+            version = graph_version(graph)
+            key = (version,) + layout
+            if key not in _by_version:
+                _by_version[key] = RenderCache(graph, version, columns, shrink_columns, label_prefix)
+            per_graph[layout] = _by_version[key]
+        return per_graph[layout]
@@ -0,0 +1,202 @@
+"""Full-text search over a script, for jumping straight to a question.
+
+``ScriptGraph`` builds a ``SearchIndex`` when it compiles. Every word of a
+node's question and context is posted under its canonical form (see
+``answer_key``), weighted by where it appears, and the question id itself is
+posted too, so "Q17" or "17" finds question 17. The distinct words are kept
+in one sorted list: the words a prefix can complete are a contiguous slice
+of it, found by bisection.
+
+A query matches the nodes that contain every query word, each read as a
+prefix, so a word still being typed already narrows the results. Nodes are
+ranked by the summed weights of their matching words, whole words above
+prefixes, then by graph order.
+
+The work per query is capped however large the script is. Each word's
+postings are stored best first, and a query word expands to at most
+``MAX_EXPANSIONS`` indexed words, the most frequent ones. For prefixes of
+up to three characters these are chosen at build time; for longer ones,
+among the first few hundred words of the range. Candidates come from the
+query word with the fewest postings, at most ``MAX_SCANNED`` of them in
+rank order, and the other query words are checked against each candidate's
+own words. A one-word query stops after ``limit`` candidates, so it is
+exact whenever its prefix stands for no more than ``MAX_EXPANSIONS`` words.
+A longer query on very common words ranks the best ``MAX_SCANNED``
+candidates only.
+
+    python3 script_search.py why heav
+"""
+
+import argparse
+import heapq
+import re
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+
+from script_normalize import answer_key
+
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by do for if in is it of on or so that the them they this to was we what with you"
+    .split()
+)
+QUESTION_WEIGHT = 2
+CONTEXT_WEIGHT = 1
+ID_WEIGHT = 8
+WHOLE_WORD_BONUS = 2    # multiplies the weight of a word typed in full
+MIN_PREFIX = 2          # shorter query words only match whole words
+MAX_EXPANSIONS = 32     # indexed words a prefix stands for, most frequent first
+SHORT_PREFIX = 3        # prefixes up to this long have their expansions precomputed
+MAX_SCANNED = 256       # candidate nodes ranked per query
+
+
+class SearchHit(NamedTuple):
+    """One ranked search result."""
+    question_id: str
+    score: int
+
+
+def words(text: str) -> List[str]:
+    """Canonical words of ``text``, without stop words."""
+    return [word for word in WORD.findall(answer_key(text)) if word not in STOP_WORDS]
+
+
+class SearchIndex:
+    """Inverted index over the question and context of every node.
+
+    Postings hold a node's position in the graph rather than its id, so
+    ranking compares plain integers. The index is read-only after it is
+    built, so sessions on different threads can search it at once.
+    """
+
+    def __init__(self, questions: Dict[str, Dict[str, Any]]):
+        self._ids = list(questions)
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._node_words: List[Tuple[str, ...]] = []
+        for position, (question_id, node) in enumerate(questions.items()):
+            ids = {question_id.lower(), "q" + question_id.lower()}
+            question_words = set(words(node["question"]))
+            context_words = set(words(node.get("context", "")))
+            for word in ids:
+                self._post(word, position, ID_WEIGHT)
+            for word in question_words:
+                self._post(word, position, QUESTION_WEIGHT)
+            for word in context_words:
+                self._post(word, position, CONTEXT_WEIGHT)
+            self._node_words.append(tuple(ids | question_words | context_words))
+        self._words = sorted(self._postings)
+        # Short prefixes stand for the most words, so their expansions are chosen once here
+        by_prefix: Dict[str, List[str]] = {}
+        for word in self._words:
+            for length in range(MIN_PREFIX, min(len(word), SHORT_PREFIX) + 1):
+                by_prefix.setdefault(word[:length], []).append(word)
+        self._short: Dict[str, List[str]] = {
+            prefix: self._most_frequent(expansions) for prefix, expansions in by_prefix.items()
+        }
+        # Each word's nodes, best weight first, then in graph order
+        self._ranked: Dict[str, List[Tuple[int, int]]] = {
+            word: sorted((-weight, position) for position, weight in posting.items())
+            for word, posting in self._postings.items()
+        }
+
+    def _post(self, word: str, position: int, weight: int) -> None:
+        posting = self._postings.setdefault(word, {})
+        posting[position] = posting.get(position, 0) + weight
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def indexed_words(self) -> List[str]:
+        """Every indexed word, sorted."""
+        return list(self._words)
+
+    def _expand(self, term: str) -> List[Tuple[str, int]]:
+        """Indexed words ``term`` stands for, with their bonus: itself whole, and words it is a prefix of."""
+        expanded = [(term, WHOLE_WORD_BONUS)] if term in self._postings else []
+        if len(term) <= SHORT_PREFIX:
+            longer = self._short.get(term, []) if len(term) >= MIN_PREFIX else []
+        else:
+            start = bisect_left(self._words, term)
+            end = bisect_left(self._words, term + "\uffff", start, min(start + MAX_EXPANSIONS * 8, len(self._words)))
+            longer = self._most_frequent(self._words[start:end])
+        return expanded + [(word, 1) for word in longer if word != term]
+
+    def _most_frequent(self, words_: List[str]) -> List[str]:
+        """Up to ``MAX_EXPANSIONS`` of ``words_``, those in the most nodes."""
+        if len(words_) <= MAX_EXPANSIONS:
+            return words_
+        return heapq.nlargest(MAX_EXPANSIONS, words_, key=lambda word: len(self._postings[word]))
+
+    def _stream(self, word: str, bonus: int) -> Iterator[Tuple[int, int]]:
+        """(-score, position) of the nodes containing ``word``, best first."""
+        for negative, position in self._ranked[word]:
+            yield negative * bonus, position
+
+    def _word_score(self, position: int, term: str) -> int:
+        """Best weight a word of the node at ``position`` earns for ``term``; 0 if none matches."""
+        best = 0
+        for word in self._node_words[position]:
+            if word == term:
+                best = max(best, self._postings[word][position] * WHOLE_WORD_BONUS)
+            elif len(term) >= MIN_PREFIX and word.startswith(term):
+                best = max(best, self._postings[word][position])
+        return best
+
+    def search(self, query: str, limit: int = 10) -> List[SearchHit]:
+        """The ``limit`` best nodes for ``query``, best first."""
+        terms = WORD.findall(answer_key(query))
+        if not terms:
+            return []
+        # A trailing stop word may be the start of a longer word; earlier ones are dropped
+        terms = [term for term in terms[:-1] if term not in STOP_WORDS] + terms[-1:]
+        expansions = [self._expand(term) for term in terms]
+        if not all(expansions):
+            return []
+
+        # Candidates come from the query word with the fewest postings, best first
+        driver = min(range(len(terms)), key=lambda i: sum(len(self._postings[w]) for w, _ in expansions[i]))
+        others = terms[:driver] + terms[driver + 1:]
+        streams = [self._stream(word, bonus) for word, bonus in expansions[driver]]
+        wanted = limit if not others else MAX_SCANNED
+        seen = set()
+        scored: List[Tuple[int, int]] = []
+        for negative, position in heapq.merge(*streams):
+            if position in seen:
+                continue
+            seen.add(position)
+            score = -negative
+            for term in others:
+                term_score = self._word_score(position, term)
+                if not term_score:
+                    break
+                score += term_score
+            else:
+                scored.append((-score, position))
+            if len(seen) >= wanted:
+                break
+        return [SearchHit(self._ids[position], -negative) for negative, position in heapq.nsmallest(limit, scored)]
+
+
+def main(argv=None) -> int:
+    from script_api import load_script_graph
+
+    parser = argparse.ArgumentParser(description="Search the script's questions and context.")
+    parser.add_argument("query", nargs="+")
+    parser.add_argument("--graph", choices=("complete", "ai"), default="complete")
+    parser.add_argument("--pdf", default="script.pdf", help="Script PDF for --graph ai")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    graph = load_script_graph(args.graph, args.pdf)
+    started = time.perf_counter()
+    hits = graph.search_index.search(" ".join(args.query), args.limit)
+    elapsed = time.perf_counter() - started
+    for hit in hits:
+        print(f"Q{hit.question_id:<6} {hit.score:>3}  {graph.questions[hit.question_id]['question'][:90]}")
+    print(f"{len(hits)} result(s) in {elapsed * 1000:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,309 @@
+"""Compiled question graph in a read-only, memory-mapped file.
+
+``write_graph_file()`` serializes a compiled ScriptGraph once: a string
+table, fixed-size node records sorted by id, answer edges, the precomputed
+fuzzy-match keys and each node's JSON payload. ``MappedGraph`` attaches to
+that file with ``mmap`` and answers the same calls as ScriptGraph by reading
+records in place, so every worker process shares the operating system's
+page cache for the graph instead of parsing and holding its own copy.
+
+The search index and answer tries are not in the file: a MappedGraph builds
+them from the mapped nodes the first time they are used. The tries come from
+each node's suggestions, since the answer counts the original graph was
+compiled with are not stored.
+"""
+
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from script_autocomplete import AnswerTrie, completion_answers
+from script_engine import Match, ScriptGraph
+from script_history import ANSWER_IDS
+from script_normalize import answer_key
+from script_search import SearchIndex
+
+MAGIC = b"SGRAPH02"
+_HEADER = struct.Struct("<8s11Q")       # magic, counts, source and start, section offsets
+# Node record: id, question, context, json (string ids); suggestions start/count;
+# next_questions start/count; fuzzy start/count; sequential fallback (string id)
+_NODE = struct.Struct("<11I")
+_PAIR = struct.Struct("<2I")            # next_questions: key, next
+_TRIPLE = struct.Struct("<3I")          # fuzzy: canonical key, key, next
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+NONE = 0xFFFFFFFF
+
+
+def write_graph_file(graph: ScriptGraph, path: str) -> None:
+    """Serialize ``graph`` to ``path`` (written atomically)."""
+    strings: List[bytes] = []
+    string_ids: Dict[str, int] = {}
+
+    def sid(value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        key = string_ids.get(value)
+        if key is None:
+            key = string_ids[value] = len(strings)
+            strings.append(value.encode("utf-8"))
+        return key
+
+    order = list(graph.questions)
+    sorted_ids = sorted(order)
+    position = {question_id: i for i, question_id in enumerate(sorted_ids)}
+    suggestions, pairs, triples, nodes = [], [], [], []
+    for question_id in sorted_ids:
+        node = graph.questions[question_id]
+        fuzzy, fallback = graph.matcher_entry(question_id)
+        nodes.append((
+            sid(question_id), sid(node["question"]), sid(node["context"]), sid(graph.node_json(question_id)),
+            len(suggestions), len(node["suggestions"]),
+            len(pairs), len(node["next_questions"]),
+            len(triples), len(fuzzy),
+            sid(fallback),
+        ))
+        suggestions.extend(sid(s) for s in node["suggestions"])
+        pairs.extend((sid(k), sid(v)) for k, v in node["next_questions"].items())
+        triples.extend((sid(canonical), sid(key), sid(nxt)) for canonical, key, nxt in fuzzy)
+    source = sid(graph.source_text)
+    start = sid(graph.start)
+
+    offsets, total = [], 0
+    for data in strings:
+        offsets.append(total)
+        total += len(data)
+    offsets.append(total)
+
+    body = [
+        b"".join(_U64.pack(o) for o in offsets),
+        b"".join(strings),
+        b"".join(_NODE.pack(*n) for n in nodes),
+        b"".join(_U32.pack(position[q]) for q in order),
+        b"".join(_U32.pack(s) for s in suggestions),
+        b"".join(_PAIR.pack(*p) for p in pairs),
+        b"".join(_TRIPLE.pack(*t) for t in triples),
+    ]
+    section_offsets, cursor = [], _HEADER.size
+    for section in body:
+        section_offsets.append(cursor)
+        cursor += len(section)
+    header = _HEADER.pack(MAGIC, len(strings), len(nodes), source, start, *section_offsets)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for section in body:
+            f.write(section)
+    os.replace(tmp_path, path)
+
+
+class _Questions(Mapping):
+    """Read-only ``questions`` mapping over a MappedGraph, in original order."""
+
+    def __init__(self, graph: "MappedGraph"):
+        self._graph = graph
+
+    def __getitem__(self, question_id: str) -> Dict[str, Any]:
+        node = self._graph.node(question_id)
+        if node is None:
+            raise KeyError(question_id)
+        return node
+
+    def __contains__(self, question_id: object) -> bool:
+        return isinstance(question_id, str) and self._graph._find(question_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return self._graph.iter_ids()
+
+    def __len__(self) -> int:
+        return len(self._graph)
+
+
+class _Completions(Mapping):
+    """Read-only ``completions`` mapping over a MappedGraph, built per node on first use."""
+
+    def __init__(self, graph: "MappedGraph"):
+        self._graph = graph
+
+    def __getitem__(self, question_id: str) -> AnswerTrie:
+        trie = self._graph._trie(question_id)
+        if trie is None:
+            raise KeyError(question_id)
+        return trie
+
+    def __contains__(self, question_id: object) -> bool:
+        return question_id in self._graph.questions
+
+    def __iter__(self) -> Iterator[str]:
+        return self._graph.iter_ids()
+
+    def __len__(self) -> int:
+        return len(self._graph)
+
+
+class MappedGraph:
+    """ScriptGraph-compatible view over a file written by write_graph_file().
+
+    Only a small cache of recently decoded nodes and answer tries lives in
+    process memory, plus the search index once something searches; everything
+    else is read from the shared mapping on demand.
+    """
+
+    def __init__(self, path: str, cache_size: int = 256):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self._n_strings, self._n_nodes, self._source, self._start, self._offsets_at, self._strings_at,
+         self._nodes_at, self._order_at, self._suggestions_at, self._pairs_at,
+         self._triples_at) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled graph file")
+        self.questions = _Questions(self)
+        self.completions = _Completions(self)
+        self._node = lru_cache(maxsize=cache_size)(self._decode_node)
+        self._trie = lru_cache(maxsize=cache_size)(self._build_trie)
+        self._search_index: Optional[SearchIndex] = None
+        # As ScriptGraph does, so histories record scripted answers as ids
+        for offset in range(self._pairs_at, self._triples_at, _PAIR.size):
+            ANSWER_IDS.intern(self._str(_PAIR.unpack_from(self._mm, offset)[0]))
+
+    def close(self) -> None:
+        self._mm.close()
+
+    # -- raw access ------------------------------------------------------------
+
+    def _bytes(self, index: int) -> bytes:
+        start, end = struct.unpack_from("<2Q", self._mm, self._offsets_at + index * 8)
+        return self._mm[self._strings_at + start:self._strings_at + end]
+
+    def _str(self, index: int) -> Optional[str]:
+        return None if index == NONE else self._bytes(index).decode("utf-8")
+
+    def _record(self, position: int):
+        return _NODE.unpack_from(self._mm, self._nodes_at + position * _NODE.size)
+
+    def _find(self, question_id: str):
+        """Binary search the id-sorted node table."""
+        target = question_id.encode("utf-8")
+        lo, hi = 0, self._n_nodes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            # UTF-8 byte order matches the code point order used when sorting
+            if self._bytes(self._record(mid)[0]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_nodes:
+            record = self._record(lo)
+            if self._bytes(record[0]) == target:
+                return record
+        return None
+
+    # -- ScriptGraph interface ------------------------------------------------
+
+    @property
+    def source_text(self) -> str:
+        return self._str(self._source) or ""
+
+    @property
+    def start(self) -> str:
+        return self._str(self._start)
+
+    def __len__(self) -> int:
+        return self._n_nodes
+
+    def __contains__(self, question_id: str) -> bool:
+        return self._find(question_id) is not None
+
+    def iter_ids(self) -> Iterator[str]:
+        """Node ids in the order the graph was compiled."""
+        for i in range(self._n_nodes):
+            position = _U32.unpack_from(self._mm, self._order_at + i * 4)[0]
+            yield self._str(self._record(position)[0])
+
+    def node(self, question_id: str) -> Optional[Dict[str, Any]]:
+        """A copy of the decoded node, so callers cannot change what the cache hands out."""
+        node = self._node(question_id)
+        if node is None:
+            return None
+        return {**node, "suggestions": list(node["suggestions"]), "next_questions": dict(node["next_questions"])}
+
+    def _decode_node(self, question_id: str) -> Optional[Dict[str, Any]]:
+        record = self._find(question_id)
+        if record is None:
+            return None
+        _, question, context, _, s_start, s_count, p_start, p_count, _, _, _ = record
+        suggestions = [self._str(_U32.unpack_from(self._mm, self._suggestions_at + (s_start + i) * 4)[0])
+                       for i in range(s_count)]
+        next_questions = {}
+        for i in range(p_count):
+            key, nxt = _PAIR.unpack_from(self._mm, self._pairs_at + (p_start + i) * _PAIR.size)
+            next_questions[self._str(key)] = self._str(nxt)
+        return {
+            "question_id": question_id,
+            "question": self._str(question),
+            "suggestions": suggestions,
+            "next_questions": next_questions,
+            "context": self._str(context),
+        }
+
+    def node_json(self, question_id: str) -> Optional[str]:
+        record = self._find(question_id)
+        return None if record is None else self._str(record[3])
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Search index over the mapped nodes, built on first use."""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.questions)
+        return self._search_index
+
+    def _build_trie(self, question_id: str) -> Optional[AnswerTrie]:
+        node = self._node(question_id)
+        return None if node is None else AnswerTrie(completion_answers(node["suggestions"]))
+
+    def complete(self, question_id: str, prefix: str) -> Tuple[str, ...]:
+        trie = self._trie(question_id)
+        return trie.complete(prefix) if trie is not None else ()
+
+    def matcher_entry(self, question_id: str) -> Tuple[Tuple[Tuple[str, str, str], ...], Optional[str]]:
+        record = self._find(question_id)
+        if record is None:
+            raise KeyError(question_id)
+        f_start, f_count, fallback = record[8:]
+        fuzzy = tuple(
+            tuple(self._str(index) for index in
+                  _TRIPLE.unpack_from(self._mm, self._triples_at + (f_start + i) * _TRIPLE.size))
+            for i in range(f_count)
+        )
+        return fuzzy, self._str(fallback)
+
+    def match(self, question_id: str, answer: str) -> Optional[Match]:
+        record = self._find(question_id)
+        if record is None:
+            return None
+        _, _, _, _, _, _, p_start, p_count, f_start, f_count, fallback = record
+
+        encoded = answer.encode("utf-8")
+        for i in range(p_count):
+            key, nxt = _PAIR.unpack_from(self._mm, self._pairs_at + (p_start + i) * _PAIR.size)
+            if self._bytes(key) == encoded:
+                return Match(answer, self._str(nxt), "exact")
+
+        canonical = answer_key(answer)
+        fuzzy = [] if not canonical else [_TRIPLE.unpack_from(self._mm, self._triples_at + (f_start + i) * _TRIPLE.size)
+                 for i in range(f_count)]
+        for key_canonical, key, nxt in fuzzy:
+            if self._str(key_canonical) == canonical:
+                return Match(self._str(key), self._str(nxt), "fuzzy")
+        for key_canonical, key, nxt in fuzzy:
+            text = self._str(key_canonical)
+            if canonical in text or text in canonical:
+                return Match(self._str(key), self._str(nxt), "fuzzy")
+
+        if fallback != NONE:
+            return Match(answer, self._str(fallback), "sequential")
+        return None
@@ -0,0 +1,242 @@
+"""Export a question graph as a single self-contained offline web page.
+
+The page embeds the compiled graph (questions, suggestions, next_questions,
+context and the matcher's precomputed answer keys) and does navigation,
+history and answer matching in the browser, so it needs no server at all.
+Conversation state is kept in the browser's localStorage.
+
+    python3 script_static_export.py -o script.html
+"""
+
+import argparse
+import html
+import json
+from typing import Any, Dict
+
+from script_engine import COMPLETE, ScriptGraph
+from script_normalize import FOLD_TABLE
+from script_render import graph_version
+
+
+def graph_payload(graph: ScriptGraph) -> Dict[str, Any]:
+    """The graph in the compact form the page's matcher reads."""
+    nodes = {}
+    for question_id, node in graph.questions.items():
+        fuzzy, fallback = graph.matcher_entry(question_id)
+        nodes[question_id] = {
+            "q": node["question"],
+            "s": node["suggestions"],
+            "n": node["next_questions"],
+            "c": node["context"],
+            "f": [[lower, key, nxt] for lower, key, nxt in fuzzy],
+            "b": fallback,
+        }
+    return {"start": graph.start, "complete": COMPLETE, "nodes": nodes}
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ font-family: -apple-system, "Segoe UI", sans-serif; max-width: 860px; margin: 0 auto; padding: 1rem; color: #222; }}
+.main-header {{ background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%); padding: 1rem; border-radius: 10px;
+                color: white; text-align: center; margin-bottom: 2rem; }}
+.main-header h1 {{ margin: 0; font-size: 2rem; }}
+.question-card {{ background: #f8f9fa; padding: 1.5rem; border-radius: 10px; border-left: 4px solid #2a5298; margin: 1rem 0; }}
+.question-card p {{ font-size: 1.1rem; line-height: 1.6; }}
+.banner {{ background: #e8f4fd; color: #1e3c72; padding: 0.75rem 1rem; border-radius: 8px; }}
+.message {{ padding: 0.5rem 1rem; border-radius: 8px; }}
+.message.error {{ background: #fdecea; color: #8a1f11; }}
+.message.success {{ background: #e6f4ea; color: #1e4620; }}
+.suggestions {{ display: grid; grid-template-columns: 1fr 1fr; gap: 0.5rem; margin: 1rem 0; }}
+button {{ border: none; border-radius: 5px; padding: 0.5rem 1rem; font-weight: 500; cursor: pointer; }}
+.suggestion {{ background: #2a5298; color: white; }}
+.suggestion:hover {{ background: #1e3c72; }}
+.controls {{ display: flex; gap: 0.5rem; margin: 0.5rem 0 1.5rem; }}
+input {{ width: 100%; box-sizing: border-box; padding: 0.5rem; font-size: 1rem; }}
+.history-entry {{ border-bottom: 1px solid #ddd; padding: 0.5rem 0; }}
+</style>
+</head>
+<body>
+<div class="main-header"><h1>{title}</h1><p>Works offline</p></div>
+<div id="card" class="question-card"><h3 id="card-title"></h3><p id="card-question"></p></div>
+<div id="banner" class="banner" hidden></div>
+<div id="message" class="message" hidden></div>
+<p><strong>Click an answer below or type your own:</strong></p>
+<div id="suggestions" class="suggestions"></div>
+<form id="answer-form">
+  <input id="answer" autocomplete="off" placeholder="Or type your answer">
+  <div class="controls">
+    <button type="submit" class="suggestion">Submit Answer</button>
+    <button type="button" id="back">⬅️ Back</button>
+    <button type="button" id="reset">Reset to Beginning</button>
+  </div>
+</form>
+<h3>📝 Conversation History</h3>
+<div id="history"></div>
+<script id="graph" type="application/json">{graph}</script>
+<script>
+"use strict";
+const GRAPH = JSON.parse(document.getElementById("graph").textContent);
+const STORAGE_KEY = "script-export:" + {version};
+let state = load();
+
+function load() {{
+  try {{
+    const saved = JSON.parse(localStorage.getItem(STORAGE_KEY));
+    if (saved && GRAPH.nodes[saved.current]) return saved;
+  }} catch (e) {{}}
+  return {{ current: GRAPH.start, history: [] }};
+}}
+
+function save() {{
+  try {{ localStorage.setItem(STORAGE_KEY, JSON.stringify(state)); }} catch (e) {{}}
+}}
+
+// Same as answer_key() in script_normalize.py
+const FOLD = {fold};
+function answerKey(text) {{
+  return Array.from(text.normalize("NFKC"), c => FOLD[c] ?? c).join("")
+    .toLowerCase().split(/\\s+/).filter(Boolean).join(" ")
+    .replace(/^["' ]+/, "").replace(/["'.,!? ]+$/, "");
+}}
+
+// Same rules as ScriptGraph.match: exact key, then the same canonical key,
+// then a canonical substring either way round, then the sequential fallback.
+// Punctuation alone has an empty key and skips straight to the fallback.
+function match(questionId, answer) {{
+  const node = GRAPH.nodes[questionId];
+  if (!node) return null;
+  if (Object.prototype.hasOwnProperty.call(node.n, answer)) return {{ answer: answer, next: node.n[answer] }};
+  const canonical = answerKey(answer);
+  const fuzzy = canonical ? node.f : [];
+  for (const [keyCanonical, key, next] of fuzzy) {{
+    if (keyCanonical === canonical) return {{ answer: key, next: next }};
+  }}
+  for (const [keyCanonical, key, next] of fuzzy) {{
+    if (keyCanonical.includes(canonical) || canonical.includes(keyCanonical)) return {{ answer: key, next: next }};
+  }}
+  if (node.b !== null) return {{ answer: answer, next: node.b }};
+  return null;
+}}
+
+function submit(answer) {{
+  const result = match(state.current, answer);
+  if (!result) {{
+    show("error", "❌ Answer not recognized. Please try one of the suggested answers.");
+    return;
+  }}
+  state.history.push({{ question: state.current, answer: result.answer, next: result.next }});
+  state.current = result.next;
+  save();
+  render();
+  show("success", "✅ Answer accepted!");
+}}
+
+function jump(step) {{
+  state.current = state.history[step].question;
+  state.history.length = step;
+  save();
+  render();
+}}
+
+function show(kind, text) {{
+  const message = document.getElementById("message");
+  message.className = "message " + kind;
+  message.textContent = text;
+  message.hidden = false;
+}}
+
+function render() {{
+  const node = GRAPH.nodes[state.current];
+  document.getElementById("message").hidden = true;
+  document.getElementById("card-title").textContent = "Question " + state.current;
+  document.getElementById("card-question").textContent = node.q;
+  const banner = document.getElementById("banner");
+  banner.textContent = node.c ? "💡 Context: " + node.c : "";
+  banner.hidden = !node.c;
+
+  const suggestions = document.getElementById("suggestions");
+  suggestions.replaceChildren(...node.s.map(text => {{
+    const button = document.createElement("button");
+    button.className = "suggestion";
+    button.textContent = text;
+    button.addEventListener("click", () => submit(text));
+    return button;
+  }}));
+
+  document.getElementById("back").disabled = state.history.length === 0;
+  const history = document.getElementById("history");
+  const start = Math.max(state.history.length - 5, 0);
+  history.replaceChildren(...state.history.slice(start).map((entry, i) => {{
+    const step = start + i;
+    const div = document.createElement("div");
+    div.className = "history-entry";
+    const question = GRAPH.nodes[entry.question].q;
+    div.append(step + 1 + ". Q: " + question.slice(0, 100) + "...", document.createElement("br"),
+               "A: " + entry.answer + "  → Q" + entry.next, document.createElement("br"));
+    const button = document.createElement("button");
+    button.textContent = "↩️ Return to step " + (step + 1);
+    button.addEventListener("click", () => jump(step));
+    div.append(button);
+    return div;
+  }}).reverse());
+}}
+
+document.getElementById("answer-form").addEventListener("submit", event => {{
+  event.preventDefault();
+  const input = document.getElementById("answer");
+  const answer = input.value.trim();
+  if (!answer) {{ show("error", "Please enter an answer."); return; }}
+  input.value = "";
+  submit(answer);
+}});
+document.getElementById("back").addEventListener("click", () => {{
+  if (state.history.length) jump(state.history.length - 1);
+}});
+document.getElementById("reset").addEventListener("click", () => {{
+  state = {{ current: GRAPH.start, history: [] }};
+  save();
+  render();
+}});
+render();
+</script>
+</body>
+</html>
+"""
+
+
+def export_html(graph: ScriptGraph, title: str = "NeedGod.net Script") -> str:
+    """Render ``graph`` as one offline HTML page."""
+    # Keep "</script>" inside strings from closing the embedding tag
+    payload = json.dumps(graph_payload(graph), ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    return PAGE_TEMPLATE.format(
+        title=html.escape(title),
+        graph=payload,
+        version=json.dumps(graph_version(graph)),
+        fold=json.dumps({chr(code): value or "" for code, value in FOLD_TABLE.items()}),
+    )
+
+
+def main(argv=None) -> int:
+    from script_api import load_script_graph
+
+    parser = argparse.ArgumentParser(description="Export the script as a self-contained offline web page.")
+    parser.add_argument("--graph", choices=("complete", "ai"), default="complete")
+    parser.add_argument("--pdf", default="script.pdf", help="Script PDF for --graph ai")
+    parser.add_argument("--title", default="NeedGod.net Script")
+    parser.add_argument("-o", "--output", default="script.html")
+    args = parser.parse_args(argv)
+
+    page = export_html(load_script_graph(args.graph, args.pdf), args.title)
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(page)
+    print(f"Wrote {args.output} ({len(page.encode('utf-8')) // 1024} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,203 @@
+"""Synthetic scripts in the PDF script's format, for scale testing.
+
+Generates numbered questions with "If they answer "X" proceed to QY."
+directives, wrapped like the extracted PDF text, so the parsers, matcher and
+benchmarks can be run at any size:
+
+    python3 script_synth.py --nodes 10000 --branching 3 -o synth.txt --pdf synth.pdf
+    python3 script_synth.py --scale 100,1000,10000,100000
+
+Question ``n``'s first answer always leads to ``n + 1``, so every question is
+reachable. The other answers jump up to ``span`` questions ahead or, with
+probability ``cycle_ratio``, back to an earlier question (or the same one).
+The generator also returns the intended transitions, so a parse can be
+checked against them.
+"""
+
+import argparse
+import random
+import textwrap
+import time
+from typing import Dict, List, NamedTuple
+
+_SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pa", "do", "fi", "gu", "ha", "jo", "be")
+_STEMS = ("Do you think", "Would you say", "Have you ever wondered if", "Is it true that", "Could it be that")
+
+
+class SyntheticScript(NamedTuple):
+    text: str
+    expected: Dict[str, Dict[str, str]]   # question id -> {answer: next question id}
+    first_id: int
+    nodes: int
+
+
+def vocabulary_words(size: int, rng: random.Random) -> List[str]:
+    """``size`` distinct lower-case pseudo-words."""
+    words, seen = [], set()
+    length = 2
+    while len(words) < size:
+        for _ in range(size * 4):
+            word = "".join(rng.choice(_SYLLABLES) for _ in range(length))
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+                if len(words) == size:
+                    break
+        length += 1
+    return words
+
+
+def generate_script(nodes: int = 1000, branching: int = 3, vocabulary: int = 500, cycle_ratio: float = 0.05,
+                    span: int = 10, wrap: int = 100, seed: int = 0, first_id: int = 1) -> SyntheticScript:
+    """A script of ``nodes`` numbered questions with ``branching`` answers each."""
+    if nodes < 1 or branching < 1 or vocabulary < 1:
+        raise ValueError("nodes, branching and vocabulary must be positive")
+    rng = random.Random(seed)
+    words = vocabulary_words(vocabulary, rng)
+    last = first_id + nodes - 1
+    lines = ["SCRIPT (synthetic)", "", "Hey I have a question for you", " Sure..", ""]
+    expected: Dict[str, Dict[str, str]] = {}
+
+    for number in range(first_id, last + 1):
+        question = f"{rng.choice(_STEMS)} {' '.join(rng.sample(words, min(3, len(words))))}?"
+        lines += textwrap.wrap(f"{number}. {question}", wrap) if wrap else [f"{number}. {question}"]
+
+        answers: List[str] = []
+        attempts = 0
+        while len(answers) < branching and attempts < branching * 20:
+            attempts += 1
+            phrase = " ".join(rng.sample(words, min(rng.randint(1, 3), len(words))))
+            if phrase not in answers:
+                answers.append(phrase)
+        lines += [f" {answers[0]}..", ""]
+
+        if number == last:
+            # Like the PDF's last question: no directives, the parser's default flow applies
+            lines.append("")
+            continue
+        transitions: Dict[str, str] = {}
+        for i, answer in enumerate(answers):
+            if i == 0:
+                target = number + 1
+            elif rng.random() < cycle_ratio:
+                target = rng.randint(max(first_id, number - span), number)
+            else:
+                target = rng.randint(number + 1, min(number + span, last))
+            transitions[answer] = str(target)
+        expected[str(number)] = transitions
+
+        directives = " ".join(
+            f'If they {rng.choice(("answer", "say"))} "{answer}" proceed to Q{target}.'
+            for answer, target in transitions.items()
+        )
+        lines += textwrap.wrap(directives, wrap) if wrap else [directives]
+        lines.append("")
+
+    return SyntheticScript("\n".join(lines) + "\n", expected, first_id, nodes)
+
+
+# -- PDF -------------------------------------------------------------------
+
+def _pdf_string(line: str) -> str:
+    return "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def pdf_bytes(text: str, lines_per_page: int = 60) -> bytes:
+    """A minimal PDF 1.4 file that shows ``text`` in Helvetica, one text line per line."""
+    lines = text.encode("latin-1", "replace").decode("latin-1").split("\n")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects: List[bytes] = []   # object n is objects[n - 1]
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] "
+                   f"/Count {len(pages)} >>".encode("ascii"))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for page_id, page in zip(page_ids, pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode("ascii"))
+        body = "BT /F1 10 Tf 12 TL 40 760 Td\n" + "".join(
+            f"{_pdf_string(line)} Tj T*\n" if line else "T*\n" for line in page) + "ET"
+        stream = body.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def write_pdf(text: str, path: str, lines_per_page: int = 60) -> None:
+    with open(path, "wb") as f:
+        f.write(pdf_bytes(text, lines_per_page))
+
+
+# -- scaling ---------------------------------------------------------------
+
+def measure_scaling(sizes: List[int], branching: int = 3, seed: int = 0) -> List[Dict[str, float]]:
+    """Parse, compile and match times of generated scripts of each size."""
+    from script_engine import ScriptGraph
+    from script_parsers import parse_conversational_flow, split_lines
+
+    rows = []
+    for size in sizes:
+        script = generate_script(size, branching, vocabulary=max(50, size // 2), seed=seed)
+        started = time.perf_counter()
+        questions = parse_conversational_flow(split_lines(script.text))
+        parsed = time.perf_counter() - started
+        started = time.perf_counter()
+        graph = ScriptGraph(questions, match_on="next_questions", sequential_fallback=True)
+        compiled = time.perf_counter() - started
+        probes = [(qid, answer) for qid, answers in script.expected.items() for answer in answers][:20000]
+        started = time.perf_counter()
+        for question_id, answer in probes:
+            graph.match(question_id, answer)
+            graph.match(question_id, answer.upper())
+        matched = (time.perf_counter() - started) / (2 * len(probes)) if probes else 0.0
+        rows.append({"nodes": size, "text_kb": len(script.text) // 1024, "parse_s": parsed,
+                     "compile_s": compiled, "match_us": matched * 1e6})
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic scripts in the PDF script's format.")
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--branching", type=int, default=3, help="Answers per question")
+    parser.add_argument("--vocabulary", type=int, default=500, help="Distinct words answers are drawn from")
+    parser.add_argument("--cycles", type=float, default=0.05, help="Chance that an answer leads backwards")
+    parser.add_argument("--span", type=int, default=10, help="Furthest jump, in questions")
+    parser.add_argument("--wrap", type=int, default=100, help="Line width, as in the extracted PDF (0: no wrap)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--first-id", type=int, default=1, help="Number of the first question")
+    parser.add_argument("-o", "--output", help="Write the script text here")
+    parser.add_argument("--pdf", help="Also write it as a PDF")
+    parser.add_argument("--scale", help="Comma-separated sizes to time parsing and matching at, instead")
+    args = parser.parse_args(argv)
+
+    if args.scale:
+        print(f"{'nodes':>8} {'text KB':>8} {'parse ms':>10} {'compile ms':>11} {'match µs':>9}")
+        for row in measure_scaling([int(size) for size in args.scale.split(",")], args.branching, args.seed):
+            print(f"{row['nodes']:>8} {row['text_kb']:>8} {row['parse_s'] * 1000:>10.1f} "
+                  f"{row['compile_s'] * 1000:>11.1f} {row['match_us']:>9.2f}")
+        return 0
+
+    script = generate_script(args.nodes, args.branching, args.vocabulary, args.cycles, args.span,
+                             args.wrap, args.seed, args.first_id)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(script.text)
+    else:
+        print(script.text, end="")
+    if args.pdf:
+        write_pdf(script.text, args.pdf)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
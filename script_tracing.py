@@ -0,0 +1,148 @@
+"""Lightweight span tracing of app reruns.
+
+A rerun is traced by ``begin_trace()`` / ``end_trace()``; code inside it
+marks phases with ``with span("name"):``. Outside a traced rerun ``span()``
+returns a shared no-op context manager, so the calls can stay in place.
+Finished traces are written as JSON lines to a size-rotated local file.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+TRACE_DEFAULT = os.environ.get("SCRIPT_ANALYZER_TRACE", "") == "1"
+TRACE_FILE = os.environ.get("SCRIPT_ANALYZER_TRACE_FILE",
+                            os.path.join(tempfile.gettempdir(), "script_analyzer_traces.jsonl"))
+TRACE_FILE_BYTES = 5 * 1024 * 1024
+TRACE_FILE_BACKUPS = 3
+
+
+class Span(NamedTuple):
+    """One timed phase; ``start`` is a perf_counter() reading."""
+    name: str
+    start: float
+    duration: float
+    depth: int
+
+
+class RerunTrace:
+    """Spans recorded during one rerun, plus any carried over from its callbacks."""
+
+    __slots__ = ("page", "session_id", "started_at", "origin", "total", "spans", "depth")
+
+    def __init__(self, page: str, session_id: str = "", pending: Iterable[Span] = ()):
+        now = time.perf_counter()
+        self.spans: List[Span] = list(pending)
+        # Callbacks run just before the script, so the trace starts with them
+        self.origin = min([now] + [s.start for s in self.spans])
+        self.started_at = time.time() - (now - self.origin)
+        self.page = page
+        self.session_id = session_id
+        self.total = 0.0
+        self.depth = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "page": self.page,
+            "session_id": self.session_id,
+            "started_at": self.started_at,
+            "total_ms": round(self.total * 1000, 3),
+            "spans": [
+                {"name": s.name, "offset_ms": round((s.start - self.origin) * 1000, 3),
+                 "duration_ms": round(s.duration * 1000, 3), "depth": s.depth}
+                for s in sorted(self.spans, key=lambda s: (s.start, s.depth))
+            ],
+        }
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("rerun_trace", default=None)
+
+
+class _SpanContext:
+    __slots__ = ("trace", "name", "start", "depth")
+
+    def __init__(self, trace: RerunTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.trace.depth
+        self.trace.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        self.trace.depth -= 1
+        self.trace.spans.append(Span(self.name, self.start, duration, self.depth))
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """Time a phase of the current traced rerun; a no-op when none is active."""
+    trace = _current.get()
+    return _NO_SPAN if trace is None else _SpanContext(trace, name)
+
+
+def current_trace() -> Optional[RerunTrace]:
+    return _current.get()
+
+
+def begin_trace(page: str, session_id: str = "", pending: Iterable[Span] = ()) -> Tuple[RerunTrace, Any]:
+    """Start tracing a rerun. Returns the trace and a token for end_trace()."""
+    trace = RerunTrace(page, session_id, pending)
+    return trace, _current.set(trace)
+
+
+def end_trace(trace: RerunTrace, token) -> RerunTrace:
+    """Finish a rerun's trace and stop collecting spans into it."""
+    trace.total = time.perf_counter() - trace.origin
+    _current.reset(token)
+    return trace
+
+
+_logger: Optional[logging.Logger] = None
+
+
+def write_trace(trace: RerunTrace) -> None:
+    """Append a finished trace to the rotating trace file."""
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("script_analyzer.trace")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            handler = RotatingFileHandler(TRACE_FILE, maxBytes=TRACE_FILE_BYTES, backupCount=TRACE_FILE_BACKUPS,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        _logger = logger
+    _logger.info(json.dumps(trace.to_dict()))
+
+
+def waterfall_rows(trace: RerunTrace) -> List[Tuple[str, float, float, int, float]]:
+    """(name, left %, width %, depth, milliseconds) for each span, for drawing a waterfall."""
+    total = trace.total or 1e-9
+    rows = []
+    for s in sorted(trace.spans, key=lambda s: (s.start, s.depth)):
+        left = max(s.start - trace.origin, 0.0) / total * 100
+        rows.append((s.name, left, max(s.duration / total * 100, 0.5), s.depth, s.duration * 1000))
+    return rows
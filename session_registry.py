@@ -0,0 +1,128 @@
+"""Per-process registry of live analyzer sessions with idle eviction."""
+
+import os
+import sys
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from script_metrics import SESSION_ACTIVATIONS
+
+DEFAULT_IDLE_TIMEOUT = float(os.environ.get("SCRIPT_ANALYZER_IDLE_TIMEOUT", "1800"))
+
+
+def approx_size(obj: Any, exclude: Iterable[Any] = ()) -> int:
+    """Rough deep size of ``obj`` in bytes, following containers and instance attributes."""
+    seen = {id(item) for item in exclude}
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (type, threading.Thread)):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+    return total
+
+
+class SessionStats(NamedTuple):
+    """Memory and activity snapshot of one session."""
+    session_id: str
+    idle_seconds: float
+    analyzer_bytes: int
+    state_bytes: int
+
+
+class _Entry:
+    __slots__ = ("analyzer", "last_seen", "state_bytes")
+
+    def __init__(self, analyzer, last_seen: float, state_bytes: int):
+        self.analyzer = analyzer
+        self.last_seen = last_seen
+        self.state_bytes = state_bytes
+
+
+class SessionRegistry:
+    """Tracks the analyzer held by each session and offloads idle ones.
+
+    Analyzers are held through weak references, so sessions the server has
+    already dropped disappear on their own. Sessions idle for longer than
+    ``idle_timeout`` are offloaded: the analyzer releases its per-session
+    state (recoverable from the session store) and the app rebuilds it on
+    that session's next rerun.
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT, sweep_interval: float = 60.0):
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.evicted_total = 0
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def touch(self, session_id: str, analyzer, state_bytes: int = 0) -> None:
+        """Mark a session active and sweep idle sessions if one is due."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry.analyzer() is not analyzer:
+                if entry is None:
+                    SESSION_ACTIVATIONS.inc()
+                self._entries[session_id] = _Entry(weakref.ref(analyzer), now, state_bytes)
+            else:
+                entry.last_seen = now
+                entry.state_bytes = state_bytes
+        if now - self._last_sweep >= self.sweep_interval:
+            self.evict_idle(now)
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """Offload every session idle past the timeout. Returns their ids."""
+        now = time.monotonic() if now is None else now
+        self._last_sweep = now
+        evicted = []
+        with self._lock:
+            for session_id, entry in list(self._entries.items()):
+                analyzer = entry.analyzer()
+                if analyzer is None:
+                    del self._entries[session_id]
+                elif now - entry.last_seen >= self.idle_timeout:
+                    analyzer.offload()
+                    del self._entries[session_id]
+                    evicted.append(session_id)
+        self.evicted_total += len(evicted)
+        return evicted
+
+    def stats(self) -> List[SessionStats]:
+        """Per-session snapshot, largest first."""
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.items())
+        result = []
+        for session_id, entry in entries:
+            analyzer = entry.analyzer()
+            if analyzer is None:
+                continue
+            # The store and the compiled graph are shared across sessions
+            shared = (getattr(analyzer, "store", None), getattr(analyzer, "graph", None))
+            size = approx_size(analyzer, exclude=shared)
+            result.append(SessionStats(session_id, now - entry.last_seen, size, entry.state_bytes))
+        result.sort(key=lambda s: s.analyzer_bytes + s.state_bytes, reverse=True)
+        return result
+
+    def totals(self) -> Dict[str, int]:
+        """Process-wide totals for the debug panel."""
+        stats = self.stats()
+        return {
+            "sessions": len(stats),
+            "analyzer_bytes": sum(s.analyzer_bytes for s in stats),
+            "state_bytes": sum(s.state_bytes for s in stats),
+            "evicted_total": self.evicted_total,
+        }
@@ -0,0 +1,291 @@
+"""Durable SQLite store for conversation cursors and history."""
+
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from script_history import HistoryEntry
+
+DEFAULT_DB_PATH = os.environ.get("SCRIPT_ANALYZER_DB", "sessions.db")
+
+logger = logging.getLogger("script_analyzer.session_store")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    question_id TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    session_id TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    question_id TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    next_question TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (session_id, step)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS session_graphs (
+    session_id TEXT PRIMARY KEY,
+    graph TEXT NOT NULL
+);
+"""
+
+
+class ResumedSession(NamedTuple):
+    """Saved state of one conversation."""
+    question_id: str
+    total_steps: int
+    history: List[HistoryEntry]
+
+
+class TranscriptRow(NamedTuple):
+    """One stored step, tagged with the conversation it belongs to."""
+    session_id: str
+    step: int
+    question_id: str
+    answer: str
+    next_question: str
+    timestamp: float
+
+
+class SessionStore:
+    """SQLite (WAL mode) store with a background, batching writer.
+
+    Writes are queued and committed by a single writer thread in batches, so
+    callers on the request path only pay for a ``queue.put``. Reads go through
+    a separate connection and see everything committed so far; call
+    ``flush()`` first to also see writes that are still queued.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, batch_size: int = 256,
+                 flush_interval: float = 0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+        self._read_lock = threading.Lock()
+        self._reader = self._connect()
+        self._writer = threading.Thread(target=self._write_loop, name="session-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # -- writes (asynchronous) -------------------------------------------
+
+    def record_step(self, session_id: str, entry: HistoryEntry) -> None:
+        """Queue one answered step and the cursor move it implies."""
+        self._queue.put(("step", session_id, entry))
+
+    def save_cursor(self, session_id: str, question_id: str) -> None:
+        """Queue a cursor move that is not tied to an answer."""
+        self._queue.put(("cursor", session_id, question_id))
+
+    def clear_session(self, session_id: str, question_id: str = "start") -> None:
+        """Queue removal of a session's history and reset its cursor."""
+        self._queue.put(("clear", session_id, question_id))
+
+    def tag_session(self, session_id: str, graph: str) -> None:
+        """Queue recording which graph (e.g. parse strategy) a session's answers were given on."""
+        self._queue.put(("tag", session_id, graph))
+
+    def delete_session(self, session_id: str) -> None:
+        """Queue removal of a session's cursor and history, so it can no longer be resumed."""
+        self._queue.put(("delete", session_id, None))
+
+    def truncate_session(self, session_id: str, step: int, question_id: str) -> None:
+        """Queue removal of ``step`` and later steps, moving the cursor back."""
+        self._queue.put(("truncate", session_id, (step, question_id)))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every queued write has been committed."""
+        done = threading.Event()
+        self._queue.put(("sync", None, done))
+        done.wait(timeout)
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            stop = self._apply(conn, batch)
+            if stop:
+                conn.close()
+                return
+
+    def _apply(self, conn: sqlite3.Connection, batch: list) -> bool:
+        """Commit one batch in a single transaction. Returns True on shutdown.
+
+        If the transaction fails, each write is retried in its own, so one
+        bad write only loses itself.
+        """
+        writes = [item for item in batch if item[0] not in ("sync", "stop")]
+        try:
+            conn.execute("BEGIN")
+            for item in writes:
+                self._write(conn, *item)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            logger.exception("Session store batch of %d writes failed; retrying one at a time", len(writes))
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for item in writes:
+                try:
+                    conn.execute("BEGIN")
+                    self._write(conn, *item)
+                    conn.execute("COMMIT")
+                except sqlite3.Error:
+                    logger.exception("Dropped %s write for session %s", item[0], item[1])
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+        stop = False
+        for kind, _, payload in batch:
+            if kind in ("sync", "stop"):
+                payload.set()
+                stop = stop or kind == "stop"
+        return stop
+
+    def _write(self, conn: sqlite3.Connection, kind: str, session_id: str, payload) -> None:
+        if kind == "step":
+            conn.execute(
+                "INSERT OR REPLACE INTO steps VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, payload.step, payload.question_id, payload.answer,
+                 payload.next_question, payload.timestamp),
+            )
+            self._upsert_cursor(conn, session_id, payload.next_question, payload.timestamp)
+        elif kind == "cursor":
+            self._upsert_cursor(conn, session_id, payload, time.time())
+        elif kind == "clear":
+            conn.execute("DELETE FROM steps WHERE session_id = ?", (session_id,))
+            self._upsert_cursor(conn, session_id, payload, time.time())
+        elif kind == "tag":
+            conn.execute("INSERT OR REPLACE INTO session_graphs VALUES (?, ?)", (session_id, payload))
+        elif kind == "delete":
+            conn.execute("DELETE FROM steps WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_graphs WHERE session_id = ?", (session_id,))
+        elif kind == "truncate":
+            step, question_id = payload
+            conn.execute("DELETE FROM steps WHERE session_id = ? AND step >= ?", (session_id, step))
+            self._upsert_cursor(conn, session_id, question_id, time.time())
+
+    @staticmethod
+    def _upsert_cursor(conn: sqlite3.Connection, session_id: str, question_id: str, when: float) -> None:
+        conn.execute(
+            "INSERT INTO sessions VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET question_id = excluded.question_id, "
+            "updated_at = excluded.updated_at",
+            (session_id, question_id, when),
+        )
+
+    # -- reads -------------------------------------------------------------
+
+    def resume(self, session_id: str, limit: int = 64) -> Optional[ResumedSession]:
+        """Load a session's cursor and its latest ``limit`` steps, if saved."""
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT question_id FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            total = self._reader.execute(
+                "SELECT COUNT(*) FROM steps WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+            rows = self._reader.execute(
+                "SELECT step, question_id, answer, next_question, timestamp FROM steps "
+                "WHERE session_id = ? ORDER BY step DESC LIMIT ?",
+                (session_id, limit),
+            ).fetchall()
+        return ResumedSession(row[0], total, [HistoryEntry(*r) for r in reversed(rows)])
+
+    def answer_counts(self, graph: Optional[str] = None, min_count: int = 3,
+                      per_question: int = 20) -> Dict[str, Dict[str, int]]:
+        """Answers given at least ``min_count`` times, per question, most often given first.
+
+        Graphs reuse question ids, so pass ``graph`` to count only sessions
+        tagged with it (see ``tag_session``).
+        """
+        where, params = "", [min_count]
+        if graph is not None:
+            where, params = "JOIN session_graphs USING (session_id) WHERE graph = ? ", [graph, min_count]
+        with self._read_lock:
+            rows = self._reader.execute(
+                f"SELECT question_id, answer, COUNT(*) AS given FROM steps {where}GROUP BY question_id, answer "
+                "HAVING given >= ? ORDER BY question_id, given DESC, answer",
+                params,
+            ).fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for question_id, answer, given in rows:
+            answers = counts.setdefault(question_id, {})
+            if len(answers) < per_question:
+                answers[answer] = given
+        return counts
+
+    def iter_steps(self, session_ids: Optional[Sequence[str]] = None,
+                   since: Optional[float] = None, until: Optional[float] = None,
+                   batch_size: int = 1000) -> Iterator[TranscriptRow]:
+        """Stream stored steps in (session, step) order, optionally filtered.
+
+        Rows are fetched ``batch_size`` at a time on a dedicated connection,
+        so memory stays flat however many rows match.
+        """
+        clauses, params = [], []
+        if session_ids:
+            clauses.append(f"session_id IN ({', '.join('?' * len(session_ids))})")
+            params.extend(session_ids)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        sql = "SELECT session_id, step, question_id, answer, next_question, timestamp FROM steps"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY session_id, step"
+
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield TranscriptRow(*row)
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        """Commit outstanding writes and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        done = threading.Event()
+        self._queue.put(("stop", None, done))
+        done.wait(5)
+        self._reader.close()
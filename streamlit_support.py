@@ -0,0 +1,292 @@
+"""Shared Streamlit helpers for the analyzer apps."""
+
+import functools
+import html
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import script_profiling
+from script_autocomplete import completion_page
+from script_metrics import RENDER_SECONDS, ensure_http_server
+from script_tracing import (
+    TRACE_DEFAULT,
+    TRACE_FILE,
+    Span,
+    begin_trace,
+    current_trace,
+    end_trace,
+    span,
+    waterfall_rows,
+    write_trace,
+)
+from session_registry import SessionRegistry, approx_size
+from session_store import SessionStore
+
+
+@st.cache_resource
+def get_session_store() -> SessionStore:
+    """One SQLite session store per server process."""
+    return SessionStore()
+
+
+@st.cache_resource
+def get_session_registry() -> SessionRegistry:
+    """One session registry per server process."""
+    return SessionRegistry()
+
+
+@st.cache_resource
+def get_common_answers(strategy: str) -> Dict[str, Dict[str, int]]:
+    """Answers operators often give on ``strategy``'s graph, per question, read once per server process."""
+    return get_session_store().answer_counts(strategy)
+
+
+TRACE_HISTORY = 20  # reruns kept per session for the waterfall panel
+
+
+def tracing_enabled() -> bool:
+    """Whether this session traces its reruns (the debug toggle, or SCRIPT_ANALYZER_TRACE=1)."""
+    return st.session_state.get("trace_enabled", TRACE_DEFAULT)
+
+
+def timed_render(page: str):
+    """Record every run of a page (or fragment) function in the render histogram.
+
+    With tracing on, a run that is not already inside a traced rerun starts a
+    trace: the function becomes its root span, phases inside it add child
+    spans, and the finished trace is kept for the debug panel and written to
+    the trace file. The first run also starts the local /metrics endpoint.
+    """
+    histogram = RENDER_SECONDS.labels(page)
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            ensure_http_server()
+            trace = token = None
+            if current_trace() is None and tracing_enabled():
+                pending = st.session_state.pop("_pending_spans", ())
+                trace, token = begin_trace(page, st.query_params.get("sid", ""), pending)
+            started = time.perf_counter()
+            try:
+                with span(page):
+                    return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+                if trace is not None:
+                    end_trace(trace, token)
+                    if "_traces" not in st.session_state:
+                        st.session_state["_traces"] = deque(maxlen=TRACE_HISTORY)
+                    st.session_state["_traces"].append(trace)
+                    write_trace(trace)
+        return wrapper
+    return decorate
+
+
+def get_session_id() -> str:
+    """Stable id for this operator, kept in the URL so it survives restarts."""
+    session_id = st.query_params.get("sid")
+    if not session_id:
+        session_id = uuid.uuid4().hex
+        st.query_params["sid"] = session_id
+    return session_id
+
+
+def track_session(session_id: str, analyzer) -> None:
+    """Report this session's analyzer and widget state to the registry."""
+    state = {key: value for key, value in st.session_state.items() if key != "analyzer"}
+    get_session_registry().touch(session_id, analyzer, approx_size(state))
+
+
+def prune_widget_state(prefix: str, keep: str) -> None:
+    """Drop per-question widget state left behind by earlier questions."""
+    for key in list(st.session_state.keys()):
+        if key.startswith(prefix) and key != keep:
+            del st.session_state[key]
+
+
+def flash(kind: str, message: str) -> None:
+    """Queue a message (``"success"``, ``"warning"``, ...) for the next run to show."""
+    st.session_state["_flash"] = (kind, message)
+
+
+def show_flash() -> None:
+    """Show and clear the message queued by a callback, if any."""
+    queued = st.session_state.pop("_flash", None)
+    if queued is not None:
+        kind, message = queued
+        getattr(st, kind)(message)
+
+
+def _live_analyzer():
+    """The session's analyzer, or None if there is none or it was offloaded while idle."""
+    analyzer = st.session_state.get("analyzer")
+    if analyzer is not None and getattr(analyzer, "offloaded", False):
+        flash("warning", "⚠️ This session was idle and has been restored. Please try again.")
+        return None
+    return analyzer
+
+
+# Widget callbacks. Streamlit runs these before the script reruns, so a click
+# updates the analyzer and the page renders the new question in a single run.
+
+@contextmanager
+def _callback_span(name: str):
+    """Time a callback; the span joins the trace of the rerun that follows it."""
+    if not tracing_enabled():
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans = st.session_state.setdefault("_pending_spans", [])
+        spans.append(Span(f"callback: {name}", started, time.perf_counter() - started, 0))
+
+
+def on_submit(answer: Optional[str] = None, key: Optional[str] = None,
+              accepted: str = "✅ Answer submitted!",
+              rejected: str = "⚠️ Answer not recognized. Staying on current question.",
+              rejected_kind: str = "warning") -> None:
+    """Submit ``answer``, or the value of the widget with ``key``."""
+    with _callback_span("submit_answer"):
+        analyzer = _live_analyzer()
+        if analyzer is None:
+            return
+        if key is not None:
+            answer = st.session_state.get(key, "")
+        answer = (answer or "").strip()
+        if not answer:
+            flash("warning", "⚠️ Please enter an answer before submitting.")
+        elif analyzer.submit_answer(answer):
+            flash("success", accepted)
+        else:
+            flash(rejected_kind, rejected)
+
+
+def on_action(method: str, *args, message: str = "", failed: str = "") -> None:
+    """Call ``analyzer.<method>(*args)``, queueing ``failed`` if it returns False."""
+    with _callback_span(method):
+        analyzer = _live_analyzer()
+        if analyzer is None:
+            return
+        if getattr(analyzer, method)(*args) is False:
+            if failed:
+                flash("warning", failed)
+        elif message:
+            flash("success", message)
+
+
+def render_completions(analyzer, input_label: str) -> None:
+    """Completions under the answer box labelled ``input_label``, updated in the browser as it is typed in."""
+    trie = analyzer.graph.completions.get(analyzer.current_question_id)
+    if trie is not None and trie.complete(""):
+        components.html(completion_page(trie, input_label), height=40)
+
+
+SEARCH_RESULTS = 5
+
+
+def render_search(analyzer, key: str = "search") -> None:
+    """Search box over the script; picking a result jumps straight to that question."""
+    query = st.text_input("🔎 Jump to question", key=key, placeholder="Search questions and context")
+    if not query.strip():
+        return
+    hits = analyzer.graph.search_index.search(query, SEARCH_RESULTS)
+    if not hits:
+        st.caption("No matching questions.")
+    for hit in hits:
+        question = analyzer.questions[hit.question_id]["question"]
+        st.button(f"Q{hit.question_id}: {question[:80]}", key=f"{key}_{hit.question_id}",
+                  on_click=on_action, args=("go_to_question", hit.question_id))
+
+
+def render_memory_panel() -> None:
+    """Per-process session memory totals, for the debug area."""
+    registry = get_session_registry()
+    totals = registry.totals()
+    st.markdown("### 🧠 Session Memory")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Sessions", totals["sessions"])
+    col2.metric("Approx. KB", (totals["analyzer_bytes"] + totals["state_bytes"]) // 1024)
+    col3.metric("Evicted", totals["evicted_total"])
+    st.caption(f"Idle sessions are offloaded after {registry.idle_timeout:.0f}s.")
+    st.table([
+        {
+            "Session": stats.session_id[:8],
+            "Idle (s)": round(stats.idle_seconds),
+            "Analyzer KB": round(stats.analyzer_bytes / 1024, 1),
+            "Widget state KB": round(stats.state_bytes / 1024, 1),
+        }
+        for stats in registry.stats()
+    ])
+
+
+def render_trace_panel(limit: int = 5) -> None:
+    """Toggle for rerun tracing and a timing waterfall of the last ``limit`` reruns."""
+    st.markdown("### 🧭 Rerun Traces")
+    st.checkbox("Trace reruns", key="trace_enabled", value=TRACE_DEFAULT,
+                help=f"Spans are also appended to {TRACE_FILE}")
+    traces = list(st.session_state.get("_traces", ()))[-limit:]
+    if not traces:
+        st.caption("No traced reruns yet.")
+        return
+    for trace in reversed(traces):
+        rows = "".join(
+            '<div style="display:flex;align-items:center;font-size:0.75rem;line-height:1.3">'
+            f'<div style="width:40%;padding-left:{depth * 0.6}rem;white-space:nowrap;overflow:hidden;'
+            f'text-overflow:ellipsis">{html.escape(name)} <small>{ms:.2f} ms</small></div>'
+            '<div style="width:60%;position:relative;height:0.7rem;background:#eef2f7">'
+            f'<div style="position:absolute;left:{left:.2f}%;width:{width:.2f}%;height:100%;'
+            'background:#2a5298"></div></div></div>'
+            for name, left, width, depth, ms in waterfall_rows(trace)
+        )
+        st.markdown(f"**{html.escape(trace.page)}** · {trace.total * 1000:.1f} ms"
+                    f"<div>{rows}</div>", unsafe_allow_html=True)
+
+
+def _profile_parse() -> None:
+    """Parse a fresh copy of this session's script under the profiler."""
+    analyzer = _live_analyzer()
+    if analyzer is None:
+        return
+    script_profiling.arm("parse_script")
+    # The profiled build replaces the cached graph, so it must be built the same way
+    if analyzer.fresh_copy().parse_script():
+        flash("success", "🔬 parse_script() profiled.")
+    else:
+        script_profiling.disarm("parse_script")
+        flash("warning", "⚠️ The script could not be parsed.")
+
+
+def render_profile_panel() -> None:
+    """Buttons that arm cProfile/tracemalloc captures, and the latest summaries."""
+    st.markdown("### 🔬 Profiling")
+    col1, col2 = st.columns(2)
+    col1.button("Profile parse_script()", on_click=_profile_parse)
+    calls = col2.number_input("Answers to profile", min_value=1, max_value=1000, value=10, key="profile_calls")
+    col2.button("Profile next answers", on_click=script_profiling.arm, args=("submit_answer", calls))
+    for label, remaining in script_profiling.armed().items():
+        st.caption(f"⏳ {label}: {remaining} call(s) left to capture")
+    latest = script_profiling.reports()
+    if not latest:
+        st.caption(f"No captures yet. Files are written to {script_profiling.PROFILE_DIR}")
+        return
+    report = latest[-1]
+    st.markdown(f"**{report.label}** · {report.calls} call(s) · {report.seconds * 1000:.1f} ms")
+    st.table([
+        {"Function": name, "Calls": calls, "Own ms": round(own * 1000, 3), "Cumulative ms": round(cumulative * 1000, 3)}
+        for name, calls, own, cumulative in report.top_functions
+    ])
+    if report.top_allocations:
+        st.table([
+            {"Allocated at": where, "KB grown": round(size / 1024, 1), "Blocks": count}
+            for where, size, count in report.top_allocations
+        ])
+    st.caption(f"`{report.stats_path}` · `{report.snapshot_path}`")
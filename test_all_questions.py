@@ -4,7 +4,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from script_analyzer_ai import AIScriptAnalyzer
+from script_engine import AIScriptAnalyzer
 
 def test_all_questions():
     """Test all questions and their answer suggestions."""
@@ -0,0 +1,111 @@
+"""Test the asyncio JSON API."""
+
+import asyncio
+import json
+import os
+import socket
+
+from script_api import ApiClient, ConversationService, HttpError, load_script_graph, load_test, serve
+from session_store import SessionStore
+
+
+def _run_with_server(scenario):
+    """Start the API on a free port, run ``scenario(port)``, then stop it."""
+    async def run():
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        server = asyncio.ensure_future(serve(ConversationService(load_script_graph()), sock=sock))
+        await asyncio.sleep(0.05)
+        try:
+            return await scenario(port)
+        finally:
+            server.cancel()
+    return asyncio.run(run())
+
+
+def test_api_conversation():
+    """Start a conversation, answer, read history, end it."""
+    async def scenario(port):
+        client = ApiClient(port=port)
+        status, state = await client.request("POST", "/conversations")
+        assert status == 201
+        assert state["question"]["question_id"] == "start"
+        cid = state["conversation_id"]
+
+        status, state = await client.request("POST", f"/conversations/{cid}/answers", {"answer": "Sure"})
+        assert state["accepted"] and state["question"]["question_id"] == "1"
+        status, state = await client.request("POST", f"/conversations/{cid}/answers", {"answer": "purple"})
+        assert not state["accepted"] and state["question"]["question_id"] == "1"
+
+        status, history = await client.request("GET", f"/conversations/{cid}/history")
+        assert [entry["answer"] for entry in history["history"]] == ["Sure"]
+
+        status, _ = await client.request("DELETE", f"/conversations/{cid}")
+        assert status == 200
+        status, _ = await client.request("GET", f"/conversations/{cid}")
+        assert status == 404
+        await client.close()
+    _run_with_server(scenario)
+
+
+def test_bad_content_length_is_a_400():
+    """A Content-Length that is not a plain number is refused rather than killing the handler."""
+    async def scenario(port):
+        replies = []
+        for length in ("abc", "-1", "²"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"POST /conversations HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode("latin-1"))
+            replies.append(await reader.read())
+            writer.close()
+        return replies
+    for reply in _run_with_server(scenario):
+        assert reply.startswith(b"HTTP/1.1 400 ") and b"invalid Content-Length" in reply
+
+
+def test_body_cut_short_just_closes():
+    """A client that hangs up mid-body is dropped without an unhandled task error."""
+    errors = []
+
+    async def scenario(port):
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /conversations HTTP/1.1\r\nContent-Length: 100\r\n\r\n{")
+        await writer.drain()
+        writer.close()
+        await asyncio.sleep(0.05)
+        client = ApiClient(port=port)
+        status, _ = await client.request("POST", "/conversations")
+        await client.close()
+        return status, list(errors)
+    assert _run_with_server(scenario) == (201, [])
+
+
+def test_ended_conversation_stays_ended_with_a_store(tmp_path):
+    """DELETE removes a stored conversation, so neither this service nor a new one resumes it."""
+    store = SessionStore(os.path.join(str(tmp_path), "sessions.db"))
+    service = ConversationService(load_script_graph(), store=store)
+    status, state = service.start()
+    cid = json.loads(state)["conversation_id"]
+    service.answer(cid, {"answer": "Sure"})
+    service.end(cid)
+    for current in (service, service, ConversationService(load_script_graph(), store=store)):
+        try:
+            current.current(cid)
+        except HttpError as e:
+            assert e.status == 404
+        else:
+            raise AssertionError("ended conversation was resumed")
+        store.flush()
+        assert store.resume(cid) is None
+    store.close()
+
+
+def test_api_load_test():
+    """The bundled load-test client completes its conversations."""
+    async def scenario(port):
+        return await load_test(load_script_graph(), port=port, conversations=20, concurrency=5)
+    result = _run_with_server(scenario)
+    assert result["conversations"] == 20
+    assert result["requests"] > 20
+    assert result["p99_ms"] >= result["p50_ms"]
@@ -0,0 +1,53 @@
+"""Test answer completion from suggestions and common answers."""
+
+import os
+
+from script_autocomplete import AnswerTrie, completion_answers, completion_page
+from script_engine import CompleteScriptAnalyzer, compile_script
+from script_history import ConversationHistory
+from session_store import SessionStore
+
+
+def test_trie_completes_canonical_prefixes_in_rank_order():
+    answers = completion_answers(["Not sure", "Heaven and Hell", "Heaven", "Hell"],
+                                 {"heaven": 2, "Hello there": 1, "“No idea”": 3})
+    assert answers == ["“No idea”", "Heaven", "Hello there", "Not sure", "Heaven and Hell", "Hell"]
+
+    trie = AnswerTrie(answers, limit=3)
+    assert trie.complete("HE") == ("Heaven", "Hello there", "Heaven and Hell")
+    assert trie.complete("heaven ") == ("Heaven", "Heaven and Hell")
+    assert trie.complete("  Heaven  a") == ("Heaven and Hell",)
+    assert trie.complete("no i") == ("“No idea”",)
+    assert trie.complete("x") == () and trie.complete("heavy") == ()
+    assert '"Or type your answer:"' in completion_page(trie, "Or type your answer:")
+
+
+def test_common_answers_from_the_store_reach_the_graph(tmp_path):
+    store = SessionStore(os.path.join(str(tmp_path), "sessions.db"))
+    for session in range(4):
+        history = ConversationHistory(capacity=8)
+        store.record_step(str(session), history.append("1", "Heaven and Hell", "1a"))
+        answer = "Purgatory" if session < 3 else "Limbo"
+        store.record_step(str(session), history.append("1a", answer, "2"))
+        store.tag_session(str(session), "curated")
+    for session in range(4, 7):     # the same ids on another graph
+        history = ConversationHistory(capacity=8)
+        store.record_step(str(session), history.append("1", "Something else", "2"))
+        store.tag_session(str(session), "ai-heuristic")
+    store.flush()
+    counts = store.answer_counts("curated", min_count=3)
+    assert store.answer_counts("ai-heuristic", min_count=3) == {"1": {"Something else": 3}}
+
+    analyzer = CompleteScriptAnalyzer("script.pdf")
+    analyzer.parse_script()
+    analyzer.attach_store(store, "analyzer")
+    analyzer.submit_answer("Sure")
+    store.flush()
+    assert store.answer_counts("curated", min_count=1)["start"] == {"Sure": 1}
+    store.close()
+    assert counts == {"1": {"Heaven and Hell": 4}, "1a": {"Purgatory": 3}}
+
+    graph = compile_script("curated", common_answers=counts)
+    assert graph.complete("1", "h")[0] == "Heaven and Hell"
+    assert graph.complete("1a", "pu") == ("Purgatory",)
+    assert graph.complete("1a", "li") == () and graph.complete("missing", "a") == ()
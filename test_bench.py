@@ -0,0 +1,55 @@
+"""Test the benchmark runner and regression gate."""
+
+import json
+
+from script_bench import (Result, compare, load_baseline, main, missing_from, run_benchmarks, save_baseline,
+                         summarize)
+
+
+def test_summary_and_gate():
+    """Median/IQR summary; only slowdowns past both threshold and noise fail."""
+    result = summarize([5.0, 1.0, 3.0, 2.0, 4.0])
+    assert (result.median, result.q1, result.q3, result.iqr) == (3.0, 2.0, 4.0, 2.0)
+
+    baseline = {"a": Result(1.0, 0.98, 1.02, 15), "b": Result(1.0, 0.9, 1.1, 15), "c": Result(1.0, 1.0, 1.0, 15)}
+    current = {"a": Result(1.2, 1.0, 1.6, 15),      # 20% slower, well outside the baseline noise
+               "b": Result(1.15, 1.1, 1.2, 15),     # past 10%, but within the baseline IQR
+               "c": Result(1.05, 1.04, 1.06, 15),   # within the threshold
+               "new": Result(9.0, 9.0, 9.0, 15)}    # no baseline entry
+    verdicts = {c.name: c.regressed for c in compare(current, baseline, 0.10)}
+    assert verdicts == {"a": True, "b": False, "c": False}
+    assert not compare(current, baseline, 0.10, {"a": 0.25})[0].regressed
+
+
+def test_baseline_round_trip_and_exit_code(tmp_path, capsys):
+    results, _ = run_benchmarks(["answer_match", "submit_walk"], warmup=1, repeat=3)
+    assert all(r.median > 0 and r.samples == 3 for r in results.values())
+
+    path = tmp_path / "baseline.json"
+    save_baseline(str(path), results)
+    assert load_baseline(str(path)) == results
+
+    # A baseline a thousand times faster than reality must trip the gate
+    data = json.loads(path.read_text())
+    for entry in data["benchmarks"].values():
+        for key in ("median", "q1", "q3", "iqr"):
+            entry[key] /= 1000
+    path.write_text(json.dumps(data))
+    assert main(["--only", "answer_match", "--repeat", "3", "--baseline", str(path)]) == 1
+    assert "REGRESSED" in capsys.readouterr().out
+
+
+def test_missing_baseline_entries_fail_the_gate(tmp_path, capsys, monkeypatch):
+    """A baseline benchmark the run did not measure fails unless --allow-missing is given."""
+    measured = {"answer_match": Result(1.0, 1.0, 1.0, 3)}
+    baseline = {**measured, "retired": Result(1.0, 1.0, 1.0, 3)}
+    assert missing_from(measured, baseline) == ["retired"]
+    assert missing_from(measured, baseline, ["answer_match"]) == []
+
+    monkeypatch.setattr("script_bench.run_benchmarks", lambda names, warmup, repeat: (measured, {}))
+    path = tmp_path / "baseline.json"
+    save_baseline(str(path), baseline)
+    assert main(["--baseline", str(path)]) == 1
+    assert "retired" in capsys.readouterr().err
+    assert main(["--baseline", str(path), "--allow-missing"]) == 0
+    assert main(["--baseline", str(path), "--only", "answer_match"]) == 0
@@ -0,0 +1,39 @@
+"""Test the headless conversation engine."""
+
+import subprocess
+import sys
+
+from script_engine import CompleteScriptAnalyzer, ScriptGraph
+from script_parsers import parse_conversational_flow, split_lines
+
+
+def test_engine_has_no_ui_imports():
+    """Importing the engine must not pull in Streamlit or PyPDF2."""
+    code = "import sys, script_engine; print('streamlit' in sys.modules or 'PyPDF2' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_graph_is_shared():
+    """Every analyzer uses the same compiled graph but keeps its own cursor."""
+    first = CompleteScriptAnalyzer("script.pdf")
+    second = CompleteScriptAnalyzer("script.pdf")
+    first.parse_script()
+    second.parse_script()
+    assert first.graph is second.graph
+
+    assert first.submit_answer("Sure")
+    assert first.submit_answer("heaven and hell")
+    assert first.current_question_id == "1a"
+    assert second.current_question_id == "start"
+    assert [entry.answer for entry in first.conversation_history] == ["Sure", "Heaven and Hell"]
+
+
+def test_sequential_fallback():
+    """PDF-parsed graphs move on to the next number when nothing matches."""
+    with open("script_text.txt", encoding="utf-8") as f:
+        questions = parse_conversational_flow(split_lines(f.read()))
+    graph = ScriptGraph(questions, match_on="next_questions", sequential_fallback=True)
+    assert graph.match("2", "No").next_question == "2b"
+    assert graph.match("5", "purple").kind == "sequential"
+    assert graph.match("2b", "purple") is None
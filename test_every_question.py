@@ -3,7 +3,7 @@
 Comprehensive test script to test every question and answer path in the complete script analyzer.
 """
 
-from script_analyzer_complete import CompleteScriptAnalyzer
+from script_engine import CompleteScriptAnalyzer
 
 def test_every_question():
     """Test every question and all possible answer paths."""
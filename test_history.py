@@ -0,0 +1,92 @@
+"""Test the bounded conversation history."""
+
+import os
+
+from script_history import ConversationHistory
+
+
+def test_history_ring_buffer(tmp_path):
+    """History keeps a fixed window in memory and spills the rest to disk."""
+    spill_path = os.path.join(str(tmp_path), "history.jsonl")
+    history = ConversationHistory(capacity=8, spill_path=spill_path)
+
+    for i in range(20):
+        history.append("complete", "Start over", "start", timestamp=float(i))
+
+    assert len(history) == 20
+    assert history.spilled + len(list(history)) == 20
+    assert len(list(history)) <= 8
+    assert [entry.step for entry in history.recent(3)] == [17, 18, 19]
+
+    all_entries = list(history.iter_all())
+    assert [entry.step for entry in all_entries] == list(range(20))
+    assert all_entries[0].question_id == "complete"
+    assert all_entries[0].answer == "Start over"
+    assert all_entries[0].next_question == "start"
+
+
+def test_history_clear(tmp_path):
+    """Clearing forgets buffered and spilled records."""
+    history = ConversationHistory(capacity=4, spill_path=os.path.join(str(tmp_path), "h.jsonl"))
+    for i in range(10):
+        history.append("1", "Not sure", "2")
+    history.clear()
+    assert not history
+    history.append("start", "Sure", "1")
+    assert [entry.step for entry in history.iter_all()] == [0]
+
+
+def test_history_truncate():
+    """Buffered steps can be looked up and dropped in constant time."""
+    history = ConversationHistory(capacity=4)
+    for i in range(6):
+        history.append(str(i), "Yes", str(i + 1))
+
+    assert history.get(0) is None
+    assert history.get(5).question_id == "5"
+    assert history.truncate(3)
+    assert len(history) == 3
+    assert history.get(3) is None
+    assert not history.truncate(history.first_buffered_step - 1)
+
+    entry = history.append("3", "No", "9")
+    assert entry.step == 3
+
+
+def test_free_text_answers_are_not_interned(tmp_path):
+    """Only answers a graph registered go in the shared table; free text leaves with its record."""
+    from script_engine import ScriptGraph
+    from script_history import ANSWER_IDS
+
+    ScriptGraph({"1": {"question": "Q?", "suggestions": ["Yes"], "next_questions": {"Yes": "2"}},
+                 "2": {"question": "Q2?"}})
+    before = len(ANSWER_IDS)
+    history = ConversationHistory(capacity=4, spill_path=os.path.join(str(tmp_path), "h.jsonl"))
+    for i in range(12):
+        history.append("1", f"something only typed once {i}", "1")
+    history.append("1", "Yes", "2")
+    assert len(ANSWER_IDS) == before
+    assert [entry.answer for entry in history.recent(2)] == ["something only typed once 11", "Yes"]
+    assert [entry.answer for entry in history.iter_all()][0] == "something only typed once 0"
+
+
+def test_own_spill_file_is_deleted_and_truncated_text_released(monkeypatch, tmp_path):
+    """A history removes the spill file it created on clear and drops free text it truncates."""
+    monkeypatch.setattr("script_history.SPILL_DIR", str(tmp_path))
+    history = ConversationHistory(capacity=4)
+    for i in range(6):
+        history.append("1", f"typed {i}", "1")
+    spill_path = history.spill_path
+    assert os.path.exists(spill_path)
+    history.clear()
+    assert not os.path.exists(spill_path) and history.spill_path is None
+
+    for i in range(3):
+        history.append("1", f"typed {i}", "1")
+    history.truncate(1)
+    assert history._free_text.count(None) == 3
+    for i in range(6):
+        history.append("1", f"again {i}", "1")
+    spill_path = history.spill_path
+    del history
+    assert not os.path.exists(spill_path)
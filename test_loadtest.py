@@ -0,0 +1,25 @@
+"""Test the load-test harness."""
+
+import random
+
+from script_api import load_script_graph
+from script_loadtest import choose_answer, run_load_test
+
+
+def test_choose_answer_mix():
+    """Button answers are exact edges; typed answers are variants."""
+    node = load_script_graph().node("start")
+    rng = random.Random(1)
+    assert all(choose_answer(node, rng, 0.0)[0] in node["next_questions"] for _ in range(20))
+    typed = [choose_answer(node, rng, 1.0) for _ in range(20)]
+    assert all(is_typed for _, is_typed in typed)
+
+
+def test_engine_load_report():
+    """The engine target records both operations with ordered percentiles."""
+    report = run_load_test("engine", conversations=20, concurrency=5, max_steps=15, seed=3)
+    assert report["answers"] > 0
+    for name in ("get_current_question", "submit_answer"):
+        op = report["operations"][name]
+        assert op["count"] > 0
+        assert op["p50_ms"] <= op["p95_ms"] <= op["p99_ms"]
@@ -0,0 +1,48 @@
+"""Test the Prometheus metrics."""
+
+import urllib.request
+
+from script_api import load_script_graph
+from script_engine import Conversation
+from script_metrics import ANSWERS, REGISTRY, Registry, start_http_server
+
+
+def test_registry_text_format():
+    """Counters and cumulative histogram buckets render in exposition format."""
+    registry = Registry()
+    hits = registry.counter("demo_hits_total", "Hits.", ("kind",))
+    hits.labels("a").inc()
+    hits.labels("a").inc(2)
+    latency = registry.histogram("demo_seconds", "Latency.", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3.0)
+    text = registry.render()
+    assert '# TYPE demo_hits_total counter' in text
+    assert 'demo_hits_total{kind="a"} 3' in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert 'demo_seconds_count 3' in text and 'demo_seconds_sum 3.55' in text
+
+
+def test_engine_records_answers_and_serves_metrics():
+    """submit_answer counts matches and misses; the endpoint serves them."""
+    exact, miss = ANSWERS.labels("exact"), ANSWERS.labels("miss")
+    before = exact.value, miss.value
+    conversation = Conversation(load_script_graph())
+    assert conversation.submit_answer("Sure")
+    assert not conversation.submit_answer("purple")
+    assert (exact.value, miss.value) == (before[0] + 1, before[1] + 1)
+
+    server = start_http_server(port=0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode("utf-8")
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert f'script_answers_total{{result="exact"}} {exact.value}' in body
+        assert "script_submit_answer_seconds_count" in body
+    finally:
+        server.shutdown()
+    assert REGISTRY.get("script_render_seconds") is not None
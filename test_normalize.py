@@ -0,0 +1,47 @@
+"""Test the ingest normalization and canonical answer matching."""
+
+import os
+
+from script_engine import CompleteScriptAnalyzer, compile_script
+from script_normalize import answer_key, normalize_text
+from script_shared_graph import MappedGraph, write_graph_file
+
+
+def test_normalize_text_folds_extraction_noise():
+    raw = 'Hey I have a question  \n Sure..  \nIf they say heaven and hell , ask “why” … Q4 – Q5\n..and since'
+    assert normalize_text(raw) == 'Hey I have a question\n Sure.\nIf they say heaven and hell, ask "why" ... Q4 - Q5\n..and since'
+    assert answer_key("  I DON’T   know ") == "i don't know"
+
+    # Directives written with curly quotes become visible to the parsers
+    graph = compile_script("conversational-regex", '1. Where?\nIf they answer “Heaven” proceed to Q4.\n4. Next?\n')
+    assert graph.questions["1"]["next_questions"] == {"Heaven": "4"}
+
+
+def test_canonical_key_beats_substring(tmp_path):
+    """"hell" is the "Hell" answer, not a substring of "Heaven and Hell"."""
+    analyzer = CompleteScriptAnalyzer("script.pdf")
+    analyzer.parse_script()
+    graph = analyzer.graph
+    assert graph.match("1", "hell").answer == "Hell"
+    assert graph.match("1", "“Heaven  and hell”").answer == "Heaven and Hell"
+
+    path = os.path.join(str(tmp_path), "graph.bin")
+    write_graph_file(graph, path)
+    mapped = MappedGraph(path)
+    for answer in ("hell", "HEAVEN", "heaven and hell I guess", "purple"):
+        assert mapped.match("1", answer) == graph.match("1", answer)
+    mapped.close()
+
+
+def test_punctuation_alone_matches_nothing(tmp_path):
+    """An answer with an empty canonical key is not a substring match for every key."""
+    curated = compile_script("curated")
+    parsed = compile_script("ai-heuristic", open("script_text.txt", encoding="utf-8").read())
+    path = os.path.join(str(tmp_path), "graph.bin")
+    write_graph_file(curated, path)
+    mapped = MappedGraph(path)
+    for answer in ("?", ".", "!!", '"', " ... "):
+        assert answer_key(answer) == ""
+        assert curated.match("1", answer) is None and mapped.match("1", answer) is None
+        assert parsed.match("2", answer).kind == "sequential"
+    mapped.close()
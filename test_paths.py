@@ -0,0 +1,55 @@
+"""Test the exhaustive path analysis."""
+
+from script_api import load_script_graph
+from script_engine import ScriptGraph
+from script_paths import PathIndex, analyze
+
+
+def _graph():
+    return ScriptGraph({
+        "start": {"question": "Ready?", "suggestions": ["Yes", "Sure"],
+                  "next_questions": {"Yes": "1", "Sure": "1"}},
+        "1": {"question": "One", "suggestions": ["A", "B", "Back"],
+              "next_questions": {"A": "2", "B": "3", "Back": "start"}},
+        "2": {"question": "Two", "suggestions": ["Go", "Skip", "Loop"],
+              "next_questions": {"Go": "3", "Skip": "complete", "Loop": "2"}},
+        "3": {"question": "Three", "suggestions": ["Done", "Lost"],
+              "next_questions": {"Done": "complete", "Lost": "4"}},
+        "4": {"question": "Dead end", "suggestions": [], "next_questions": {}},
+        "orphan": {"question": "Never asked", "suggestions": ["Ok"], "next_questions": {"Ok": "nowhere"}},
+        "complete": {"question": "Done", "suggestions": ["Start over"],
+                     "next_questions": {"Start over": "start"}},
+    })
+
+
+def test_small_graph_paths_loops_and_coverage():
+    index = PathIndex(_graph())
+    # start-1-2-3-complete, start-1-2-complete, start-1-3-complete
+    assert index.total == 3
+    assert sorted(tuple(q for q, _, _ in index.path(i)) for i in range(3)) == [
+        ("start", "1", "2"), ("start", "1", "2", "3"), ("start", "1", "3")]
+
+    report = analyze(_graph(), processes=2, limit=None)
+    assert report.paths == report.replayed == 3
+    assert {(e.source, e.target) for e in report.cycle_edges} == {("1", "start"), ("2", "2"), ("complete", "start")}
+    assert report.unreachable == ["orphan"] and report.dead_ends == ["4"]
+    assert report.failures == [("orphan --Ok-->", "unknown question nowhere")]
+    assert report.replay_covered == 6   # one answer per distinct target
+    assert report.on_paths == 7 and report.edges == 12
+
+
+def test_complete_script_has_no_broken_transitions():
+    report = analyze(load_script_graph(), limit=300)
+    assert report.failures == []
+    assert report.paths > 10 ** 9 and report.replayed == 300
+    assert report.unreachable == [] and report.dead_ends == []
+    assert report.edge_coverage > 0.85
+
+
+def test_path_numbers_are_distinct():
+    index = PathIndex(load_script_graph())
+    step = index.total // 50
+    paths = [tuple(index.path(i * step)) for i in range(50)]
+    assert len(set(paths)) == 50
+    assert all(hops[-1][2] == "complete" for hops in paths)
+    assert all(len({q for q, _, _ in hops}) == len(hops) for hops in paths)   # acyclic
@@ -0,0 +1,76 @@
+"""Test the on-demand profiling hooks."""
+
+import os
+import pstats
+import tracemalloc
+
+import script_profiling
+from script_engine import CompleteScriptAnalyzer
+
+
+def test_armed_submits_are_captured_and_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(script_profiling, "PROFILE_DIR", str(tmp_path))
+    analyzer = CompleteScriptAnalyzer("script.pdf")
+    analyzer.parse_script()
+    assert script_profiling.profiled("submit_answer").__enter__() is False
+
+    script_profiling.arm("submit_answer", 3)
+    for answer in ("Yes", "Yes", "No"):
+        analyzer.submit_answer(answer)
+    assert script_profiling.armed() == {}
+    analyzer.submit_answer("Yes")   # not armed any more
+
+    report = script_profiling.reports()[-1]
+    assert report.label == "submit_answer" and report.calls == 3
+    assert os.path.exists(report.stats_path) and os.path.exists(report.snapshot_path)
+    assert any("match" in name for name, _, _, _ in report.top_functions)
+    assert pstats.Stats(report.stats_path).total_calls > 0
+    tracemalloc.Snapshot.load(report.snapshot_path)
+    assert not tracemalloc.is_tracing()
+
+
+def test_profiled_parse_rebuilds_the_cached_graph(tmp_path, monkeypatch):
+    monkeypatch.setattr(script_profiling, "PROFILE_DIR", str(tmp_path))
+    first = CompleteScriptAnalyzer("script.pdf")
+    first.parse_script()
+    script_profiling.arm_from_env("parse_script")
+    second = CompleteScriptAnalyzer("script.pdf")
+    second.parse_script()
+    assert second.graph is not first.graph
+    report = script_profiling.reports()[-1]
+    assert report.label == "parse_script"
+    assert any("ScriptGraph" in name or "__init__" in name for name, _, _, _ in report.top_functions)
+
+
+def test_profiled_copy_builds_the_same_graph(tmp_path, monkeypatch):
+    """The debug panel profiles a fresh copy, which must not drop the session's completions from the cache."""
+    monkeypatch.setattr(script_profiling, "PROFILE_DIR", str(tmp_path))
+    session = CompleteScriptAnalyzer("script.pdf", common_answers={"1": {"Purgatory": 5}})
+    try:
+        script_profiling.arm("parse_script")
+        session.parse_script()
+        script_profiling.arm("parse_script")
+        assert session.fresh_copy().parse_script()
+        latest = CompleteScriptAnalyzer("script.pdf")
+        latest.parse_script()
+        assert latest.graph is not session.graph
+        assert latest.graph.complete("1", "pu") == ("Purgatory",)
+    finally:
+        script_profiling.arm("parse_script")
+        CompleteScriptAnalyzer("script.pdf").parse_script()
+
+
+def test_rearming_and_bad_env_items(caplog):
+    """Re-arming stops the replaced capture's tracing; a malformed env item is skipped, not raised."""
+    script_profiling.arm("submit_answer", 2)
+    with script_profiling.profiled("submit_answer") as measuring:
+        assert measuring
+    assert tracemalloc.is_tracing()     # one of two calls captured
+    script_profiling.arm("submit_answer")
+    assert not tracemalloc.is_tracing()
+    script_profiling.disarm("submit_answer")
+
+    script_profiling.arm_from_env("parse_script:x, submit_answer:2")
+    assert script_profiling.armed() == {"submit_answer": 2}
+    assert "parse_script:x" in caplog.text
+    script_profiling.disarm("submit_answer")
@@ -0,0 +1,46 @@
+"""Test the pre-rendered question cards."""
+
+import json
+
+from script_api import load_script_graph
+from script_engine import ScriptGraph
+from script_render import get_render_cache, graph_version
+
+
+def test_render_cache_layout():
+    """Every node is rendered once, with escaped HTML and split button columns."""
+    graph = ScriptGraph({
+        "start": {"question": "Is 2 < 3?", "suggestions": ["Yes", "No", "Maybe"],
+                  "next_questions": {"Yes": "complete"}, "context": "Warm up"},
+        "complete": {"question": "Done", "suggestions": []},
+    })
+    cache = get_render_cache(graph, columns=2)
+    assert len(cache) == 2
+    start = cache.node("start")
+    assert "Is 2 &lt; 3?" in start.card_html
+    assert start.header == "🎬 Script Start" and start.context_banner == "💡 Context: Warm up"
+    assert [[label for label, _, _ in column] for column in start.columns] == [["Yes", "Maybe"], ["No"]]
+    assert start.columns[0][0][2] == "suggestion_start_0"
+    assert len(get_render_cache(graph, columns=3, shrink_columns=True).node("complete").columns) == 1
+
+
+def test_render_cache_shared_per_version():
+    """The same graph, or an equal one, reuses the cache; edits change the version."""
+    graph = load_script_graph()
+    assert get_render_cache(graph) is get_render_cache(graph)
+    copy = ScriptGraph(graph.questions)
+    assert get_render_cache(copy) is get_render_cache(graph)
+    edited = dict(graph.questions, start=dict(graph.questions["start"], question="Hello?"))
+    assert graph_version(ScriptGraph(edited)) != graph_version(graph)
+
+
+def test_prefetch_page_carries_next_cards():
+    """The prefetch page embeds the card each suggestion leads to."""
+    graph = load_script_graph()
+    cache = get_render_cache(graph)
+    page, height = cache.prefetch_page("start")
+    assert height > 0
+    target = cache.node(cache.node("start").targets[0])
+    assert '"prefetch:suggestion_start_0"' in page
+    assert json.dumps(target.card_html).replace("</", "<\\/") in page
+    assert cache.prefetch_page("start")[0] is page
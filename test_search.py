@@ -0,0 +1,41 @@
+"""Test the full-text search index and jumping to a result."""
+
+from script_engine import CompleteScriptAnalyzer, compile_script
+from script_search import MAX_EXPANSIONS, SearchIndex
+from script_synth import generate_script
+
+
+def test_search_ranks_prefixes_ids_and_every_word():
+    analyzer = CompleteScriptAnalyzer("script.pdf")
+    analyzer.parse_script()
+    index = analyzer.graph.search_index
+
+    # The word still being typed is a prefix; whole words outrank prefixes
+    assert [hit.question_id for hit in index.search("why heav")][:3] == ["1a", "15", "18"]
+    assert index.search("Q17")[0].question_id == "17"
+    assert index.search("why heaven")[0].score > index.search("why heav")[0].score
+    assert index.search("heaven purple") == [] and index.search("  ") == []
+
+    assert analyzer.submit_answer("Sure")
+    assert analyzer.go_to_question("17") and analyzer.current_question_id == "17"
+    assert not analyzer.go_to_question("nope") and analyzer.current_question_id == "17"
+    assert len(analyzer.conversation_history) == 1
+
+
+def test_search_index_on_a_large_script():
+    script = generate_script(nodes=3000, vocabulary=400, seed=2, first_id=100)
+    graph = compile_script("ai-heuristic", script.text)
+    index = graph.search_index
+    assert isinstance(index, SearchIndex) and len(index) > 400
+
+    for question_id in ("100", "1500", "3099"):
+        question = graph.questions[question_id]["question"]
+        hits = index.search(" ".join(question.split()[-3:]))
+        assert question_id in [hit.question_id for hit in hits], question
+    # "q1" is a prefix of a thousand ids; it stands for a capped number of them
+    assert len(index._expand("q1")) <= MAX_EXPANSIONS + 1
+    assert index.search("q150")[0].question_id == "150"
+    assert all(hit.question_id.startswith("1") for hit in index.search("q1"))
+    ranked = index.search("would", limit=50)
+    assert len(ranked) == 50
+    assert [hit.score for hit in ranked] == sorted((hit.score for hit in ranked), reverse=True)
@@ -0,0 +1,46 @@
+"""Test idle session eviction and memory accounting."""
+
+from script_history import ConversationHistory
+from session_registry import SessionRegistry, approx_size
+
+
+class FakeAnalyzer:
+    """Stands in for an analyzer: a graph, a history and offload()."""
+
+    def __init__(self):
+        self.questions = {str(i): {"question": "x" * 100} for i in range(50)}
+        self.conversation_history = ConversationHistory()
+        self.store = None
+        self.offloaded = False
+
+    def offload(self):
+        self.questions = {}
+        self.conversation_history.clear()
+        self.offloaded = True
+
+
+def test_idle_sessions_are_offloaded():
+    """Sessions idle past the timeout are offloaded and dropped from the registry."""
+    registry = SessionRegistry(idle_timeout=10, sweep_interval=3600)
+    idle, active = FakeAnalyzer(), FakeAnalyzer()
+    registry.touch("idle", idle)
+    registry.touch("active", active)
+    registry._entries["idle"].last_seen -= 60
+
+    assert registry.evict_idle() == ["idle"]
+    assert idle.offloaded and not idle.questions
+    assert not active.offloaded
+    assert registry.totals()["sessions"] == 1
+    assert registry.totals()["evicted_total"] == 1
+
+
+def test_memory_accounting():
+    """Offloading shrinks the accounted size; dead sessions vanish."""
+    analyzer = FakeAnalyzer()
+    before = approx_size(analyzer)
+    analyzer.offload()
+    assert approx_size(analyzer) < before
+
+    registry = SessionRegistry()
+    registry.touch("gone", FakeAnalyzer())
+    assert registry.stats() == []
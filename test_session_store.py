@@ -0,0 +1,71 @@
+"""Test the SQLite session store."""
+
+import os
+
+from script_history import ConversationHistory
+from session_store import SessionStore
+
+
+def test_store_resume(tmp_path):
+    """A conversation written through the store can be resumed by a new process."""
+    path = os.path.join(str(tmp_path), "sessions.db")
+    store = SessionStore(path)
+    history = ConversationHistory(capacity=8)
+    for question_id, answer, next_question in [("start", "Sure", "1"), ("1", "Not sure", "2"), ("2", "No", "2b")]:
+        store.record_step("abc", history.append(question_id, answer, next_question))
+    store.close()
+
+    store = SessionStore(path)
+    saved = store.resume("abc")
+    assert saved.question_id == "2b"
+    assert saved.total_steps == 3
+    assert [entry.answer for entry in saved.history] == ["Sure", "Not sure", "No"]
+    assert store.resume("missing") is None
+
+    store.clear_session("abc")
+    store.flush()
+    saved = store.resume("abc")
+    assert saved.question_id == "start"
+    assert saved.history == []
+    store.close()
+
+
+def test_failed_write_only_loses_itself(tmp_path, caplog):
+    """A write SQLite rejects is logged and dropped; the rest of its batch still commits."""
+    store = SessionStore(os.path.join(str(tmp_path), "sessions.db"), flush_interval=0.5)
+    good = ConversationHistory(capacity=8)
+    store.record_step("a", good.append("start", "Sure", "1"))
+    bad = ConversationHistory(capacity=8)
+    store.record_step("b", bad.append("start", object(), "1"))  # cannot be bound as a parameter
+    store.save_cursor("c", "5")
+    store.flush()
+
+    assert store.resume("a").question_id == "1"
+    assert store.resume("c").question_id == "5"
+    assert store.resume("b") is None
+    assert "Dropped step write for session b" in caplog.text
+    store.close()
+
+
+def test_export_transcripts(tmp_path):
+    """Stored steps stream out as JSONL and CSV, with session filtering."""
+    import json
+
+    from transcript_export import export_transcripts
+
+    store = SessionStore(os.path.join(str(tmp_path), "sessions.db"))
+    for session_id in ("a", "b"):
+        history = ConversationHistory(capacity=8)
+        store.record_step(session_id, history.append("start", "Sure", "1", timestamp=10.0))
+        store.record_step(session_id, history.append("1", "Heaven", "1a", timestamp=20.0))
+    store.flush()
+
+    lines = list(export_transcripts(store, "jsonl"))
+    assert len(lines) == 4
+    assert json.loads(lines[0])["session_id"] == "a"
+
+    lines = list(export_transcripts(store, "csv", session_ids=["b"], since=15.0))
+    assert lines[0].startswith("session_id,step,question_id")
+    assert len(lines) == 1
+    assert lines[0].splitlines()[1].startswith("b,1,1,Heaven,1a")
+    store.close()
@@ -0,0 +1,77 @@
+"""Test the memory-mapped shared graph."""
+
+import os
+
+from script_api import ConversationService, HttpError
+from script_engine import CompleteScriptAnalyzer, Conversation
+from script_shared_graph import MappedGraph, write_graph_file
+
+
+def _complete_graph():
+    analyzer = CompleteScriptAnalyzer("script.pdf")
+    analyzer.parse_script()
+    return analyzer.graph
+
+
+def test_mapped_graph_matches_compiled_graph(tmp_path):
+    """A mapped graph returns the same nodes and transitions as the original."""
+    graph = _complete_graph()
+    path = os.path.join(str(tmp_path), "graph.bin")
+    write_graph_file(graph, path)
+    mapped = MappedGraph(path)
+
+    assert list(mapped.questions) == list(graph.questions)
+    for question_id, node in graph.questions.items():
+        assert mapped.node(question_id) == node
+        assert mapped.node_json(question_id) == graph.node_json(question_id)
+        for answer in list(node["next_questions"]) + ["purple", "yes", "heaven"]:
+            assert mapped.match(question_id, answer) == graph.match(question_id, answer)
+    assert mapped.node("missing") is None
+
+    for question_id in graph.questions:
+        assert mapped.matcher_entry(question_id) == graph.matcher_entry(question_id)
+        for prefix in ("", "s", "he", "not"):
+            assert mapped.complete(question_id, prefix) == graph.complete(question_id, prefix)
+    assert set(mapped.completions) == set(graph.completions)
+    for query in ("heav", "why", "q1", "17"):
+        assert mapped.search_index.search(query) == graph.search_index.search(query)
+
+    mapped.questions["1"]["suggestions"].append("changed")
+    mapped.node("1")["next_questions"].clear()
+    assert mapped.node("1") == graph.questions["1"]
+
+    conversation = Conversation(mapped)
+    assert conversation.submit_answer("Sure")
+    assert conversation.get_current_question()["question_id"] == "1"
+    mapped.close()
+
+
+def test_mapped_graph_interns_answer_keys(tmp_path, monkeypatch):
+    """Attaching interns the answer keys, so histories over a mapped graph store them as ids."""
+    import script_history
+    path = os.path.join(str(tmp_path), "graph.bin")
+    write_graph_file(_complete_graph(), path)
+    fresh = script_history._Interner(script_history.MAX_ANSWER_IDS)
+    monkeypatch.setattr(script_history, "ANSWER_IDS", fresh)
+    monkeypatch.setattr("script_shared_graph.ANSWER_IDS", fresh)
+    mapped = MappedGraph(path)
+    assert fresh.find("Sure") >= 0
+    history = script_history.ConversationHistory(capacity=4)
+    history.append("start", "Sure", "1")
+    assert history._free_text[0] is None
+    mapped.close()
+
+
+def test_worker_redirect():
+    """A worker redirects requests for conversations owned by another worker."""
+    urls = ["http://127.0.0.1:9000", "http://127.0.0.1:9001"]
+    service = ConversationService(_complete_graph(), worker_index=1, worker_urls=urls)
+    status, _ = service.dispatch("POST", "/conversations", b"")
+    assert status == 201
+    try:
+        service.dispatch("GET", "/conversations/0-abc", b"")
+    except HttpError as e:
+        assert e.status == 307
+        assert e.location == "http://127.0.0.1:9000/conversations/0-abc"
+    else:
+        raise AssertionError("expected a redirect")
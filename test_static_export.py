@@ -0,0 +1,23 @@
+"""Test the offline HTML export."""
+
+import json
+import re
+
+from script_api import load_script_graph
+from script_static_export import export_html
+
+
+def test_export_embeds_whole_graph():
+    """The page carries every node plus the matcher's keys and fallbacks."""
+    graph = load_script_graph()
+    page = export_html(graph, title="Field <copy>")
+    assert "<title>Field &lt;copy&gt;</title>" in page
+    embedded = re.search(r'<script id="graph" type="application/json">(.*?)</script>', page, re.S).group(1)
+    payload = json.loads(embedded)
+    assert payload["start"] == "start" and len(payload["nodes"]) == len(graph)
+    for question_id, node in graph.questions.items():
+        exported = payload["nodes"][question_id]
+        fuzzy, fallback = graph.matcher_entry(question_id)
+        assert exported["n"] == node["next_questions"]
+        assert [tuple(entry) for entry in exported["f"]] == list(fuzzy)
+        assert exported["b"] == fallback
@@ -0,0 +1,66 @@
+"""Test the registered parse strategies and the strategy benchmark."""
+
+import pytest
+
+from script_bench import benchmark_strategies, pick_strategy
+from script_engine import CompleteScriptAnalyzer, Conversation, ScriptAnalyzer, compile_script
+from script_parsers import STRATEGIES, ParseStrategy, register_strategy
+from script_paths import validate_graph
+from script_shared_graph import MappedGraph, write_graph_file
+
+
+def _script_text() -> str:
+    with open("script_text.txt", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_strategies_compile_with_their_own_start(tmp_path):
+    """Each strategy's graph starts where its app did, including through the mmap file."""
+    text = _script_text()
+    graphs = {name: compile_script(name, text) for name in STRATEGIES}
+    assert graphs["conversational-regex"].start == "1" and graphs["ai-heuristic"].start == "start"
+    assert graphs["sequential"].match("1", "Heaven and hell").next_question == "4"
+    assert graphs["accurate-heuristic"].match("38", "Heaven").next_question == "complete"
+
+    conversation = Conversation(graphs["conversational-regex"])
+    assert conversation.current_question_id == "1"
+    conversation.submit_answer("Heaven")
+    conversation.reset_to_beginning()
+    assert conversation.current_question_id == "1"
+
+    write_graph_file(graphs["conversational-regex"], str(tmp_path / "graph.bin"))
+    mapped = MappedGraph(str(tmp_path / "graph.bin"))
+    assert mapped.start == "1"
+    mapped.close()
+
+
+def test_analyzers_share_one_cache_across_strategies():
+    register_strategy(ParseStrategy("tiny", "Two questions", lambda lines: {
+        "start": {"question": "Ready?", "suggestions": ["Yes"], "next_questions": {"Yes": "complete"}},
+        "complete": {"question": "Done", "suggestions": [], "next_questions": {}},
+    }, match_on="suggestions", sequential_fallback=False, uses_pdf=False))
+    try:
+        tiny = ScriptAnalyzer("missing.pdf", "tiny")
+        assert tiny.parse_script() and tiny.submit_answer("yes")
+        assert tiny.current_question_id == "complete"
+        assert ScriptAnalyzer("missing.pdf", "tiny").parse_script()
+
+        curated = ScriptAnalyzer("script.pdf", "curated")
+        curated.parse_script()
+        complete = CompleteScriptAnalyzer("script.pdf")
+        complete.parse_script()
+        assert curated.graph is complete.graph
+        with pytest.raises(ValueError):
+            ScriptAnalyzer("script.pdf", "nonexistent").parse_script()
+    finally:
+        del STRATEGIES["tiny"]
+
+
+def test_strategy_benchmark_picks_the_fastest_correct_graph():
+    results = {r.name: r for r in benchmark_strategies(_script_text(), warmup=1, repeat=3)}
+    assert set(results) == set(STRATEGIES)
+    # The script has no question 33, so the table-driven strategies point at a missing question
+    assert any("unknown question 33" in problem for problem in results["sequential"].problems)
+    assert not results["ai-heuristic"].problems and not results["curated"].problems
+    assert pick_strategy(list(results.values())) == "ai-heuristic"
+    assert validate_graph(compile_script("curated")) == []
@@ -0,0 +1,59 @@
+"""Test the synthetic script generator."""
+
+import re
+
+from script_engine import ScriptGraph, compile_script
+from script_parsers import iter_sentences, parse_conversational_flow, split_lines
+from script_synth import generate_script, pdf_bytes
+
+
+def test_generated_script_parses_to_the_intended_graph():
+    # Numbered past the parser's hand-tuned ids (1-39) so only the generic rules apply
+    script = generate_script(nodes=300, branching=4, vocabulary=60, cycle_ratio=0.2, seed=7, first_id=100)
+    assert script == generate_script(nodes=300, branching=4, vocabulary=60, cycle_ratio=0.2, seed=7, first_id=100)
+    assert len(script.expected) == 299
+    assert any(int(t) <= int(q) for q, transitions in script.expected.items() for t in transitions.values())
+
+    questions = parse_conversational_flow(split_lines(script.text))
+    for question_id, transitions in script.expected.items():
+        assert questions[question_id]["next_questions"] == transitions, question_id
+
+    graph = ScriptGraph(questions, match_on="next_questions", sequential_fallback=True)
+    for question_id, transitions in list(script.expected.items())[:50]:
+        for answer, target in transitions.items():
+            assert graph.match(question_id, answer).next_question == target
+
+
+def test_directives_wrapped_across_lines_are_reassembled():
+    lines = ["If they say yes, go to", "Q4. Sure.", "no full stop", "at", "all"]
+    assert list(iter_sentences(lines, max_lines=2)) == ["If they say yes, go to Q4.", "Sure.", "no full stop at", "all"]
+
+    # Narrow wrapping splits most directives mid-sentence
+    script = generate_script(nodes=120, branching=3, vocabulary=40, seed=5, wrap=30, first_id=100)
+    for strategy in ("conversational-regex", "ai-heuristic"):
+        graph = compile_script(strategy, script.text)
+        for question_id, transitions in script.expected.items():
+            assert graph.questions[question_id]["next_questions"] == transitions, (strategy, question_id)
+
+
+def test_pdf_is_well_formed_and_carries_every_line():
+    text = generate_script(nodes=40, seed=3, first_id=100).text + "a (bracketed) back\\slash\n"
+    data = pdf_bytes(text, lines_per_page=25)
+    assert data.startswith(b"%PDF-1.4") and data.rstrip().endswith(b"%%EOF")
+
+    # Every xref offset points at its object header
+    startxref = int(data.rsplit(b"startxref", 1)[1].split()[0])
+    assert data[startxref:].startswith(b"xref")
+    entries = data[startxref:].split(b"\n")[3:]
+    number = 1
+    for entry in entries:
+        if not entry.endswith(b" n "):
+            break
+        assert data[int(entry[:10]):].startswith(b"%d 0 obj" % number)
+        number += 1
+
+    shown = []
+    for stream in re.findall(rb"stream\n(.*?)\nendstream", data, re.S):
+        for literal in re.findall(rb"\(((?:\\.|[^\\)])*)\) Tj", stream):
+            shown.append(re.sub(rb"\\(.)", rb"\1", literal).decode("latin-1"))
+    assert shown == [line for line in text.split("\n") if line]
@@ -0,0 +1,57 @@
+"""Test per-rerun span tracing."""
+
+import json
+import logging
+import time
+
+import script_tracing
+from script_tracing import Span, begin_trace, current_trace, end_trace, span, waterfall_rows, write_trace
+
+
+def test_spans_nest_and_are_free_outside_a_trace():
+    """Spans record depth and order inside a trace and do nothing outside one."""
+    with span("ignored"):
+        assert current_trace() is None
+
+    callback = Span("callback: submit_answer", time.perf_counter() - 0.002, 0.001, 0)
+    trace, token = begin_trace("complete", "sid", pending=[callback])
+    with span("session init"):
+        with span("parse_script"):
+            pass
+    with span("card"):
+        pass
+    end_trace(trace, token)
+
+    assert current_trace() is None
+    spans = trace.to_dict()["spans"]
+    assert [(s["name"], s["depth"]) for s in spans] == [
+        ("callback: submit_answer", 0), ("session init", 0), ("parse_script", 1), ("card", 0)]
+    # The trace starts at the callback, which ran before the script
+    assert spans[0]["offset_ms"] == 0 and trace.total >= 0.002
+    rows = waterfall_rows(trace)
+    assert all(0 <= left <= 100 and width > 0 for _, left, width, _, _ in rows)
+
+
+def test_write_trace_appends_json_lines(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(script_tracing, "TRACE_FILE", str(path))
+    monkeypatch.setattr(script_tracing, "_logger", None)
+    logger = logging.getLogger("script_analyzer.trace")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    try:
+        for page in ("complete", "complete_panel"):
+            trace, token = begin_trace(page)
+            with span("card"):
+                pass
+            write_trace(end_trace(trace, token))
+        for handler in logger.handlers:
+            handler.flush()
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["page"] for line in lines] == ["complete", "complete_panel"]
+        assert lines[0]["spans"][0]["name"] == "card"
+    finally:
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+        script_tracing._logger = None
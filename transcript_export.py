@@ -0,0 +1,76 @@
+"""Stream stored conversation transcripts out as JSONL or CSV."""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from session_store import DEFAULT_DB_PATH, SessionStore, TranscriptRow
+
+FORMATS = ("jsonl", "csv")
+
+
+def to_jsonl(rows: Iterable[TranscriptRow]) -> Iterator[str]:
+    """Yield one JSON object per line."""
+    for row in rows:
+        yield json.dumps(row._asdict(), ensure_ascii=False) + "\n"
+
+
+def to_csv(rows: Iterable[TranscriptRow]) -> Iterator[str]:
+    """Yield a header line followed by one CSV line per row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(TranscriptRow._fields)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_transcripts(store: SessionStore, fmt: str = "jsonl", session_ids=None,
+                       since: Optional[float] = None, until: Optional[float] = None) -> Iterator[str]:
+    """Stream every matching step from ``store`` as lines of ``fmt``."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    rows = store.iter_steps(session_ids, since, until)
+    return to_jsonl(rows) if fmt == "jsonl" else to_csv(rows)
+
+
+def _timestamp(value: str) -> float:
+    """Accept either a Unix timestamp or an ISO date/time."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export stored conversations.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite session database")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--session", action="append", dest="sessions", help="Only this session id (repeatable)")
+    parser.add_argument("--since", type=_timestamp, help="Start time, inclusive (ISO or Unix seconds)")
+    parser.add_argument("--until", type=_timestamp, help="End time, exclusive (ISO or Unix seconds)")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    store = SessionStore(args.db)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for line in export_transcripts(store, args.format, args.sessions, args.since, args.until):
+            out.write(line)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())